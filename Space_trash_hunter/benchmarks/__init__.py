@@ -0,0 +1 @@
+# Бенчмарки горячих мест игры. Запуск из папки проекта: python -m benchmarks.<имя>
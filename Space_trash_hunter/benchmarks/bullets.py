@@ -0,0 +1,56 @@
+"""
+Пули в тяжелой перестрелке: new Bullet() на каждый выстрел против BulletPool.
+Запуск: python -m benchmarks.bullets
+"""
+import gc
+import math
+import time
+
+import arcade
+
+from src.sprites import Bullet
+from src.pools import BulletPool
+from src.graveyard import Graveyard
+
+TICKS = 600
+SHOTS_PER_TICK = 12  # игрок + десяток стрелков + разлеты камикадзе
+DELTA_TIME = 1 / 60
+
+
+def run(pool):
+    bullets = arcade.SpriteList()
+    # Истекшие пули удаляются, как в World: через кладбище, оттуда они и возвращаются в пул
+    graveyard = Graveyard({"bullets": bullets})
+    gc.collect()
+    collections_before = sum(s["collections"] for s in gc.get_stats())
+    start = time.perf_counter()
+    for tick in range(TICKS):
+        for i in range(SHOTS_PER_TICK):
+            is_enemy = i % 3 != 0
+            bullet = pool.acquire(is_enemy) if pool else Bullet(is_enemy=is_enemy)
+            angle = math.radians(tick * 7 + i * 30)
+            bullet.change_x = math.cos(angle) * 6
+            bullet.change_y = math.sin(angle) * 6
+            bullets.append(bullet)
+        for bullet in bullets:
+            bullet.update(DELTA_TIME)
+            if bullet.time_to_live <= 0:
+                graveyard.kill(bullet, "bullets")
+        graveyard.flush()
+    elapsed = (time.perf_counter() - start) / TICKS * 1000
+    collections = sum(s["collections"] for s in gc.get_stats()) - collections_before
+    return elapsed, collections
+
+
+def main():
+    plain_ms, plain_gc = run(None)
+    pool = BulletPool()
+    pooled_ms, pooled_gc = run(pool)
+    print(f"без пула: {plain_ms:.3f} мс/тик, сборок мусора: {plain_gc}")
+    print(f"с пулом:  {pooled_ms:.3f} мс/тик, сборок мусора: {pooled_gc}")
+    for variant, stats in pool.report().items():
+        print(f"  {variant}: {stats}")
+
+
+if __name__ == "__main__":
+    main()
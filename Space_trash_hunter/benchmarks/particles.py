@@ -0,0 +1,80 @@
+"""
+Шторм взрывов: спрайт на каждую частицу (ExplosionParticle) против ParticleSystem.
+Запуск: python -m benchmarks.particles [--draw]
+С --draw создается скрытое окно и в замер входит отрисовка.
+"""
+import random
+import sys
+import time
+
+import arcade
+
+from src.sprites import ExplosionParticle
+from src.particles import ParticleSystem
+from src.graveyard import Graveyard
+
+TICKS = 300
+# Каждый тик: смерть камикадзе (15) + три попадания пулей (по 3) + астероид (10)
+BURSTS = ((15, arcade.color.RED), (3, arcade.color.WHITE), (3, arcade.color.WHITE),
+          (3, arcade.color.WHITE), (10, arcade.color.GRAY))
+DELTA_TIME = 1 / 60
+
+
+def run_sprites(draw):
+    rng = random.Random(1)
+    particles = arcade.SpriteList()
+    # Погасшие частицы удаляются, как в World, иначе спрайтов на экране было бы больше, чем в массивах
+    graveyard = Graveyard({"particles": particles})
+    peak = 0
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        for count, color in BURSTS:
+            x, y = rng.uniform(-400, 400), rng.uniform(-300, 300)
+            for _ in range(count):
+                particles.append(ExplosionParticle(x, y, color))
+        for particle in particles:
+            particle.update(DELTA_TIME)
+            if particle.alpha <= 0:
+                graveyard.kill(particle, "particles")
+        graveyard.flush()
+        peak = max(peak, len(particles))
+        if draw:
+            particles.draw()
+    return (time.perf_counter() - start) / TICKS * 1000, peak
+
+
+def run_arrays(draw):
+    rng = random.Random(1)
+    system = ParticleSystem(budget=5000)
+    peak = 0
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        for count, color in BURSTS:
+            system.emit(rng.uniform(-400, 400), rng.uniform(-300, 300), color, count)
+        system.update(DELTA_TIME)
+        peak = max(peak, len(system))
+        if draw:
+            system.draw()
+    return (time.perf_counter() - start) / TICKS * 1000, peak
+
+
+def main():
+    if not ParticleSystem.available():
+        print("NumPy не установлен - ParticleSystem недоступна")
+        return
+    draw = "--draw" in sys.argv
+    window = None
+    if draw:
+        window = arcade.Window(800, 600, visible=False)
+        arcade.camera.Camera2D().use()
+    sprite_ms, sprite_peak = run_sprites(draw)
+    array_ms, array_peak = run_arrays(draw)
+    if window:
+        window.ctx.finish()
+    print(f"спрайты:  {sprite_ms:.3f} мс/тик (до {sprite_peak} частиц)")
+    print(f"массивы:  {array_ms:.3f} мс/тик (до {array_peak} частиц)")
+    print(f"ускорение: {sprite_ms / array_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+Набор сценариев: готовое состояние мира и тысячи тиков с замером каждой фазы.
+Каждый сценарий собирает мир напрямую (уровень, счет, враги, пули, взрывы),
+а не доигрывает до нужного момента. Игрок бессмертен, чтобы прогон не
+закончился раньше времени. Отчет - JSON: p50/p95/p99 времени тика и фаз,
+сборки мусора, пик выделенной памяти и число спрайтов.
+
+Запуск:
+  python -m benchmarks.scenarios                      # все сценарии
+  python -m benchmarks.scenarios level4_kamikaze --ticks 5000
+  python -m benchmarks.scenarios --draw               # + GameView.on_draw в скрытом окне
+  python -m benchmarks.scenarios --save-baseline      # записать benchmarks/baseline.json
+  python -m benchmarks.scenarios --compare            # сравнить с baseline.json, код 1 при регрессии
+
+База в репозиторий не входит: времена зависят от машины, поэтому ее
+записывают один раз на своей машине (--save-baseline) и сравнивают с ней.
+"""
+import argparse
+import contextlib
+import gc
+import json
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import arcade
+
+from src.world import World, Inputs, TICK_RATE
+
+DELTA_TIME = 1 / TICK_RATE
+TICKS = 3000
+# Отдельный короткий прогон под tracemalloc (он сильно замедляет код, поэтому не в основном замере)
+ALLOC_TICKS = 300
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# Во сколько раз p95 может вырасти относительно базы, прежде чем это считается регрессией
+TOLERANCE = 1.25
+# Фазы World.step, которые меряются по отдельности
+PHASES = ("apply_inputs", "update_population", "update_movement", "resolve_collisions")
+
+
+# ==========================================
+#                СЦЕНАРИИ
+# ==========================================
+def fill_enemies(world):
+    # Враги до лимита выживания для текущего счета
+    while world.enemy_count() < world.enemy_limit():
+        world.spawn_random_enemy()
+    world.flush_spawns(budget=None)
+
+
+def prepare_level4_kamikaze(world, rng):
+    # Со счета 2000 в выживании появляются камикадзе; лимит 12 врагов - только со счета больше 2000
+    world.score = 2001
+    fill_enemies(world)
+
+
+def prepare_level4_late(world, rng):
+    # Поздняя игра: enemy_limit() = 27
+    world.score = 20000
+    fill_enemies(world)
+
+
+def feed_crossfire(world, rng, tick):
+    # Держим ~200 пуль вокруг игрока: вражеские летят на него, наши - наружу
+    player = world.player_sprite
+    while len(world.bullet_list) < 200:
+        is_enemy = rng.random() < 0.6
+        bullet = world.bullet_pool.acquire(is_enemy)
+        angle = rng.uniform(0, 2 * math.pi)
+        distance = rng.uniform(100, 500)
+        bullet.center_x = player.center_x + math.cos(angle) * distance
+        bullet.center_y = player.center_y + math.sin(angle) * distance
+        direction = angle + math.pi if is_enemy else angle
+        bullet.change_x = math.cos(direction) * 6
+        bullet.change_y = math.sin(direction) * 6
+        bullet.angle = -math.degrees(direction)
+        world.bullet_list.append(bullet)
+
+
+def feed_particle_storm(world, rng, tick):
+    # Каждый тик несколько взрывов рядом с игроком: смерть камикадзе, попадания, астероид
+    player = world.player_sprite
+    for count, color in ((15, arcade.color.RED), (3, arcade.color.WHITE), (3, arcade.color.WHITE),
+                         (10, arcade.color.GRAY), (20, arcade.color.RED)):
+        world.spawn_visual_explosion(player.center_x + rng.uniform(-500, 500),
+                                     player.center_y + rng.uniform(-400, 400), color, count)
+
+
+def feed_cruise(world, rng, tick):
+    # Полет по прямой через открытый мир: каждые ~2 секунды новый столбец секторов (src/sectors.py)
+    player = world.player_sprite
+    player.speed_x = 10
+    player.speed_y = 3
+
+
+# {имя: (уровень, подготовка мира или None - как после setup(), подкормка перед каждым тиком или None)}
+SCENARIOS = {
+    "level3_opening": (3, None, None),
+    "level4_kamikaze": (4, prepare_level4_kamikaze, None),
+    "level4_late": (4, prepare_level4_late, None),
+    "crossfire_200": (3, None, feed_crossfire),
+    "particle_storm": (3, None, feed_particle_storm),
+    "open_world_cruise": (4, prepare_level4_kamikaze, feed_cruise),
+}
+
+
+def scripted_inputs(tick):
+    # Одинаковое "управление" во всех прогонах: газ, поворот волнами, выстрел каждые 10 тиков
+    turn = 1 if tick % 120 < 40 else (-1 if tick % 120 >= 100 else 0)
+    return Inputs(thrust=tick % 90 < 60, turn=turn, fire=tick % 10 == 0)
+
+
+def press_keys(view, inputs):
+    # То же управление через клавиши GameView
+    view.up_pressed = inputs.thrust
+    view.right_pressed = inputs.turn > 0
+    view.left_pressed = inputs.turn < 0
+    view.fire_pressed = inputs.fire
+
+
+# ==========================================
+#                  ЗАМЕР
+# ==========================================
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples):
+    # samples в секундах -> миллисекунды
+    return {
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 4),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 4),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 4),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 4),
+    }
+
+
+def timed(method, samples):
+    # Обертка метода мира: время каждого вызова дописывается в samples
+    def wrapper(*args):
+        start = time.perf_counter()
+        result = method(*args)
+        samples.append(time.perf_counter() - start)
+        return result
+    return wrapper
+
+
+def sprite_counts(world):
+    counts = {
+        "enemies": len(world.enemy_list),
+        "asteroids": len(world.asteroid_list),
+        "bullets": len(world.bullet_list),
+        "trash": len(world.trash_list),
+        "particles": len(world.particles) if world.particles is not None else len(world.particle_list),
+    }
+    return counts
+
+
+def build(name, view=None):
+    level, prepare, feed = SCENARIOS[name]
+    rng = random.Random(name)
+    if view is not None:
+        world = view.world
+    else:
+        world = World(level, seed=1)
+        world.setup()
+    # Бессмертный игрок и недостижимая цель: прогон всегда идет все тики
+    world.player_sprite.hp = 10 ** 9
+    world.target_score = float("inf")
+    if prepare:
+        prepare(world, rng)
+    return world, rng, feed
+
+
+def run_scenario(name, ticks, draw=False):
+    view = None
+    if draw:
+        from src.main import GameView
+        level = SCENARIOS[name][0]
+        view = GameView(level)
+        view.world = World(level, seed=1)
+        view.setup()
+        view.loading = False
+        arcade.get_window().show_view(view)
+    world, rng, feed = build(name, view)
+
+    phase_samples = {phase: [] for phase in PHASES}
+    for phase in PHASES:
+        setattr(world, phase, timed(getattr(world, phase), phase_samples[phase]))
+
+    tick_samples = []
+    draw_samples = []
+    # Суммы отчетов LOD по тикам: {слой: {near/mid/far/updates: сумма}}
+    lod_totals = {}
+    peak = sprite_counts(world)
+    gc.collect()
+    collections_before = sum(s["collections"] for s in gc.get_stats())
+    for tick in range(ticks):
+        if feed:
+            feed(world, rng, tick)
+        if view is not None:
+            press_keys(view, scripted_inputs(tick))
+        start = time.perf_counter()
+        if view is not None:
+            view.on_update(DELTA_TIME)
+        else:
+            world.step(DELTA_TIME, scripted_inputs(tick))
+            world.sound_events.clear()
+        tick_samples.append(time.perf_counter() - start)
+        if view is not None:
+            start = time.perf_counter()
+            view.on_draw()
+            view.window.ctx.finish()
+            draw_samples.append(time.perf_counter() - start)
+        for key, value in sprite_counts(world).items():
+            if value > peak[key]:
+                peak[key] = value
+        for layer, tiers in world.lod.report().items():
+            totals = lod_totals.setdefault(layer, {})
+            for tier, value in tiers.items():
+                totals[tier] = totals.get(tier, 0) + value
+    collections = sum(s["collections"] for s in gc.get_stats()) - collections_before
+
+    # Пик памяти на коротком отрезке того же сценария
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    for tick in range(ticks, ticks + ALLOC_TICKS):
+        if feed:
+            feed(world, rng, tick)
+        world.step(DELTA_TIME, scripted_inputs(tick))
+        world.sound_events.clear()
+    _, alloc_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    report = {"ticks": ticks, "tick": summarize(tick_samples),
+              "phases": {phase: summarize(samples) for phase, samples in phase_samples.items() if samples},
+              "gc_collections": collections,
+              "alloc_peak_kb": round((alloc_peak - base) / 1024, 1),
+              "sprites_final": sprite_counts(world),
+              "sprites_peak": peak,
+              # Средние за тик: сколько объектов на каждом уровне LOD и сколько update вызвано
+              "lod_mean": {layer: {tier: round(value / ticks, 2) for tier, value in totals.items()}
+                           for layer, totals in lod_totals.items()}}
+    if draw_samples:
+        report["draw"] = summarize(draw_samples)
+    return report
+
+
+def compare(results, baseline, tolerance):
+    # Сравниваем p95 тика (и отрисовки, если она есть в этом прогоне).
+    # Сценарий или раздел без базы - не "ok", а отдельная строка: новый или переименованный
+    # сценарий иначе проходил бы проверку, ни с чем не сравниваясь.
+    regressions = []
+    missing = []
+    for name, report in results.items():
+        base = baseline.get(name, {})
+        for section in ("tick", "draw"):
+            if section not in report:
+                continue
+            if section not in base:
+                print(f"{name:18} {section:5} нет базы", file=sys.stderr)
+                missing.append((name, section))
+                continue
+            now = report[section]["p95_ms"]
+            before = base[section]["p95_ms"]
+            ratio = now / before if before else 1.0
+            status = "РЕГРЕССИЯ" if ratio > tolerance else "ok"
+            print(f"{name:18} {section:5} p95 {before:8.3f} -> {now:8.3f} мс ({ratio:5.2f}x) {status}",
+                  file=sys.stderr)
+            if ratio > tolerance:
+                regressions.append((name, section, ratio))
+    return regressions, missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сценарные бенчмарки тика и отрисовки")
+    parser.add_argument("names", nargs="*", help=f"сценарии (по умолчанию все: {', '.join(SCENARIOS)})")
+    parser.add_argument("--ticks", type=int, default=TICKS)
+    parser.add_argument("--draw", action="store_true", help="мерить GameView.on_update и on_draw в скрытом окне")
+    parser.add_argument("--out", help="записать JSON-отчет в файл")
+    parser.add_argument("--save-baseline", action="store_true", help="записать отчет как базу")
+    parser.add_argument("--compare", action="store_true", help="сравнить с базой; код выхода 1 при регрессии")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    names = args.names or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"неизвестные сценарии: {', '.join(unknown)}")
+
+    # Базу читаем до прогона: без нее сравнивать не с чем, и сценарии гонять незачем
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            print(f"Нет базы {args.baseline}: сначала запишите ее с --save-baseline", file=sys.stderr)
+            sys.exit(2)
+
+    window = None
+    if args.draw:
+        window = arcade.Window(1024, 768, visible=False)
+
+    results = {}
+    for name in names:
+        print(f"{name}...", file=sys.stderr)
+        # В stdout идет только JSON-отчет, все сообщения игры - в stderr
+        with contextlib.redirect_stdout(sys.stderr):
+            results[name] = run_scenario(name, args.ticks, draw=args.draw)
+
+    if window:
+        window.close()
+
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            f.write(text)
+    if args.compare:
+        regressions, missing = compare(results, baseline, args.tolerance)
+        if regressions or missing:
+            print(f"Регрессии: {len(regressions)}, без базы: {len(missing)} "
+                  f"(базу обновляет --save-baseline)", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
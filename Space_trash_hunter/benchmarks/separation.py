@@ -0,0 +1,54 @@
+"""
+Сравнение отталкивания врагов: перебор всех пар против общей сетки SpatialGrid.
+Запуск: python -m benchmarks.separation
+"""
+import random
+import time
+
+import arcade
+
+from src.sprites import Player, ChaserEnemy
+from src.spatial import SpatialGrid
+
+COUNTS = (10, 100, 1000)
+TICKS = 60
+
+
+def build_horde(count, use_grid):
+    # Враги равномерно в квадрате, площадь растет вместе с количеством,
+    # чтобы плотность (и число реальных соседей) была как в живой игре.
+    rng = random.Random(count)
+    player = Player()
+    enemies = arcade.SpriteList()
+    grid = SpatialGrid(cell_size=64) if use_grid else None
+    half = 40 * count ** 0.5
+    for _ in range(count):
+        enemy = ChaserEnemy(player, enemies)
+        enemy.center_x = rng.uniform(-half, half)
+        enemy.center_y = rng.uniform(-half, half)
+        enemy.grid = grid
+        enemies.append(enemy)
+    return enemies, grid
+
+
+def measure(count, use_grid):
+    enemies, grid = build_horde(count, use_grid)
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        if grid is not None:
+            grid.rebuild(enemies)
+        for enemy in enemies:
+            enemy.separate_from_friends()
+    return (time.perf_counter() - start) / TICKS * 1000
+
+
+def main():
+    print(f"{'врагов':>8} {'все пары, мс':>14} {'сетка, мс':>10} {'ускорение':>10}")
+    for count in COUNTS:
+        brute = measure(count, use_grid=False)
+        grid = measure(count, use_grid=True)
+        print(f"{count:>8} {brute:>14.3f} {grid:>10.3f} {brute / grid:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
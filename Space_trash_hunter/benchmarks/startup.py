@@ -0,0 +1,59 @@
+"""
+Холодный и теплый старт: сколько занимает assets.preload() без кэша на
+диске и с ним (src/diskcache.py). Каждый замер - отдельный процесс, иначе
+второй прогон взял бы все из кэша в памяти AssetRegistry. Кэш - во
+временном каталоге, пользовательский не трогается.
+Запуск: python -m benchmarks.startup [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.diskcache import CACHE_DIR_ENV
+
+
+def child():
+    # Замер внутри процесса: импорт arcade и pyglet сюда не входит, он одинаков с кэшем и без
+    from src.assets import assets, SOUND_FILES
+    from src.sprites import TEXTURES
+
+    start = time.perf_counter()
+    assets.preload(TEXTURES, SOUND_FILES.values())
+    elapsed = (time.perf_counter() - start) * 1000
+    print(json.dumps({"ms": elapsed, **assets.disk.report()}))
+
+
+def measure(cache_dir):
+    env = dict(os.environ, **{CACHE_DIR_ENV: cache_dir})
+    output = subprocess.run([sys.executable, "-m", "benchmarks.startup", "--child"], env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Старт с кэшем ресурсов на диске и без него")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return
+
+    cold = []
+    warm = []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cold.append(measure(cache_dir))
+            warm.append(measure(cache_dir))
+    for name, runs in (("холодный", cold), ("теплый", warm)):
+        print(f"{name}: {statistics.median(run['ms'] for run in runs):.1f} мс (медиана из {len(runs)}), "
+              f"попаданий {runs[-1]['hits']}, промахов {runs[-1]['misses']}")
+
+
+if __name__ == "__main__":
+    main()
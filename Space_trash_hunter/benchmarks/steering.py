@@ -0,0 +1,66 @@
+"""
+Обновление врагов: update() каждого спрайта против пакетного SteeringEngine (NumPy).
+Запуск: python -m benchmarks.steering
+"""
+import random
+import time
+
+import arcade
+
+from src.sprites import Player, ChaserEnemy, ShooterEnemy, KamikazeEnemy
+from src.spatial import SpatialGrid
+from src.steering import SteeringEngine
+
+COUNTS = (50, 200, 500, 1000)
+TICKS = 60
+DELTA_TIME = 1 / 60
+
+
+def build_horde(count):
+    # Смесь как в позднем выживании: 40% преследователей, 30% стрелков, 30% камикадзе
+    rng = random.Random(count)
+    player = Player()
+    enemies = arcade.SpriteList()
+    bullets = arcade.SpriteList()
+    grid = SpatialGrid(cell_size=64)
+    half = 40 * count ** 0.5
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.4:
+            enemy = ChaserEnemy(player, enemies)
+        elif roll < 0.7:
+            enemy = ShooterEnemy(player, enemies, bullets)
+        else:
+            enemy = KamikazeEnemy(player, enemies)
+        enemy.center_x = rng.uniform(-half, half)
+        enemy.center_y = rng.uniform(-half, half)
+        enemy.grid = grid
+        enemies.append(enemy)
+    return player, enemies, grid
+
+
+def measure(count, engine):
+    player, enemies, grid = build_horde(count)
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        grid.rebuild(enemies)
+        if engine:
+            engine.update(enemies, player, DELTA_TIME)
+        else:
+            enemies.update(DELTA_TIME)
+    return (time.perf_counter() - start) / TICKS * 1000
+
+
+def main():
+    if not SteeringEngine.available():
+        print("NumPy не установлен - пакетный режим недоступен")
+        return
+    print(f"{'врагов':>8} {'update(), мс':>13} {'NumPy, мс':>10} {'мкс/враг':>9}")
+    for count in COUNTS:
+        plain = measure(count, None)
+        batched = measure(count, SteeringEngine())
+        print(f"{count:>8} {plain:>13.3f} {batched:>10.3f} {batched * 1000 / count:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
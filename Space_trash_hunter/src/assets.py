@@ -0,0 +1,145 @@
+"""
+Общий реестр ресурсов на весь процесс.
+Каждая текстура (вместе с хитбоксом, который arcade считает по пикселям)
+и каждый звук загружаются ровно один раз - при старте через preload()
+или лениво при первом обращении. Спрайты берут готовые Texture отсюда,
+поэтому повторный вход в уровень или возврат в меню не читает диск.
+
+Между запусками хитбоксы и декодированные звуковые эффекты берутся из
+кэша на диске (src/diskcache.py): первый запуск считает и сохраняет их,
+следующие только сверяют хэш файла. Музыка сюда не относится - она
+и так не декодируется заранее, а идет потоком (stream).
+"""
+import time
+
+import arcade
+from PIL import Image
+from pyglet import media
+from pyglet.media import StaticSource
+from pyglet.util import DecodeException
+
+from src.diskcache import DiskCache, MappedSource, file_key
+
+# Звуковые эффекты (встроенные ресурсы arcade). Ключи совпадают с именами, которые мир кладет в sound_events.
+SOUND_FILES = {
+    "laser": ":resources:sounds/laser2.wav",
+    "enemy_laser": ":resources:sounds/laser4.wav",
+    "explosion": ":resources:sounds/explosion2.wav",
+    "hit": ":resources:sounds/hit2.wav",
+    "collect": ":resources:sounds/coin1.wav",
+    "heal": ":resources:sounds/upgrade1.wav",
+}
+
+
+class AssetRegistry:
+    def __init__(self):
+        self.textures = {}
+        self.sounds = {}
+        # Метрики: сколько секунд ушло на загрузку каждого ресурса и сколько он весит в памяти
+        self.load_times = {}
+        self.sizes = {}
+        self.hits = 0
+        self.misses = 0
+        self.disk = DiskCache()
+
+    def texture(self, path):
+        texture = self.textures.get(path)
+        if texture is not None:
+            self.hits += 1
+            return texture
+        self.misses += 1
+        start = time.perf_counter()
+        texture = self.load_texture(path)
+        self.load_times[path] = time.perf_counter() - start
+        self.sizes[path] = texture.width * texture.height * 4
+        self.textures[path] = texture
+        return texture
+
+    def sound(self, path, streaming=False):
+        # Отсутствующий файл - не ошибка (музыки уровня 4, например, нет): кэшируем None
+        if path in self.sounds:
+            self.hits += 1
+            return self.sounds[path]
+        self.misses += 1
+        start = time.perf_counter()
+        try:
+            sound = arcade.load_sound(path, streaming=True) if streaming else self.load_sound(path)
+        except FileNotFoundError:
+            sound = None
+        self.load_times[path] = time.perf_counter() - start
+        self.sizes[path] = self.sound_size(sound)
+        self.sounds[path] = sound
+        return sound
+
+    def load_texture(self, path):
+        # То же, что arcade.load_texture, но хитбокс по пикселям считается только при промахе кэша
+        file_path = arcade.resources.resolve(path)
+        key = file_key(file_path)
+        algorithm = arcade.hitbox.algo_default
+        points = self.disk.hit_box(key, algorithm)
+        image = Image.open(file_path)
+        if image.mode != "RGBA":
+            image = image.convert("RGBA")
+        texture = arcade.Texture(image, hit_box_algorithm=algorithm, hit_box_points=points)
+        texture.file_path = file_path
+        if points is None:
+            self.disk.store_hit_box(key, algorithm, texture.hit_box_points)
+        return texture
+
+    def load_sound(self, path):
+        # Звук целиком в памяти: PCM из кэша на диске, а при промахе - декодируем и сохраняем
+        file_path = arcade.resources.resolve(path)
+        key = file_key(file_path)
+        media.get_audio_driver()
+        sound = self.disk.sound(key, file_path)
+        if sound is None:
+            try:
+                sound = self.disk.store_sound(key, file_path, media.load(str(file_path), streaming=True))
+            except DecodeException:
+                sound = None
+        if sound is None:
+            # Кэш недоступен (нет прав на каталог, нет места): грузим как раньше
+            sound = arcade.load_sound(path)
+        return sound
+
+    def stream(self, path):
+        # Потоковый звук (музыка): файл декодируется кусками во время проигрывания.
+        # Поток можно проиграть только один раз, поэтому он не кэшируется - каждый
+        # вызов открывает файл заново (это дешево: читается только заголовок).
+        start = time.perf_counter()
+        try:
+            sound = arcade.load_sound(path, streaming=True)
+        except FileNotFoundError:
+            sound = None
+        self.load_times[path] = time.perf_counter() - start
+        self.sizes[path] = 0
+        return sound
+
+    @staticmethod
+    def sound_size(sound):
+        # Размер декодированного PCM (для потоковых звуков в памяти лежит только буфер)
+        if sound is None or not isinstance(sound.source, (StaticSource, MappedSource)):
+            return 0
+        fmt = sound.source.audio_format
+        return int(sound.source.duration * fmt.sample_rate * fmt.channels * fmt.sample_size / 8)
+
+    def preload(self, textures=(), sounds=()):
+        for path in textures:
+            self.texture(path)
+        for path in sounds:
+            self.sound(path)
+
+    def report(self):
+        return {
+            "textures": len(self.textures),
+            "sounds": len([s for s in self.sounds.values() if s is not None]),
+            "load_seconds": round(sum(self.load_times.values()), 4),
+            "memory_bytes": sum(self.sizes.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_cache": self.disk.report(),
+        }
+
+
+# Единственный реестр на процесс
+assets = AssetRegistry()
@@ -0,0 +1,174 @@
+"""
+Звездный фон. Вместо сотен отдельных спрайтов Star звезды один раз
+генерируются из сида в статичные вершинные буферы: несколько вариантов
+"плитки" на каждый слой параллакса. Каждый кадр рисуются только плитки
+под камерой (одна инстанс-отрисовка на плитку), поэтому стоимость фона
+не зависит ни от плотности звезд, ни от размера мира. Прозрачные области
+плиток не рисуются вовсе - на слабой встроенной графике это важно.
+"""
+import math
+import random
+from array import array
+
+from PIL import Image
+
+from src.assets import assets
+from src.sprites import TEXTURE_SPARK
+
+STAR_TEXTURE = TEXTURE_SPARK
+
+VERTEX_SHADER = """
+#version 330
+
+uniform WindowBlock {
+    mat4 projection;
+    mat4 view;
+} window;
+
+// Левый нижний угол плитки в мире (уже со сдвигом параллакса)
+uniform vec2 offset;
+
+in vec2 in_vert;
+in vec2 in_pos;
+in float in_size;
+in float in_alpha;
+
+out vec2 v_uv;
+out float v_alpha;
+
+void main() {
+    vec2 pos = offset + in_pos + in_vert * in_size;
+    gl_Position = window.projection * window.view * vec4(pos, 0.0, 1.0);
+    v_uv = in_vert + 0.5;
+    v_alpha = in_alpha;
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 330
+
+uniform sampler2D star;
+
+in vec2 v_uv;
+in float v_alpha;
+
+out vec4 out_color;
+
+void main() {
+    vec4 color = texture(star, v_uv);
+    out_color = vec4(color.rgb, color.a * v_alpha);
+}
+"""
+
+
+class StarLayer:
+    """
+    Один слой параллакса.
+    parallax: 1.0 - звезды неподвижны в мире (как старые Star), меньше - слой
+    "дальше" и сдвигается медленнее камеры.
+    """
+
+    def __init__(self, parallax, stars_per_tile, scale, alpha_range):
+        self.parallax = parallax
+        self.stars_per_tile = stars_per_tile
+        self.scale = scale
+        self.alpha_range = alpha_range
+        # Для каждого варианта плитки: array('f') по 4 числа на звезду (x, y, размер, прозрачность)
+        self.variants = []
+        self.geometries = []
+
+
+class Starfield:
+    TILE_SIZE = 512
+    # Сколько разных плиток на слой: плитки выбираются по координатам, чтобы узор не повторялся явно
+    VARIANTS = 4
+    # Размер текстуры звезды в пикселях (meteorGrey_tiny1)
+    STAR_PIXELS = 18
+
+    def __init__(self, seed=0):
+        self.seed = seed
+        self.layers = [
+            StarLayer(parallax=0.25, stars_per_tile=4, scale=0.25, alpha_range=(30, 110)),
+            StarLayer(parallax=0.55, stars_per_tile=2, scale=0.3, alpha_range=(40, 140)),
+            StarLayer(parallax=1.0, stars_per_tile=3, scale=0.4, alpha_range=(50, 180)),
+        ]
+        # Доля звезд, которые рисуем (1.0 - все); позволяет разредить фон без перегенерации
+        self.density = 1.0
+        self.tiles_drawn = 0
+        self._gpu = None
+        self.generate()
+
+    def generate(self):
+        # Генерация звезд из сида. Делается один раз, дальше только отрисовка готовых буферов.
+        size = self.TILE_SIZE
+        for index, layer in enumerate(self.layers):
+            star_size = self.STAR_PIXELS * layer.scale
+            layer.variants = []
+            for variant in range(self.VARIANTS):
+                rng = random.Random(f"{self.seed}:{index}:{variant}")
+                stars = array("f")
+                for _ in range(layer.stars_per_tile):
+                    alpha = rng.randint(*layer.alpha_range) / 255
+                    stars.extend((rng.uniform(0, size), rng.uniform(0, size), star_size, alpha))
+                layer.variants.append(stars)
+
+    def variant_of(self, cx, cy):
+        return ((cx * 73856093) ^ (cy * 19349663) ^ self.seed) % self.VARIANTS
+
+    def draw(self, camera):
+        # Рисуем в мировой камере. Слой с параллаксом p сдвинут на позицию камеры * (1 - p).
+        import arcade
+
+        ctx = arcade.get_window().ctx
+        if self._gpu is None:
+            self._gpu = self._create_gpu_objects(ctx)
+        program, star_texture = self._gpu
+
+        size = self.TILE_SIZE
+        # Звезда у края плитки может выступать за него на полразмера
+        margin = self.STAR_PIXELS
+        cam_x, cam_y = camera.position
+        star_texture.use(0)
+        ctx.enable(ctx.BLEND)
+        tiles = 0
+        for layer in self.layers:
+            count = int(layer.stars_per_tile * self.density)
+            if count <= 0:
+                continue
+            shift_x = cam_x * (1 - layer.parallax)
+            shift_y = cam_y * (1 - layer.parallax)
+            min_cx = int(math.floor((camera.left - margin - shift_x) / size))
+            max_cx = int(math.floor((camera.right + margin - shift_x) / size))
+            min_cy = int(math.floor((camera.bottom - margin - shift_y) / size))
+            max_cy = int(math.floor((camera.top + margin - shift_y) / size))
+            for cx in range(min_cx, max_cx + 1):
+                for cy in range(min_cy, max_cy + 1):
+                    program["offset"] = (cx * size + shift_x, cy * size + shift_y)
+                    layer.geometries[self.variant_of(cx, cy)].render(program, instances=count)
+                    tiles += 1
+        ctx.disable(ctx.BLEND)
+        self.tiles_drawn = tiles
+
+    def _create_gpu_objects(self, ctx):
+        from arcade.gl import BufferDescription
+
+        program = ctx.program(vertex_shader=VERTEX_SHADER, fragment_shader=FRAGMENT_SHADER)
+        program["star"] = 0
+        # В OpenGL строки текстуры идут снизу вверх
+        image = assets.texture(STAR_TEXTURE).image.convert("RGBA").transpose(Image.Transpose.FLIP_TOP_BOTTOM)
+        star_texture = ctx.texture(image.size, components=4, data=image.tobytes())
+
+        quad = ctx.buffer(data=array("f", [-0.5, 0.5, -0.5, -0.5, 0.5, 0.5, 0.5, -0.5]))
+        for layer in self.layers:
+            layer.geometries = []
+            for stars in layer.variants:
+                geometry = ctx.geometry(
+                    [
+                        BufferDescription(quad, "2f", ["in_vert"]),
+                        BufferDescription(ctx.buffer(data=stars), "2f 1f 1f", ["in_pos", "in_size", "in_alpha"],
+                                          instanced=True),
+                    ],
+                    mode=ctx.TRIANGLE_STRIP,
+                )
+                layer.geometries.append(geometry)
+        return program, star_texture
@@ -0,0 +1,257 @@
+"""
+Балансировка методом Монте-Карло: тысячи забегов без окна на всех ядрах.
+Каждая задача пула - одна игра с собственным сидом (src/rng.py), так что
+любой забег из отчета можно повторить. По каждому уровню собирается:
+доля побед, время до цели, причины смерти, распределение счета и за сколько
+секунд бот набирает каждые MILESTONE очков - по этой таблице удобно выбирать
+LEVEL_GOALS и кривую enemy_limit.
+
+Боты:
+  collector - летит к ближайшему ящику, стреляет по врагам перед носом;
+  random    - держит случайное сочетание клавиш случайное число тиков;
+  idle      - ничего не нажимает.
+
+Запуск:
+  python -m src.balance                                # уровни 1-4 по 1000 забегов, все ядра
+  python -m src.balance --levels 3 --runs 10000 --policy random
+  python -m src.balance --levels 2 --goal 3000 --json balance.json
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+from src.world import World, Inputs, TICK_RATE
+
+DELTA_TIME = 1 / TICK_RATE
+# Предел длины одного забега (секунд игры): дальше забег считается "timeout"
+MAX_SECONDS = 300
+# Шаг таблицы "за сколько секунд набрано N очков"
+MILESTONE = 500
+
+
+# ==========================================
+#                   БОТЫ
+# ==========================================
+def heading_error(player, x, y):
+    # На сколько радиан надо повернуть нос корабля к точке (плюс - против часовой стрелки)
+    heading = math.radians(-player.angle + 90)
+    want = math.atan2(y - player.center_y, x - player.center_x)
+    return (want - heading + math.pi) % (2 * math.pi) - math.pi
+
+
+def nearest(sprites, player):
+    best = None
+    best_dist = float("inf")
+    for sprite in sprites:
+        dx = sprite.center_x - player.center_x
+        dy = sprite.center_y - player.center_y
+        dist = dx * dx + dy * dy
+        if dist < best_dist:
+            best = sprite
+            best_dist = dist
+    return best, math.sqrt(best_dist)
+
+
+class CollectorBot:
+    # Дистанция, с которой бот начинает стрелять по врагу перед собой
+    FIRE_RANGE = 500
+    # Пауза между выстрелами в тиках (как человек, который часто жмет пробел)
+    FIRE_COOLDOWN = 8
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.cooldown = 0
+
+    def __call__(self, world):
+        player = world.player_sprite
+        turn = 0
+        thrust = False
+        target, _ = nearest(world.trash_list, player)
+        if target is not None:
+            error = heading_error(player, target.center_x, target.center_y)
+            # change_angle > 0 поворачивает по часовой стрелке
+            if abs(error) > 0.15:
+                turn = -1 if error > 0 else 1
+            thrust = abs(error) < 0.6
+
+        fire = False
+        self.cooldown -= 1
+        enemy, dist = nearest(world.enemy_list, player)
+        if enemy is not None and dist < self.FIRE_RANGE and self.cooldown <= 0:
+            if abs(heading_error(player, enemy.center_x, enemy.center_y)) < 0.25:
+                fire = True
+                self.cooldown = self.FIRE_COOLDOWN
+        return Inputs(thrust=thrust, turn=turn, fire=fire)
+
+
+class RandomBot:
+    def __init__(self, rng):
+        self.rng = rng
+        self.inputs = Inputs()
+        self.hold = 0
+
+    def __call__(self, world):
+        if self.hold <= 0:
+            rng = self.rng
+            self.inputs = Inputs(thrust=rng.random() < 0.6, turn=rng.choice((-1, 0, 0, 1)),
+                                 fire=rng.random() < 0.3)
+            self.hold = rng.randint(10, 60)
+        self.hold -= 1
+        return self.inputs
+
+
+class IdleBot:
+    def __init__(self, rng):
+        self.inputs = Inputs()
+
+    def __call__(self, world):
+        return self.inputs
+
+
+POLICIES = {
+    "collector": CollectorBot,
+    "random": RandomBot,
+    "idle": IdleBot,
+}
+
+
+# ==========================================
+#            ОДИН ЗАБЕГ (в процессе пула)
+# ==========================================
+def play(task):
+    level, seed, policy_name, max_ticks, goal = task
+    world = World(level, seed)
+    world.setup()
+    if goal is not None:
+        world.target_score = goal
+    # Бот берет случайность не из потоков мира, чтобы не сдвигать их
+    policy = POLICIES[policy_name](random.Random(seed ^ 0x5EED))
+    milestones = []
+    next_milestone = MILESTONE
+    result = None
+    while world.tick < max_ticks:
+        result = world.step(DELTA_TIME, policy(world))
+        world.sound_events.clear()
+        while world.score >= next_milestone:
+            milestones.append(world.tick)
+            next_milestone += MILESTONE
+        if result:
+            break
+    return {
+        "level": level,
+        "seed": seed,
+        "result": result or "timeout",
+        "ticks": world.tick,
+        "score": world.score,
+        "cause": world.last_damage if result == "defeat" else None,
+        "milestones": milestones,
+    }
+
+
+# ==========================================
+#                  СВОДКА
+# ==========================================
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def spread(values, scale=1.0, digits=1):
+    # p10/p50/p90/среднее; None, если значений нет
+    if not values:
+        return None
+    return {
+        "p10": round(percentile(values, 0.10) * scale, digits),
+        "p50": round(percentile(values, 0.50) * scale, digits),
+        "p90": round(percentile(values, 0.90) * scale, digits),
+        "mean": round(sum(values) / len(values) * scale, digits),
+    }
+
+
+def summarize(games):
+    seconds = 1 / TICK_RATE
+    results = Counter(game["result"] for game in games)
+    wins = [game for game in games if game["result"] == "win"]
+    deaths = [game for game in games if game["result"] == "defeat"]
+    # За сколько секунд набрано N очков - только по забегам, которые до N дошли
+    reached = {}
+    for game in games:
+        for index, tick in enumerate(game["milestones"]):
+            reached.setdefault((index + 1) * MILESTONE, []).append(tick)
+    return {
+        "runs": len(games),
+        "results": dict(results),
+        "win_rate": round(len(wins) / len(games), 4),
+        "time_to_goal_s": spread([game["ticks"] for game in wins], seconds),
+        "survival_s": spread([game["ticks"] for game in deaths], seconds),
+        "death_causes": dict(Counter(game["cause"] for game in deaths)),
+        "score": spread([game["score"] for game in games], digits=0),
+        "score_reached": {score: {"share": round(len(ticks) / len(games), 4),
+                                  "p50_s": round(percentile(ticks, 0.5) * seconds, 1)}
+                          for score, ticks in sorted(reached.items())},
+    }
+
+
+def print_report(level, summary):
+    print(f"\n=== Уровень {level}: {summary['runs']} забегов ===")
+    print(f"исходы: {summary['results']}  (побед {summary['win_rate']:.1%})")
+    if summary["time_to_goal_s"]:
+        print(f"время до цели, с: {summary['time_to_goal_s']}")
+    if summary["survival_s"]:
+        print(f"время до смерти, с: {summary['survival_s']}")
+    if summary["death_causes"]:
+        print(f"причины смерти: {summary['death_causes']}")
+    print(f"счет: {summary['score']}")
+    for score, row in summary["score_reached"].items():
+        print(f"  {score:>6} очков: {row['share']:6.1%} забегов, медиана {row['p50_s']:7.1f} с")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Монте-Карло забеги ботом для балансировки уровней")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 3, 4])
+    parser.add_argument("--runs", type=int, default=1000, help="забегов на уровень")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="collector")
+    parser.add_argument("--seed", type=int, default=0, help="сид первого забега, дальше подряд")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="процессов (по умолчанию все ядра)")
+    parser.add_argument("--max-seconds", type=float, default=MAX_SECONDS, help="предел длины забега")
+    parser.add_argument("--goal", type=int, default=None, help="подменить LEVEL_GOALS для проверки другой цели")
+    parser.add_argument("--json", help="записать сводку и все забеги в файл")
+    args = parser.parse_args()
+
+    max_ticks = int(args.max_seconds * TICK_RATE)
+    tasks = [(level, args.seed + i, args.policy, max_ticks, args.goal)
+             for level in args.levels for i in range(args.runs)]
+    games = {level: [] for level in args.levels}
+    start = time.perf_counter()
+    # Задачи мелкие и одинаковые по смыслу, но разные по длине: раздаем пачками без порядка
+    chunksize = max(1, len(tasks) // (args.workers * 16))
+    with multiprocessing.Pool(args.workers) as pool:
+        for done, game in enumerate(pool.imap_unordered(play, tasks, chunksize), 1):
+            games[game["level"]].append(game)
+            if done % 100 == 0 or done == len(tasks):
+                elapsed = time.perf_counter() - start
+                print(f"\r{done}/{len(tasks)} забегов, {elapsed:.0f} с", end="", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+    print(f"\nГотово за {elapsed:.1f} с на {args.workers} процессах", file=sys.stderr)
+
+    for level_games in games.values():
+        level_games.sort(key=lambda game: game["seed"])
+    report = {level: summarize(level_games) for level, level_games in games.items()}
+    for level, summary in report.items():
+        print_report(level, summary)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"policy": args.policy, "max_seconds": args.max_seconds, "goal": args.goal,
+                       "summary": report, "games": games}, f, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
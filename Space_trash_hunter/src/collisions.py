@@ -0,0 +1,237 @@
+"""
+Broadphase: одна стадия, которая раскладывает цели по сетке и для каждого
+"подвижного" объекта (пули, игрока) находит только близких кандидатов.
+Точная проверка полигонов (arcade.check_for_collision) потом запускается
+только на этих парах, а не на всех пулях x всех врагов.
+
+Проверка непрерывная (swept_hit): пуля за тик пролетает 6-12 px и больше, а
+при длинном тике (низкий TICK_RATE, перемотка без окна) - десятки пикселей,
+и проверка только в конечной точке пропускала попадания "насквозь" в мелких
+камикадзе и в игрока. Поэтому подвижный объект проверяется еще и по пути
+за тик: отрезок от прошлой позиции до текущей (step_x, step_y) против
+полигона цели. Broadphase тоже ищет кандидатов вдоль этого отрезка.
+"""
+import math
+
+import arcade
+
+# Слои пар, которые находит broadphase
+PLAYER_BULLET_ENEMY = "player_bullet/enemy"
+PLAYER_BULLET_ASTEROID = "player_bullet/asteroid"
+ENEMY_BULLET_PLAYER = "enemy_bullet/player"
+PLAYER_REPAIR = "player/repair"
+PLAYER_TRASH = "player/trash"
+PLAYER_ASTEROID = "player/asteroid"
+PLAYER_ENEMY = "player/enemy"
+
+
+def bounding_radius(sprite):
+    # Та же оценка радиуса, что и в arcade.check_for_collision (половина диагонали)
+    width = sprite.width
+    height = sprite.height
+    return (width if width > height else height) * 0.71
+
+
+def thickness(sprite):
+    # Полтолщины объекта: на столько путь центра может пройти мимо полигона и все же задеть его
+    width = sprite.width
+    height = sprite.height
+    return (width if width < height else height) * 0.5
+
+
+def point_in_polygon(x, y, points):
+    inside = False
+    ax, ay = points[-1]
+    for bx, by in points:
+        if (ay > y) != (by > y) and x < (bx - ax) * (y - ay) / (by - ay) + ax:
+            inside = not inside
+        ax, ay = bx, by
+    return inside
+
+
+def point_segment_distance_sq(px, py, ax, ay, bx, by):
+    dx = bx - ax
+    dy = by - ay
+    length_sq = dx * dx + dy * dy
+    t = 0.0
+    if length_sq > 0:
+        t = ((px - ax) * dx + (py - ay) * dy) / length_sq
+        t = 0.0 if t < 0 else (1.0 if t > 1 else t)
+    ex = ax + dx * t - px
+    ey = ay + dy * t - py
+    return ex * ex + ey * ey
+
+
+def segments_distance_sq(ax, ay, bx, by, cx, cy, dx, dy):
+    # Квадрат расстояния между отрезками AB и CD (0, если пересекаются)
+    d1 = (dx - cx) * (ay - cy) - (dy - cy) * (ax - cx)
+    d2 = (dx - cx) * (by - cy) - (dy - cy) * (bx - cx)
+    d3 = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+    d4 = (bx - ax) * (dy - ay) - (by - ay) * (dx - ax)
+    if ((d1 > 0) != (d2 > 0)) and ((d3 > 0) != (d4 > 0)):
+        return 0.0
+    return min(point_segment_distance_sq(ax, ay, cx, cy, dx, dy),
+               point_segment_distance_sq(bx, by, cx, cy, dx, dy),
+               point_segment_distance_sq(cx, cy, ax, ay, bx, by),
+               point_segment_distance_sq(dx, dy, ax, ay, bx, by))
+
+
+def swept_hit(mover, target, dx, dy):
+    """
+    Столкновение с учетом пути за тик. dx, dy - сдвиг mover относительно target
+    за этот тик. Сначала обычная проверка в конечной точке (как раньше), потом -
+    не прошел ли mover цель насквозь: путь его центра против полигона цели,
+    расширенного на полтолщины mover.
+    """
+    if arcade.check_for_collision(mover, target):
+        return True
+    radius = thickness(mover)
+    if dx * dx + dy * dy <= radius * radius:
+        # Короткий шаг: конечной проверки этого и прошлого тика достаточно
+        return False
+    x1 = mover.center_x
+    y1 = mover.center_y
+    x0 = x1 - dx
+    y0 = y1 - dy
+    # Дешевый отсев: отрезок дальше радиуса цели
+    limit = bounding_radius(target) + radius
+    if point_segment_distance_sq(target.center_x, target.center_y, x0, y0, x1, y1) > limit * limit:
+        return False
+    points = target.hit_box.get_adjusted_points()
+    if point_in_polygon(x0, y0, points):
+        return True
+    radius_sq = radius * radius
+    ax, ay = points[-1]
+    for bx, by in points:
+        if segments_distance_sq(x0, y0, x1, y1, ax, ay, bx, by) <= radius_sq:
+            return True
+        ax, ay = bx, by
+    return False
+
+
+class Broadphase:
+    """
+    Сетка строится заново каждый тик для каждого слоя целей.
+    pairs() возвращает {подвижный объект: [цели]}; цели в каждом списке идут
+    в том же порядке, что и в своем SpriteList, поэтому разбор столкновений
+    детерминирован и совпадает со старым check_for_collision_with_list.
+    Подвижный объект ищет цели вокруг середины своего пути за тик (step_x, step_y);
+    margin - на сколько за тик могли сдвинуться сами цели.
+    """
+
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        # Сколько пар дошло до точной проверки за последний тик (для профилирования)
+        self.candidate_count = 0
+        # Пули игрока в порядке bullet_list - в этом порядке World разбирает их попадания
+        self.player_bullets = []
+
+    # Для одного-двух подвижных объектов (игрок) строить сетку дороже, чем пройти список
+    GRID_MIN_MOVERS = 3
+
+    def pairs(self, movers, targets, margin=0):
+        found = {}
+        if not movers or not targets:
+            return found
+        if len(movers) < self.GRID_MIN_MOVERS:
+            for mover in movers:
+                hits = self.scan(mover, targets, margin)
+                if hits:
+                    found[mover] = hits
+            return found
+
+        size = self.cell_size
+        cells = {}
+        radii = []
+        max_radius = 0
+        for index, target in enumerate(targets):
+            radius = bounding_radius(target)
+            radii.append(radius)
+            if radius > max_radius:
+                max_radius = radius
+            key = (int(math.floor(target.center_x / size)), int(math.floor(target.center_y / size)))
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [index]
+            else:
+                bucket.append(index)
+
+        for mover in movers:
+            mx, my, mover_radius = self.reach(mover, margin)
+            reach = mover_radius + max_radius
+            min_cx = int(math.floor((mx - reach) / size))
+            max_cx = int(math.floor((mx + reach) / size))
+            min_cy = int(math.floor((my - reach) / size))
+            max_cy = int(math.floor((my + reach) / size))
+            near = []
+            for cx in range(min_cx, max_cx + 1):
+                for cy in range(min_cy, max_cy + 1):
+                    bucket = cells.get((cx, cy))
+                    if bucket:
+                        near.extend(bucket)
+            if not near:
+                continue
+
+            hits = []
+            for index in sorted(near):
+                target = targets[index]
+                if target is mover:
+                    continue
+                limit = mover_radius + radii[index]
+                dx = target.center_x - mx
+                dy = target.center_y - my
+                if dx * dx + dy * dy <= limit * limit:
+                    hits.append(target)
+            if hits:
+                found[mover] = hits
+                self.candidate_count += len(hits)
+        return found
+
+    @staticmethod
+    def reach(mover, margin):
+        # Круг, накрывающий весь путь объекта за тик: центр в середине пути
+        step_x = mover.step_x
+        step_y = mover.step_y
+        half_path = math.sqrt(step_x * step_x + step_y * step_y) * 0.5
+        return (mover.center_x - step_x * 0.5, mover.center_y - step_y * 0.5,
+                bounding_radius(mover) + half_path + margin)
+
+    def scan(self, mover, targets, margin=0):
+        # Простой проход по списку с той же проверкой радиусов
+        mx, my, mover_radius = self.reach(mover, margin)
+        hits = []
+        for target in targets:
+            if target is mover:
+                continue
+            limit = mover_radius + bounding_radius(target)
+            dx = target.center_x - mx
+            dy = target.center_y - my
+            if dx * dx + dy * dy <= limit * limit:
+                hits.append(target)
+        self.candidate_count += len(hits)
+        return hits
+
+    def collect(self, player, bullets, enemies, asteroids, trash, repairs, skip=(), enemy_margin=0):
+        # Все пары кандидатов за тик, сгруппированные по слоям.
+        # skip - уже уничтоженные в этом тике пули (истекшие), они ни во что не попадают.
+        # enemy_margin - самый большой сдвиг врага за тик (враги тоже движутся навстречу).
+        self.candidate_count = 0
+        player_bullets = self.player_bullets = []
+        enemy_bullets = []
+        for bullet in bullets:
+            if bullet in skip:
+                continue
+            if bullet.is_enemy:
+                enemy_bullets.append(bullet)
+            else:
+                player_bullets.append(bullet)
+        players = [player]
+        return {
+            PLAYER_REPAIR: self.pairs(players, repairs).get(player, []),
+            PLAYER_BULLET_ENEMY: self.pairs(player_bullets, enemies, enemy_margin),
+            PLAYER_BULLET_ASTEROID: self.pairs(player_bullets, asteroids),
+            ENEMY_BULLET_PLAYER: self.pairs(enemy_bullets, players, math.hypot(player.step_x, player.step_y)),
+            PLAYER_TRASH: self.pairs(players, trash).get(player, []),
+            PLAYER_ASTEROID: self.pairs(players, asteroids).get(player, []),
+            PLAYER_ENEMY: self.pairs(players, enemies, enemy_margin).get(player, []),
+        }
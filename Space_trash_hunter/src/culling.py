@@ -0,0 +1,101 @@
+"""
+Отсечение по камере: рисуем только то, что попадает в окно (плюс запас).
+Каждый слой мира раскладывается по крупным чанкам - отдельным SpriteList
+на клетку CHUNK_SIZE x CHUNK_SIZE. Запрос видимости - это просто перечисление
+чанков под камерой, а рисуются только их SpriteList.
+Логические списки мира (World.*_list) не трогаем: чанки - дополнительные
+списки только для отрисовки, remove_from_sprite_lists убирает спрайт и из них.
+Опустевшие чанки время от времени выбрасываются: в открытом мире (src/sectors.py)
+иначе их число (и GL-буферов при них) росло бы с пройденным расстоянием.
+"""
+import math
+
+import arcade
+
+# Раз во сколько sync() выбрасывать пустые чанки: не каждый кадр, чтобы пуля
+# на границе двух чанков не создавала и не удаляла SpriteList туда-обратно
+PRUNE_EVERY = 60
+
+
+class CulledLayer:
+    def __init__(self, source, chunk_size):
+        self.source = source
+        self.chunk_size = chunk_size
+        self.chunks = {}
+        self.syncs = 0
+        # Статистика последней отрисовки
+        self.drawn = 0
+        self.culled = 0
+
+    def chunk_key(self, sprite):
+        size = self.chunk_size
+        return int(math.floor(sprite.center_x / size)), int(math.floor(sprite.center_y / size))
+
+    def sync(self):
+        # Перекладываем спрайты, которые появились в слое или переехали в другой чанк.
+        # Спрайт помнит свой чанк; пуля из пула после возврата уже не в чанке,
+        # поэтому проверяем и ключ, и что чанк все еще среди его списков.
+        chunks = self.chunks
+        for sprite in self.source:
+            key = self.chunk_key(sprite)
+            chunk = getattr(sprite, "cull_chunk", None)
+            if chunk is not None and chunk[0] is self and chunk[1] == key and chunk[2] in sprite.sprite_lists:
+                continue
+            if chunk is not None and chunk[0] is self and chunk[2] in sprite.sprite_lists:
+                chunk[2].remove(sprite)
+            target = chunks.get(key)
+            if target is None:
+                target = chunks[key] = arcade.SpriteList()
+            target.append(sprite)
+            sprite.cull_chunk = (self, key, target)
+        self.syncs += 1
+        if self.syncs % PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self):
+        # Пустой чанк больше никому не нужен; спрайт, который в него вернется, получит новый
+        chunks = self.chunks
+        for key in [key for key, chunk in chunks.items() if not chunk]:
+            del chunks[key]
+
+    def draw(self, left, right, bottom, top):
+        size = self.chunk_size
+        drawn = 0
+        for cx in range(int(math.floor(left / size)), int(math.floor(right / size)) + 1):
+            for cy in range(int(math.floor(bottom / size)), int(math.floor(top / size)) + 1):
+                chunk = self.chunks.get((cx, cy))
+                if chunk:
+                    chunk.draw()
+                    drawn += len(chunk)
+        self.drawn = drawn
+        self.culled = len(self.source) - drawn
+
+
+class Culler:
+    """
+    Набор слоев с отсечением. margin - запас вокруг камеры в пикселях мира,
+    чтобы крупные спрайты с центром за краем экрана не пропадали раньше времени.
+    """
+
+    CHUNK_SIZE = 512
+
+    def __init__(self, layers, margin=128):
+        # layers: {имя: SpriteList}
+        self.margin = margin
+        self.layers = {name: CulledLayer(sprite_list, self.CHUNK_SIZE) for name, sprite_list in layers.items()}
+        self.bounds = (0, 0, 0, 0)
+
+    def begin(self, camera):
+        # Границы видимой области на этот кадр
+        margin = self.margin
+        self.bounds = (camera.left - margin, camera.right + margin,
+                       camera.bottom - margin, camera.top + margin)
+
+    def draw(self, name):
+        layer = self.layers[name]
+        layer.sync()
+        layer.draw(*self.bounds)
+
+    def report(self):
+        # {слой: (нарисовано, отсечено)} за последний кадр
+        return {name: (layer.drawn, layer.culled) for name, layer in self.layers.items()}
@@ -0,0 +1,230 @@
+"""
+Кэш ресурсов на диске между запусками.
+AssetRegistry (src/assets.py) держит ресурсы в памяти только пока жив
+процесс, а каждый новый запуск (и каждый процесс src/balance.py) заново
+декодирует звуки в PCM и считает хитбоксы по пикселям текстур. Здесь
+результаты этой работы сохраняются в пользовательский каталог кэша:
+
+  хитбоксы - в index.json, по хэшу файла и имени алгоритма хитбокса;
+  звуки    - декодированный PCM в <хэш>.pcm (формат звука - в index.json),
+             при загрузке файл отображается в память (mmap), а не читается.
+
+Ключ - SHA-1 содержимого исходного файла, поэтому измененный ресурс сам
+получает новый ключ, а старая запись просто больше не используется.
+Каталог включает CACHE_VERSION и версии arcade/pyglet: смена формата
+кэша или библиотек начинает кэш с чистого листа.
+
+Кэш - только ускорение: любая ошибка чтения или записи означает промах,
+и ресурс грузится обычным путем.
+
+Запуск: python -m src.diskcache [--clear]   # где лежит кэш и сколько весит
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import arcade
+import pyglet
+from pyglet.media.codecs.base import AudioData, AudioFormat, Source
+
+# Версия формата кэша: поменять, если меняется раскладка файлов или index.json
+CACHE_VERSION = 1
+# Переменная окружения, чтобы увести кэш в другой каталог (тесты, бенчмарк холодного старта)
+CACHE_DIR_ENV = "SPACE_SCAVENGER_CACHE"
+INDEX_FILE = "index.json"
+
+
+def default_root():
+    if os.environ.get(CACHE_DIR_ENV):
+        return Path(os.environ[CACHE_DIR_ENV])
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local"))
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    return base / "space_scavenger"
+
+
+def file_key(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+class MappedSource(Source):
+    """
+    Полностью декодированный звук поверх отображенного в память PCM.
+    Ведет себя как StaticSource, но не наследует его: StaticSource сам
+    декодирует источник в конструкторе и копирует данные в io.BytesIO на
+    каждый запуск звука, а этот отдает плееру куски прямо из mmap.
+    У pyglet.media.Source нет своего __init__, все поля по умолчанию - в классе.
+    """
+
+    def __init__(self, data, audio_format):
+        self._data = data
+        self.audio_format = audio_format
+        self._duration = len(data) / audio_format.bytes_per_second
+
+    def get_queue_source(self):
+        return MappedQueueSource(self._data, self.audio_format)
+
+    def get_audio_data(self, num_bytes, compensation_time=0.0):
+        # Как у StaticSource: в плеер ставится не он сам, а get_queue_source()
+        raise RuntimeError("MappedSource cannot be queued.")
+
+
+class MappedQueueSource(Source):
+    def __init__(self, data, audio_format):
+        self._data = data
+        self._offset = 0
+        self._max_offset = len(data)
+        self.audio_format = audio_format
+        self._duration = len(data) / audio_format.bytes_per_second
+
+    def is_precise(self):
+        return True
+
+    def seek(self, timestamp):
+        offset = self.audio_format.align(int(timestamp * self.audio_format.bytes_per_second))
+        self._offset = min(offset, self._max_offset)
+
+    def get_audio_data(self, num_bytes, compensation_time=0.0):
+        offset = self._offset
+        if offset >= self._max_offset:
+            return None
+        # Копируется только этот кусок, а не весь звук
+        data = bytes(self._data[offset:offset + int(num_bytes)])
+        self._offset = offset + len(data)
+        bytes_per_second = self.audio_format.bytes_per_second
+        return AudioData(data, len(data), offset / bytes_per_second, len(data) / bytes_per_second)
+
+
+class CachedSound(arcade.Sound):
+    def __init__(self, file_name, source):
+        # arcade.Sound сам открывает файл: потоково это только чтение заголовка,
+        # а без декодирования. Открытый декодер сразу подменяем готовым источником.
+        super().__init__(file_name, streaming=True)
+        self.source.delete()
+        self.source = source
+
+
+class DiskCache:
+    def __init__(self, root=None):
+        versions = f"v{CACHE_VERSION}-arcade{arcade.version.VERSION}-pyglet{pyglet.version}"
+        self.root = Path(root or default_root()) / versions
+        self.index = None
+        # Статистика для отчета о старте
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.errors = 0
+
+    # ---------- индекс ----------
+    def load_index(self):
+        if self.index is None:
+            try:
+                with open(self.root / INDEX_FILE, encoding="utf-8") as f:
+                    self.index = json.load(f)
+            except (OSError, ValueError):
+                self.index = {}
+            self.index.setdefault("hit_boxes", {})
+            self.index.setdefault("sounds", {})
+        return self.index
+
+    def save_index(self):
+        # Запись через временный файл: параллельный процесс не увидит половину JSON
+        self.write(INDEX_FILE, json.dumps(self.index).encode("utf-8"))
+
+    def write(self, name, data):
+        self.root.mkdir(parents=True, exist_ok=True)
+        temp = self.root / f"{name}.{os.getpid()}.tmp"
+        with open(temp, "wb") as f:
+            f.write(data)
+        os.replace(temp, self.root / name)
+
+    # ---------- хитбоксы ----------
+    def hit_box(self, key, algorithm):
+        points = self.load_index()["hit_boxes"].get(f"{key}:{algorithm.cache_name}")
+        if points is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return tuple(tuple(point) for point in points)
+
+    def store_hit_box(self, key, algorithm, points):
+        self.load_index()["hit_boxes"][f"{key}:{algorithm.cache_name}"] = [list(point) for point in points]
+        try:
+            self.save_index()
+            self.stores += 1
+        except OSError:
+            self.errors += 1
+
+    # ---------- звуки ----------
+    def sound(self, key, file_name):
+        fmt = self.load_index()["sounds"].get(key)
+        if fmt is None:
+            self.misses += 1
+            return None
+        try:
+            data = self.map(f"{key}.pcm")
+        except (OSError, ValueError):
+            # Индекс есть, а PCM пропал или поврежден - считаем промахом
+            self.misses += 1
+            return None
+        self.hits += 1
+        channels, sample_size, sample_rate = fmt
+        return CachedSound(file_name, MappedSource(data, AudioFormat(channels, sample_size, sample_rate)))
+
+    def store_sound(self, key, file_name, source):
+        # Декодируем звук целиком и кладем PCM на диск. Возвращает звук уже поверх mmap.
+        fmt = source.audio_format
+        chunks = []
+        while True:
+            audio_data = source.get_audio_data(1 << 20)
+            if audio_data is None:
+                break
+            chunks.append(audio_data.data)
+        # Декодер больше не нужен: PCM уже в памяти
+        source.delete()
+        try:
+            self.write(f"{key}.pcm", b"".join(chunks))
+            self.load_index()["sounds"][key] = [fmt.channels, fmt.sample_size, fmt.sample_rate]
+            self.save_index()
+            self.stores += 1
+            return CachedSound(file_name, MappedSource(self.map(f"{key}.pcm"), fmt))
+        except (OSError, ValueError):
+            self.errors += 1
+            return None
+
+    def map(self, name):
+        with open(self.root / name, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            # Отображение живет и после закрытия файла
+            return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def report(self):
+        return {"hits": self.hits, "misses": self.misses, "stores": self.stores, "errors": self.errors}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Кэш ресурсов на диске")
+    parser.add_argument("--clear", action="store_true", help="удалить кэш всех версий")
+    args = parser.parse_args()
+    root = default_root()
+    if args.clear:
+        shutil.rmtree(root, ignore_errors=True)
+        print(f"Кэш удален: {root}")
+        return
+    files = [path for path in root.rglob("*") if path.is_file()] if root.exists() else []
+    size = sum(path.stat().st_size for path in files)
+    print(f"{root}: {len(files)} файлов, {size / 1024:.0f} КБ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Отложенное удаление объектов.
+Пока тик идет, уничтоженный объект (пуля, враг, астероид...) только
+помечается мертвым: World.kill кладет его на "кладбище", и все следующие
+проверки этого тика его пропускают (sprite in world.graveyard). В конце
+тика каждый список мира чистится от мертвых одним проходом, вместо
+remove_from_sprite_lists на каждый объект прямо посреди перебора
+(а это поиск по списку и сдвиг буферов SpriteList каждый раз).
+"""
+from array import array
+
+import arcade
+
+# Внутренности SpriteList, которые трогает compact(). Проверено на arcade 3.3.3
+# (закреплена в src/requirements.txt); если в другой версии чего-то из этого нет,
+# compact() удаляет по одному через SpriteList.remove.
+SPRITE_LIST_INTERNALS = ("sprite_list", "sprite_slot", "spatial_hash", "_sprite_index_data",
+                         "_sprite_buffer_free_slots", "_sprite_index_slots", "_sprite_index_changed")
+SPRITE_INTERNALS = ("_unregister_sprite_list",)
+
+
+def fast_compact_supported(sprite_list):
+    return (all(hasattr(sprite_list, name) for name in SPRITE_LIST_INTERNALS)
+            and all(hasattr(arcade.BasicSprite, name) for name in SPRITE_INTERNALS))
+
+
+def compact(sprite_list, dead):
+    """
+    Убирает из SpriteList все спрайты из множества dead за один проход,
+    сохраняя порядок живых. Работает с внутренними буферами SpriteList
+    (см. SPRITE_LIST_INTERNALS); если их нет - по одному через remove.
+    """
+    if not fast_compact_supported(sprite_list):
+        for sprite in [sprite for sprite in sprite_list if sprite in dead]:
+            sprite_list.remove(sprite)
+        return
+
+    slots = sprite_list.sprite_slot
+    index = sprite_list._sprite_index_data
+
+    survivors = []
+    removed = []
+    for sprite in sprite_list.sprite_list:
+        if sprite in dead:
+            removed.append(sprite)
+        else:
+            survivors.append(sprite)
+    if not removed:
+        return
+
+    free_slots = sprite_list._sprite_buffer_free_slots
+    spatial_hash = sprite_list.spatial_hash
+    for sprite in removed:
+        free_slots.append(slots.pop(sprite))
+        sprite._unregister_sprite_list(sprite_list)
+        if spatial_hash is not None:
+            spatial_hash.remove(sprite)
+
+    # Порядок отрисовки: слоты живых подряд, хвост обнуляем
+    count = len(survivors)
+    index[:count] = array(index.typecode, [slots[sprite] for sprite in survivors])
+    index[count:count + len(removed)] = array(index.typecode, [0] * len(removed))
+    sprite_list.sprite_list = survivors
+    sprite_list._sprite_index_slots = count
+    sprite_list._sprite_index_changed = True
+
+
+class Graveyard:
+    def __init__(self, layers):
+        # layers: {имя: SpriteList} - списки мира, из которых удаляем
+        self.layers = layers
+        self.dead = set()
+        self.pending = {name: [] for name in layers}
+        # Сколько удалено по спискам с прошлого drain_counts (GameView забирает раз в кадр)
+        self.counts = {name: 0 for name in layers}
+
+    def __contains__(self, sprite):
+        return sprite in self.dead
+
+    def kill(self, sprite, layer):
+        # Помечаем объект мертвым. False - он уже был помечен в этом тике.
+        if sprite in self.dead:
+            return False
+        self.dead.add(sprite)
+        self.pending[layer].append(sprite)
+        return True
+
+    def flush(self):
+        # Конец тика: каждый список чистится одним проходом
+        dead = self.dead
+        if not dead:
+            return
+        for name, sprites in self.pending.items():
+            if not sprites:
+                continue
+            compact(self.layers[name], dead)
+            for sprite in sprites:
+                # Остатки: чанки отсечения (src/culling.py), возврат пули в пул
+                sprite.remove_from_sprite_lists()
+            self.counts[name] += len(sprites)
+            sprites.clear()
+        dead.clear()
+
+    def clear(self):
+        # Забыть пометки (снимок мира восстанавливает списки целиком)
+        self.dead.clear()
+        for sprites in self.pending.values():
+            sprites.clear()
+
+    def drain_counts(self):
+        counts = self.counts
+        self.counts = {name: 0 for name in self.layers}
+        return counts
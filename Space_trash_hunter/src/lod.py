@@ -0,0 +1,96 @@
+"""
+Уровни детализации симуляции (LOD) для врагов и астероидов.
+Камера всегда на игроке, поэтому уровень объекта - это расстояние до игрока:
+
+  near - в кадре или рядом: полный update каждый тик;
+  mid  - за краем экрана: раз в 2 тика с двойным dt;
+  far  - далеко на арене: раз в 8 тиков с восьмикратным dt.
+
+mid и far у врагов идут через дешевый update_far (без тригонометрии,
+отталкивания, мерцания двигателя и покачивания камикадзе). Астероиды летят
+по прямой, так что им редкий шаг с большим dt ничего не меняет.
+
+Состояние LOD хранится в самих спрайтах (lod_tier, lod_last, lod_phase),
+поэтому снимок мира (src/replay.py) сохраняет его вместе с позициями.
+Время не теряется: объект получает ровно столько тиков, сколько прошло с
+его прошлого обновления (lod_last), даже если его уровень поменялся.
+"""
+NEAR = 0
+MID = 1
+FAR = 2
+TIER_NAMES = ("near", "mid", "far")
+# Раз во сколько тиков обновляется объект каждого уровня (на низком качестве реже, см. src/quality.py)
+INTERVALS = (1, 2, 8)
+# Границы уровней по расстоянию до игрока. Полдиагонали окна 1024x768 - 640 px,
+# плюс запас, чтобы объект успел перейти в near до появления на экране.
+NEAR_RADIUS = 1000
+MID_RADIUS = 2000
+
+
+class SimulationLOD:
+    def __init__(self, near_radius=NEAR_RADIUS, mid_radius=MID_RADIUS, intervals=INTERVALS):
+        self.near_radius = near_radius
+        self.mid_radius = mid_radius
+        self.intervals = intervals
+        # Сдвиг по тикам для новых объектов: дальние обновляются вразнобой, а не все в один тик
+        self.next_phase = 0
+        # {слой: [near, mid, far]} и сколько update реально вызвано за последний тик
+        self.counts = {}
+        self.updates = {}
+
+    def track(self, sprite, tick):
+        # Новый объект начинает в near и обновляется уже в этом тике, как раньше
+        sprite.lod_tier = NEAR
+        sprite.lod_last = tick - 1
+        sprite.lod_phase = self.next_phase
+        self.next_phase = (self.next_phase + 1) % self.intervals[-1]
+
+    def tier_of(self, sprite, px, py):
+        dx = sprite.center_x - px
+        dy = sprite.center_y - py
+        dist_sq = dx * dx + dy * dy
+        if dist_sq < self.near_radius * self.near_radius:
+            return NEAR
+        if dist_sq < self.mid_radius * self.mid_radius:
+            return MID
+        return FAR
+
+    def split(self, name, sprites, tick, player):
+        """
+        Кого обновлять в этом тике. Возвращает два списка пар (спрайт, тиков):
+        full - полный update (тиков больше 1, если объект только что вернулся в near
+        и сначала должен догнать пропущенное), cheap - дешевое обновление mid/far.
+        """
+        px = player.center_x
+        py = player.center_y
+        intervals = self.intervals
+        counts = [0, 0, 0]
+        full = []
+        cheap = []
+        for sprite in sprites:
+            tier = sprite.lod_tier
+            if tier != NEAR and (tick + sprite.lod_phase) % intervals[tier]:
+                # Еще не его тик
+                counts[tier] += 1
+                continue
+            tier = self.tier_of(sprite, px, py)
+            ticks = tick - sprite.lod_last
+            sprite.lod_tier = tier
+            sprite.lod_last = tick
+            counts[tier] += 1
+            if tier == NEAR:
+                full.append((sprite, ticks))
+            else:
+                cheap.append((sprite, ticks))
+        self.counts[name] = counts
+        self.updates[name] = len(full) + len(cheap)
+        return full, cheap
+
+    def report(self):
+        # {слой: {near/mid/far: число объектов, updates: вызовов update за тик}}
+        report = {}
+        for name, counts in self.counts.items():
+            layer = dict(zip(TIER_NAMES, counts))
+            layer["updates"] = self.updates[name]
+            report[name] = layer
+        return report
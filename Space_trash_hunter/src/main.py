@@ -1,9 +1,7 @@
 import arcade
-import math
-import random
-import json
 import os
 import sys
+import time
 
 # этот блок кода добавлен, чтобы Python точно знал, где искать папку src.
 # Это решает проблему, когда запускаешь скрипт из другой директории, а imports ломаются.
@@ -12,54 +10,52 @@ project_root = os.path.dirname(script_dir)
 if os.path.exists(os.path.join(project_root, "src")):
     os.chdir(project_root)
 
-# Импортируем классы, описанные в sprites.py
-from src.sprites import Player, Asteroid, Bullet, Trash, Star, ChaserEnemy, ShooterEnemy, KamikazeEnemy, \
-    ExplosionParticle, RepairKit
+# Вся игровая логика вынесена в World (src/world.py), чтобы её можно было гонять без окна
+from src.world import World, Inputs, MAP_SIZE, LEVEL_GOALS, TICK_RATE
+from src.timestep import FixedTimestep, Interpolator
+from src.culling import Culler
+from src.background import Starfield
+from src.assets import assets, SOUND_FILES
+from src.music import music
+from src.mixer import Mixer
+from src.records import RecordsStore
+from src.replay import InputLog
+from src.profiler import profiler
+from src.sprites import TEXTURES
+from src.thrusters import ThrusterSystem
+from src.lod import NEAR
+from src.ui import TextLayer
+from src.quality import QualityGovernor
 
 # Константы для настройки окна и мира
 SCREEN_WIDTH = 1024
 SCREEN_HEIGHT = 768
 SCREEN_TITLE = "Space Scavenger: Final Animation Build"
-MAP_SIZE = 2500
-
-# Настройки сложности: сколько очков нужно набрать для прохождения уровня
-LEVEL_GOALS = {
-    0: 500,
-    1: 1500,
-    2: 2500,
-    3: 4000,
-    4: float('inf')  # Бесконечный уровень для проверки навыков
-}
+# Как часто окно рисует кадры. Симуляция идет своим фиксированным шагом (TICK_RATE),
+# поэтому отрисовку можно ускорять или ограничивать независимо от скорости игры.
+DRAW_FPS = 120
+# Сколько тиков симуляции максимум догоняем за один кадр на медленной машине
+MAX_CATCHUP_STEPS = 5
+# Сколько секунд максимум показываем экран загрузки, ожидая музыку уровня.
+# Если диск медленный, игра стартует без музыки, а трек включится, когда откроется.
+LOADING_TIMEOUT = 1.0
 
 RECORDS_FILE = "records.json"
+HISTORY_FILE = "runs.log"
+# Нажатия последнего забега (воспроизведение: python -m src.replay last_run.replay)
+REPLAY_FILE = "last_run.replay"
+# Трасса профилировщика (F4 - начать/закончить запись), открывается в ui.perfetto.dev
+TRACE_FILE = "trace.json"
+# Раз во сколько кадров обновлять текст оверлея профилировщика (F3)
+PROFILER_REFRESH_FRAMES = 15
 
-
-# Функции для работы с файловой системой (сохранение рекордов)
-def load_records():
-    # Если файла нет, возвращаем пустые рекорды
-    if not os.path.exists(RECORDS_FILE):
-        return {str(k): 0 for k in LEVEL_GOALS.keys()}
-    with open(RECORDS_FILE, "r") as f:
-        return json.load(f)
-
-
-def save_record(level, score):
-    # Сохраняем рекорд, только если новый счет больше старого
-    data = load_records()
-    str_lvl = str(level)
-    if str_lvl not in data or score > data[str_lvl]:
-        data[str_lvl] = score
-        with open(RECORDS_FILE, "w") as f:
-            json.dump(data, f)
+MENU_MUSIC = "assets/sounds/menu_ost.mp3"
+WIN_MUSIC = "assets/sounds/win_ost.mp3"
+DEFEAT_MUSIC = "assets/sounds/defeat_ost.mp3"
 
 
-def reset_record_lvl(level):
-    # Функция для кнопки сброса рекордов в меню
-    data = load_records()
-    str_lvl = str(level)
-    data[str_lvl] = 0
-    with open(RECORDS_FILE, "w") as f:
-        json.dump(data, f)
+# Рекорды и история забегов: кэш в памяти, запись на диск в фоновом потоке (src/records.py)
+records = RecordsStore(RECORDS_FILE, HISTORY_FILE, LEVEL_GOALS.keys())
 
 
 # ==========================================
@@ -70,66 +66,80 @@ class MenuView(arcade.View):
     Класс отвечающий за главное меню игры.
     """
 
+    # Список уровней с описанием
+    LEVELS = [
+        (0, "УРОВЕНЬ 0: Обучение (Нет врагов)"),
+        (1, "УРОВЕНЬ 1: Только Астероиды и Тараны"),
+        (2, "УРОВЕНЬ 2: + Стрелки + Аптечки"),
+        (3, "УРОВЕНЬ 3: МАКСИМАЛЬНАЯ ОПАСНОСТЬ"),
+        (4, "БЕСКОНЕЧНЫЙ РЕЖИМ: ВЫЖИВАНИЕ")
+    ]
+
     def __init__(self):
         super().__init__()
-        self.menu_music = None
         self.music_player = None
-        # Пытаемся загрузить музыку, но используем try/except, чтобы игра не крашилась, если файлов нет
-        try:
-            self.menu_music = arcade.load_sound("assets/sounds/menu_ost.mp3")
-        except FileNotFoundError:
-            print("Предупреждение: музыка меню не найдена, продолжаем без неё.")
+        # Музыка меню открывается потоком в фоне (src/music.py), меню рисуется сразу.
+        self.menu_music_task = music.load(MENU_MUSIC)
+
+        # Все надписи меню создаются один раз и рисуются одним вызовом (src/ui.py).
+        # Меняются только строки рекордов и цвет [СБРОС] - когда меняются рекорды.
+        self.ui = TextLayer()
+        self.ui.add("title", "SPACE SCAVENGER", color=arcade.color.ORANGE, font_size=50, anchor_x="center")
+        self.ui.add("prompt", "Выберите уровень:", font_size=20, anchor_x="center")
+        for lvl, desc in self.LEVELS:
+            self.ui.add(f"level{lvl}", desc, color=arcade.color.CYAN, font_size=18, anchor_x="center")
+            self.ui.add(f"reset{lvl}", "[СБРОС]", color=arcade.color.GRAY, font_size=14,
+                        anchor_x="center", anchor_y="baseline")
+        self.ui.add("help", "ESC - выход  |  F11 - полноэкранный режим", color=arcade.color.GRAY,
+                    font_size=14, anchor_x="center")
+        # Размер окна, под который расставлены надписи
+        self.layout_size = None
 
     def on_show_view(self):
-        # Устанавливаем черный фон и запускаем музыку при открытии меню
+        # Устанавливаем черный фон; музыка запустится в on_update, когда трек откроется
         arcade.set_background_color(arcade.color.BLACK)
-        self.records = load_records()
-        if self.menu_music:
-            if not self.music_player:
-                self.music_player = self.menu_music.play(loop=True, volume=0.5)
-
-    def on_draw(self):
-        self.clear()
-        width = self.window.width
-        height = self.window.height
-        cx = width / 2
-        cy = height / 2
+        self.show_records()
 
-        # Отрисовка заголовка
-        arcade.draw_text("SPACE SCAVENGER", cx, cy + 150,
-                         arcade.color.ORANGE, font_size=50, anchor_x="center")
-
-        arcade.draw_text("Выберите уровень:", cx, cy + 70,
-                         arcade.color.WHITE, font_size=20, anchor_x="center")
-
-        # Список уровней с описанием
-        levels = [
-            (0, "УРОВЕНЬ 0: Обучение (Нет врагов)"),
-            (1, "УРОВЕНЬ 1: Только Астероиды и Тараны"),
-            (2, "УРОВЕНЬ 2: + Стрелки + Аптечки"),
-            (3, "УРОВЕНЬ 3: МАКСИМАЛЬНАЯ ОПАСНОСТЬ"),
-            (4, "БЕСКОНЕЧНЫЙ РЕЖИМ: ВЫЖИВАНИЕ")
-        ]
-
-        # Цикл отрисовки кнопок уровней
-        for i, (lvl, desc) in enumerate(levels):
-            y_pos = cy - (i * 60)
+    def show_records(self):
+        self.records = records.all()
+        for lvl, desc in self.LEVELS:
             rec = self.records.get(str(lvl), 0)
-            text = f"{desc} [Рекорд: {rec}]"
-
-            arcade.draw_text(text, cx, y_pos,
-                             arcade.color.CYAN, font_size=18, anchor_x="center")
-
+            self.ui.set(f"level{lvl}", f"{desc} [Рекорд: {rec}]")
             # Кнопка сброса рекорда
-            reset_color = arcade.color.RED
-            if rec == 0:
-                reset_color = arcade.color.GRAY
+            self.ui.set(f"reset{lvl}", color=arcade.color.GRAY if rec == 0 else arcade.color.RED)
 
-            arcade.draw_text("[СБРОС]", cx + 380, y_pos,
-                             reset_color, font_size=14, anchor_x="center", anchor_y="baseline")
+    def layout(self):
+        # Расстановка по центру окна - только когда размер окна изменился
+        size = (self.window.width, self.window.height)
+        if size == self.layout_size:
+            return
+        self.layout_size = size
+        cx = size[0] / 2
+        cy = size[1] / 2
+        self.ui.move("title", cx, cy + 150)
+        self.ui.move("prompt", cx, cy + 70)
+        for i, (lvl, _) in enumerate(self.LEVELS):
+            y_pos = cy - (i * 60)
+            self.ui.move(f"level{lvl}", cx, y_pos)
+            self.ui.move(f"reset{lvl}", cx + 380, y_pos)
+        self.ui.move("help", cx, 50)
+
+    def on_update(self, delta_time):
+        task = self.menu_music_task
+        if task is None or not task.done():
+            return
+        self.menu_music_task = None
+        menu_music = task.result()
+        # Если файла нет, игра продолжает без музыки
+        if menu_music is None:
+            print("Предупреждение: музыка меню не найдена, продолжаем без неё.")
+        elif not self.music_player:
+            self.music_player = menu_music.play(loop=True, volume=0.5)
 
-        arcade.draw_text("ESC - выход  |  F11 - полноэкранный режим", cx, 50,
-                         arcade.color.GRAY, font_size=14, anchor_x="center")
+    def on_draw(self):
+        self.clear()
+        self.layout()
+        self.ui.draw()
 
     def on_resize(self, width, height):
         # Важно обновлять вьюпорт при ресайзе окна, иначе картинка растянется
@@ -137,6 +147,7 @@ class MenuView(arcade.View):
         super().on_resize(width, height)
 
     def on_mouse_press(self, x, y, button, modifiers):
+        clicked_at = time.perf_counter()
         width = self.window.width
         height = self.window.height
         cx = width / 2
@@ -152,15 +163,15 @@ class MenuView(arcade.View):
                     arcade.stop_sound(self.music_player)
                     self.music_player = None
                 # Переход к игре
-                game_view = GameView(level=i)
+                game_view = GameView(level=i, clicked_at=clicked_at)
                 game_view.setup()
                 self.window.show_view(game_view)
                 return
 
             # Проверка нажатия на [СБРОС]
             if (cx + 340 < x < cx + 420) and (y_pos_button - 15 < y < y_pos_button + 25):
-                reset_record_lvl(i)
-                self.records = load_records()
+                records.reset(i)
+                self.show_records()
 
         # Кнопка выхода (неявная зона внизу)
         if cx - 100 < x < cx + 100 and 20 < y < 80:
@@ -186,22 +197,32 @@ class GameOverView(arcade.View):
         self.score = score
         self.level = level
         self.is_win = is_win
-        # Сразу пытаемся сохранить рекорд при открытии этого экрана
-        save_record(level, score)
-
-    def on_draw(self):
-        self.clear()
-        cx = self.window.width / 2
-        cy = self.window.height / 2
         title = "ПОБЕДА!" if self.is_win else "GAME OVER"
         color = arcade.color.GREEN if self.is_win else arcade.color.RED
 
-        arcade.draw_text(title, cx, cy + 50,
-                         color, font_size=50, anchor_x="center")
-        arcade.draw_text(f"Счет: {self.score}", cx, cy,
-                         arcade.color.WHITE, font_size=30, anchor_x="center")
-        arcade.draw_text("Нажмите CLICK для выхода в меню", cx, cy - 80,
-                         arcade.color.GRAY, font_size=20, anchor_x="center")
+        # Экран не меняется, надписи собираются один раз
+        self.ui = TextLayer()
+        self.ui.add("title", title, color=color, font_size=50, anchor_x="center")
+        self.ui.add("score", f"Счет: {self.score}", font_size=30, anchor_x="center")
+        self.ui.add("hint", "Нажмите CLICK для выхода в меню", color=arcade.color.GRAY,
+                    font_size=20, anchor_x="center")
+        self.layout_size = None
+
+    def layout(self):
+        size = (self.window.width, self.window.height)
+        if size == self.layout_size:
+            return
+        self.layout_size = size
+        cx = size[0] / 2
+        cy = size[1] / 2
+        self.ui.move("title", cx, cy + 50)
+        self.ui.move("score", cx, cy)
+        self.ui.move("hint", cx, cy - 80)
+
+    def on_draw(self):
+        self.clear()
+        self.layout()
+        self.ui.draw()
 
     def on_resize(self, width, height):
         self.window.ctx.viewport = (0, 0, width, height)
@@ -225,44 +246,58 @@ class GameOverView(arcade.View):
 class GameView(arcade.View):
     """
     Основной класс игрового процесса.
+    Вся логика живет в World (src/world.py), здесь только камеры, звук, ввод и отрисовка.
     """
 
-    def __init__(self, level):
+    def __init__(self, level, clicked_at=None):
         super().__init__()
         self.level = level
-        self.target_score = LEVEL_GOALS.get(level, 1000)
-
-        # Спрайт-листы для оптимизации отрисовки
-        self.player_list = None
-        self.asteroid_list = None
-        self.bullet_list = None
-        self.trash_list = None
-        self.star_list = None
-        self.enemy_list = None
-        self.particle_list = None
-        self.repair_list = None
-        self.thruster_list = None
-
-        self.player_sprite = None
+        # Момент клика в меню: от него считаем время до первого игрового кадра
+        self.clicked_at = clicked_at if clicked_at is not None else time.perf_counter()
+        self.first_frame_seconds = None
+        self.world = World(level)
+        # Запись нажатий по тикам: вместе с сидом мира она полностью повторяет забег
+        self.input_log = InputLog(level, self.world.seed, TICK_RATE)
+        self.target_score = self.world.target_score
+        # Симуляция идет ровными тиками, а кадры рисуются между ними с интерполяцией
+        self.timestep = FixedTimestep(tick_rate=TICK_RATE, max_steps=MAX_CATCHUP_STEPS)
+        self.interpolator = Interpolator()
+
         # Используем две камеры: одна для мира (двигается за игроком), другая для UI (статичная)
         self.camera_game = None
         self.camera_gui = None
-        self.score = 0
-        self.info_text = arcade.Text(text="", x=20, y=SCREEN_HEIGHT - 40, color=arcade.color.WHITE, font_size=16)
+        # Звездный фон: плитки запекаются один раз и рисуются только под камерой
+        self.starfield = Starfield(seed=level)
+        # Отсечение невидимых спрайтов по камере (создается в setup, когда готовы списки мира)
+        self.culler = None
+        # Огонь двигателей всех кораблей (косметика, поэтому здесь, а не в мире)
+        self.thrusters = ThrusterSystem()
+        # HUD: счет/корпус/уровень и цель. Строка счета пересобирается, только когда счет или корпус изменились.
+        self.hud = TextLayer()
+        self.hud.add("info", "", font_size=16)
+        goal_text = "ЦЕЛЬ: ВЫЖИТЬ" if level == 4 else f"ЦЕЛЬ: {self.target_score}"
+        self.hud.add("goal", goal_text, color=arcade.color.YELLOW, font_size=16)
+        self.hud_state = None
+        self.layout_hud(self.window.width, self.window.height)
+        # Оверлей профилировщика: средние мс по фазам и число объектов
+        self.profiler_text = arcade.Text(text="", x=20, y=SCREEN_HEIGHT - 70, color=arcade.color.LIGHT_GREEN,
+                                         font_size=11, multiline=True, width=420, anchor_y="top")
+        self.profiler_frames = 0
+
+        # Состояние клавиш, из которого каждый кадр собирается Inputs для мира
         self.up_pressed = False
+        self.left_pressed = False
+        self.right_pressed = False
+        self.fire_pressed = False
 
-        # Загрузка звуков (используем встроенные ресурсы arcade для тестов)
-        self.sound_laser = arcade.load_sound(":resources:sounds/laser2.wav")
-        self.sound_enemy_laser = arcade.load_sound(":resources:sounds/laser4.wav")
-        self.sound_explosion = arcade.load_sound(":resources:sounds/explosion2.wav")
-        self.sound_hit = arcade.load_sound(":resources:sounds/hit2.wav")
-        self.sound_collect = arcade.load_sound(":resources:sounds/coin1.wav")
-        self.sound_heal = arcade.load_sound(":resources:sounds/upgrade1.wav")
+        # Звуки берем из общего реестра (обычно они уже предзагружены в main())
+        self.sounds = {name: assets.sound(path) for name, path in SOUND_FILES.items()}
+        # Все эффекты идут через микшер: лимит голосов и склейка одинаковых звуков за кадр
+        self.mixer = Mixer(self.sounds)
+        # Регулятор качества: следит за длиной кадра и снижает/возвращает детализацию (src/quality.py)
+        self.quality = QualityGovernor()
 
-        self.level_music = None
         self.level_music_player = None
-        self.sound_win = None
-        self.sound_defeat = None
 
         # Выбор музыки в зависимости от уровня
         music_path = None
@@ -277,378 +312,285 @@ class GameView(arcade.View):
         elif self.level == 4:
             music_path = "assets/sounds/level_4_ost.mp3"
 
-        if music_path:
-            try:
-                self.level_music = arcade.load_sound(music_path)
-            except FileNotFoundError:
-                pass
+        # Музыка уровня нужна сразу, победная и проигрышная - только в конце игры.
+        # Все треки открываются потоком в фоне и не декодируются целиком.
+        self.level_music_task = music.load(music_path) if music_path else None
+        self.win_music_task = music.load(WIN_MUSIC)
+        self.defeat_music_task = music.load(DEFEAT_MUSIC)
 
-        try:
-            self.sound_win = arcade.load_sound("assets/sounds/win_ost.mp3")
-            self.sound_defeat = arcade.load_sound("assets/sounds/defeat_ost.mp3")
-        except FileNotFoundError:
-            pass
+        # Экран загрузки: пока трек уровня открывается, окно рисует кадры, а мир стоит
+        self.loading = True
+        self.loading_time = 0.0
+        self.loading_text = arcade.Text("Загрузка...", SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2,
+                                        arcade.color.WHITE, font_size=24, anchor_x="center")
 
     def setup(self):
-        # Инициализация всех списков и объектов
+        # Инициализация камер и мира
         self.camera_game = arcade.camera.Camera2D()
         self.camera_gui = arcade.camera.Camera2D()
-
-        self.player_list = arcade.SpriteList()
-        self.asteroid_list = arcade.SpriteList()
-        self.bullet_list = arcade.SpriteList()
-        self.trash_list = arcade.SpriteList()
-        self.star_list = arcade.SpriteList()
-        self.enemy_list = arcade.SpriteList()
-        self.particle_list = arcade.SpriteList()
-        self.repair_list = arcade.SpriteList()
-        self.thruster_list = arcade.SpriteList()
-
-        self.score = 0
-        self.player_sprite = Player()
-        self.player_list.append(self.player_sprite)
-        # Важно добавить двигатель игрока в отдельный лист отрисовки
-        self.thruster_list.append(self.player_sprite.thruster)
-
-        # Создаем звездное небо
-        for _ in range(300):
-            star = Star()
-            star.center_x = random.uniform(-MAP_SIZE, MAP_SIZE)
-            star.center_y = random.uniform(-MAP_SIZE, MAP_SIZE)
-            self.star_list.append(star)
-
-        # Спавним астероиды и мусор
-        for _ in range(35): self.spawn_object(Asteroid(), self.asteroid_list)
-        for _ in range(20): self.spawn_object(Trash(), self.trash_list)
-
-        # Спавним врагов в зависимости от уровня
-        if self.level > 0:
-            count = 4 if self.level == 4 else (4 + self.level * 2)
-            for _ in range(count):
-                self.spawn_random_enemy()
-
-        # Аптечки
-        repair_count = 3
-        if self.level == 4:
-            repair_count = 5  # В выживании даем больше шансов
-
-        if self.level >= 2:
-            for _ in range(repair_count):
-                self.spawn_object(RepairKit(), self.repair_list)
-
-        if self.level_music:
-            self.level_music_player = self.level_music.play(loop=True, volume=0.5)
-
-    def spawn_random_enemy(self):
-        # тут сделана логика появления врагов.
-        # Чем выше уровень (или счет в бесконечном режиме), тем опаснее враги.
-        if self.level == 0: return
-        rand = random.random()
-        enemy = None
-
-        if self.level == 4:
-            # Прогрессия сложности для выживания
-            if self.score < 500:
-                enemy = ChaserEnemy(self.player_sprite, self.enemy_list)
-            elif self.score < 2000:
-                if rand < 0.6:
-                    enemy = ChaserEnemy(self.player_sprite, self.enemy_list)
-                else:
-                    enemy = ShooterEnemy(self.player_sprite, self.enemy_list, self.bullet_list, self.sound_enemy_laser)
-            else:
-                if rand < 0.4:
-                    enemy = ChaserEnemy(self.player_sprite, self.enemy_list)
-                elif rand < 0.7:
-                    enemy = ShooterEnemy(self.player_sprite, self.enemy_list, self.bullet_list, self.sound_enemy_laser)
-                else:
-                    enemy = KamikazeEnemy(self.player_sprite, self.enemy_list)
-        elif self.level == 1:
-            enemy = ChaserEnemy(self.player_sprite, self.enemy_list)
-        elif self.level == 2:
-            if rand < 0.7:
-                enemy = ChaserEnemy(self.player_sprite, self.enemy_list)
-            else:
-                enemy = ShooterEnemy(self.player_sprite, self.enemy_list, self.bullet_list, self.sound_enemy_laser)
-        elif self.level == 3:
-            if rand < 0.5:
-                enemy = ChaserEnemy(self.player_sprite, self.enemy_list)
-            elif rand < 0.8:
-                enemy = ShooterEnemy(self.player_sprite, self.enemy_list, self.bullet_list, self.sound_enemy_laser)
-            else:
-                enemy = KamikazeEnemy(self.player_sprite, self.enemy_list)
-
-        if enemy:
-            self.spawn_object(enemy, self.enemy_list)
-
-    def spawn_object(self, sprite, sprite_list):
-        # Функция для безопасного спавна объектов (чтобы не спавнились прямо на игроке)
-        sprite.center_x = random.uniform(-MAP_SIZE, MAP_SIZE)
-        sprite.center_y = random.uniform(-MAP_SIZE, MAP_SIZE)
-
-        # Если слишком близко - пробуем еще раз (рекурсия)
-        if arcade.get_distance_between_sprites(sprite, self.player_sprite) < 600:
-            self.spawn_object(sprite, sprite_list)
+        self.world.setup()
+        world = self.world
+        self.culler = Culler({
+            "trash": world.trash_list,
+            "repair": world.repair_list,
+            "particles": world.particle_list,
+            "asteroids": world.asteroid_list,
+            "enemies": world.enemy_list,
+            "bullets": world.bullet_list,
+        })
+
+    def start_level_music(self):
+        # Запускаем музыку уровня, как только фоновый поток открыл трек
+        task = self.level_music_task
+        if task is None or not task.done():
             return
+        self.level_music_task = None
+        level_music = task.result()
+        if level_music:
+            self.level_music_player = level_music.play(loop=True, volume=0.5)
 
-        # Если это враг, надо добавить его двигатель в список отрисовки
-        if isinstance(sprite, (ChaserEnemy, ShooterEnemy, KamikazeEnemy)):
-            self.thruster_list.append(sprite.thruster)
-
-        if isinstance(sprite, Asteroid):
-            sprite.change_x = random.uniform(-1.5, 1.5)
-            sprite.change_y = random.uniform(-1.5, 1.5)
-        sprite_list.append(sprite)
-
-    def create_bullet_explosion(self, x, y):
-        # Эффект разлета пуль во все стороны (для смерти Камикадзе)
-        bullet_count = 9
-        speed = 5
-        for i in range(bullet_count):
-            angle_deg = i * (360 / bullet_count)
-            angle_rad = math.radians(angle_deg)
-            bullet = Bullet(is_enemy=True)
-            bullet.center_x = x
-            bullet.center_y = y
-            bullet.angle = angle_deg - 90
-            bullet.change_x = math.cos(angle_rad) * speed
-            bullet.change_y = math.sin(angle_rad) * speed
-            self.bullet_list.append(bullet)
-
-    def spawn_visual_explosion(self, x, y, color, count=10):
-        # Создает группу частиц взрыва
-        for _ in range(count):
-            self.particle_list.append(ExplosionParticle(x, y, color))
+    @property
+    def player_sprite(self):
+        return self.world.player_sprite
+
+    @property
+    def score(self):
+        return self.world.score
 
     def on_draw(self):
         self.clear()
-        width = self.window.width
-        height = self.window.height
+        if self.loading:
+            if self.camera_gui:
+                self.camera_gui.use()
+            self.loading_text.draw()
+            return
+        world = self.world
+
+        # Ставим движущиеся спрайты в промежуточное положение между тиками
+        self.interpolator.apply(self.timestep.alpha)
 
         # 1. Рисуем игровой мир (камера следит за игроком)
         if self.camera_game:
+            self.camera_game.position = self.player_sprite.position
             self.camera_game.use()
 
-        # Граница мира
-        arcade.draw_rect_outline(arcade.LRBT(-MAP_SIZE, MAP_SIZE, -MAP_SIZE, MAP_SIZE), arcade.color.RED, 10)
+        # Граница мира (у открытого мира её нет)
+        if not world.open_world:
+            arcade.draw_rect_outline(arcade.LRBT(-MAP_SIZE, MAP_SIZE, -MAP_SIZE, MAP_SIZE), arcade.color.RED, 10)
 
         # Порядок отрисовки важен для слоев!
-        self.star_list.draw()  # Фон
-        self.trash_list.draw()
-        self.repair_list.draw()
-        self.particle_list.draw()
-        self.thruster_list.draw()  # Двигатели ПОД кораблями
-        self.asteroid_list.draw()
-        self.enemy_list.draw()
-        self.bullet_list.draw()
-        self.player_list.draw()  # Игрок поверх всего
+        # Рисуем только чанки под камерой, остальное отсекаем.
+        self.culler.begin(self.camera_game)
+        with profiler.scope("draw.background"):
+            self.starfield.draw(self.camera_game)  # Фон
+        self.draw_layer("trash")
+        self.draw_layer("repair")
+        if world.particles is not None:
+            with profiler.scope("draw.particles"):
+                world.particles.draw()  # Все частицы одним вызовом
+        else:
+            self.draw_layer("particles")
+        with profiler.scope("draw.thrusters"):
+            # Двигатели ПОД кораблями, по уже интерполированным позициям
+            self.thrusters.layout(self.thruster_owners())
+            self.thrusters.draw()
+        self.draw_layer("asteroids")
+        self.draw_layer("enemies")
+        self.draw_layer("bullets")
+        with profiler.scope("draw.player"):
+            world.player_list.draw()  # Игрок поверх всего
+
+        # Возвращаем настоящие позиции симуляции
+        self.interpolator.restore()
 
         # 2. Рисуем интерфейс (камера UI зафиксирована)
         if self.camera_gui:
             self.camera_gui.use()
 
-        self.info_text.draw()
-
-        goal_text = f"ЦЕЛЬ: {self.target_score}"
-        if self.level == 4:
-            goal_text = "ЦЕЛЬ: ВЫЖИТЬ"
-        arcade.draw_text(goal_text, width - 150, height - 40, arcade.color.YELLOW, font_size=16)
+        with profiler.scope("draw.gui"):
+            self.hud.draw()
+
+        if profiler.enabled:
+            self.draw_profiler()
+        profiler.end_frame()
+
+        if self.first_frame_seconds is None:
+            self.first_frame_seconds = time.perf_counter() - self.clicked_at
+            print(f"Уровень {self.level}: первый кадр через {self.first_frame_seconds * 1000:.0f} мс после клика")
+
+    def draw_layer(self, name):
+        with profiler.scope("draw." + name):
+            self.culler.draw(name)
+
+    def draw_profiler(self):
+        # Текст оверлея пересобираем не каждый кадр - верстка текста сама по себе не бесплатна
+        self.profiler_frames += 1
+        if self.profiler_frames >= PROFILER_REFRESH_FRAMES or not self.profiler_text.text:
+            self.profiler_frames = 0
+            averages = profiler.averages()
+            lines = [f"кадр: {averages.pop('frame', 0):.2f} мс" + ("  [запись трассы]" if profiler.recording else "")]
+            lines.extend(f"{name}: {ms:.3f} мс" for name, ms in sorted(averages.items()))
+            lines.append("  ".join(f"{name}: {value}" for name, value in profiler.counters.items()))
+            lines.extend(self.quality.report())
+            self.profiler_text.text = "\n".join(lines)
+        self.profiler_text.draw()
+
+    def current_inputs(self):
+        # Собираем состояние клавиш в Inputs. Выстрел срабатывает один раз на нажатие.
+        turn = 0
+        if self.right_pressed:
+            turn = 1
+        elif self.left_pressed:
+            turn = -1
+        inputs = Inputs(thrust=self.up_pressed, turn=turn, fire=self.fire_pressed, quality=self.quality.level)
+        self.fire_pressed = False
+        return inputs
+
+    def interpolated_lists(self):
+        # Списки, которые двигаются каждый тик и заметно "дрожат" без интерполяции
+        world = self.world
+        return (world.player_list, world.enemy_list, world.asteroid_list, world.bullet_list)
+
+    def thruster_owners(self):
+        # Огонь нужен только кораблям рядом с экраном - дальние враги и так не видны (src/lod.py)
+        world = self.world
+        return [world.player_sprite] + [enemy for enemy in world.enemy_list if enemy.lod_tier == NEAR]
 
     def on_update(self, delta_time):
-        # Проверка условий проигрыша
-        if self.player_sprite.hp <= 0:
-            if self.level_music_player: arcade.stop_sound(self.level_music_player)
-            if self.sound_defeat: arcade.play_sound(self.sound_defeat, volume=0.7)
-            game_over = GameOverView(self.score, self.level, is_win=False)
-            self.window.show_view(game_over)
-            return
+        if self.loading:
+            # Ждем трек уровня, но не дольше LOADING_TIMEOUT
+            self.loading_time += delta_time
+            task = self.level_music_task
+            if task is not None and not task.done() and self.loading_time < LOADING_TIMEOUT:
+                return
+            self.loading = False
+        self.start_level_music()
+        if self.quality.observe(delta_time):
+            self.apply_quality()
+
+        # delta_time - длина кадра. Симуляцию двигаем только целыми тиками.
+        steps = self.timestep.advance(delta_time)
+        for i in range(steps):
+            if i == steps - 1:
+                self.interpolator.capture(self.interpolated_lists())
+            inputs = self.current_inputs()
+            self.input_log.append(inputs)
+            with profiler.scope("update.tick"):
+                result = self.world.step(self.timestep.step_time, inputs)
+            self.play_sound_events()
+
+            # Проверка конца игры
+            if result:
+                if self.level_music_player: arcade.stop_sound(self.level_music_player)
+                self.mixer.stop_all()
+                self.finish_run(result)
+                end_sound = music.ready(self.win_music_task if result == "win" else self.defeat_music_task)
+                if end_sound: arcade.play_sound(end_sound, volume=0.7)
+                game_over = GameOverView(self.world.score, self.level, is_win=(result == "win"))
+                self.window.show_view(game_over)
+                return
 
-        # Проверка победы (кроме бесконечного уровня)
-        if self.level != 4 and self.score >= self.target_score:
-            if self.level_music_player: arcade.stop_sound(self.level_music_player)
-            if self.sound_win: arcade.play_sound(self.sound_win, volume=0.7)
-            game_over = GameOverView(self.score, self.level, is_win=True)
-            self.window.show_view(game_over)
+        # Все эффекты кадра запускаются разом: одинаковые склеиваются, лишние голоса отсекаются
+        with profiler.scope("sound"):
+            self.mixer.update(delta_time)
+        self.thrusters.update(self.thruster_owners(), delta_time)
+        # Сколько объектов удалено за кадр (по спискам), забираем каждый кадр
+        removed = self.world.graveyard.drain_counts()
+        if profiler.enabled:
+            world = self.world
+            for layer, count in removed.items():
+                profiler.count(f"removed.{layer}", count)
+            profiler.count("враги", len(world.enemy_list))
+            profiler.count("пули", len(world.bullet_list))
+            profiler.count("астероиды", len(world.asteroid_list))
+            particles = world.particles if world.particles is not None else world.particle_list
+            profiler.count("частицы", len(particles))
+            profiler.count("голоса", len(self.mixer.voices))
+            # Уровни детализации: сколько объектов near/mid/far и сколько update за тик
+            for layer, tiers in world.lod.report().items():
+                for tier, value in tiers.items():
+                    profiler.count(f"{layer}.{tier}", value)
+            if world.sectors is not None:
+                for name, value in world.sectors.report().items():
+                    profiler.count(f"секторы.{name}", value)
+        self.update_hud()
+
+    def apply_quality(self):
+        # Косметику меняем сразу, а симуляция получит уровень со следующими Inputs
+        tier = self.quality.tier
+        if self.world.particles is not None:
+            self.world.particles.set_budget(tier.particle_budget)
+        self.starfield.density = tier.star_density
+        self.mixer.max_voices = tier.voices
+        print(f"Качество: {tier.name} ({self.quality.history[-1][2]})")
+
+    def layout_hud(self, width, height):
+        self.hud.move("info", 20, height - 40)
+        self.hud.move("goal", width - 150, height - 40)
+
+    def update_hud(self):
+        state = (self.score, int(self.player_sprite.hp))
+        if state == self.hud_state:
             return
-
-        # --- КОНТРОЛЬ ПОПУЛЯЦИИ ВРАГОВ (УРОВЕНЬ 4) ---
-        # Чтобы в бесконечном режиме враги не заканчивались и не переполняли память
-        if self.level == 4:
-            enemy_limit = 4
-            if self.score > 500: enemy_limit = 7
-            if self.score > 2000: enemy_limit = 12
-            if self.score > 5000: enemy_limit = 12 + int((self.score - 5000) / 1000)
-
-            if len(self.enemy_list) < enemy_limit:
-                if random.random() < 0.05:
-                    self.spawn_random_enemy()
-        # -------------------------------------
-
-        # Физика движения игрока (инерция)
-        if self.up_pressed:
-            rad = math.radians(-self.player_sprite.angle + 90)
-            self.player_sprite.speed_x += math.cos(rad) * 0.2
-            self.player_sprite.speed_y += math.sin(rad) * 0.2
-
-        # Трение (замедление)
-        self.player_sprite.speed_x *= (1 - 0.04)
-        self.player_sprite.speed_y *= (1 - 0.04)
-
-        # Обновление всех списков спрайтов
-        self.player_list.update(delta_time)
-        self.asteroid_list.update(delta_time)
-        self.bullet_list.update(delta_time)
-        self.enemy_list.update(delta_time)
-        self.particle_list.update(delta_time)
-
-        # Слежение камеры за игроком
-        if self.camera_game and self.player_sprite:
-            self.camera_game.position = self.player_sprite.position
-
-        self.info_text.text = f"Счет: {self.score}  |  Корпус: {int(self.player_sprite.hp)}%  |  Уровень: {self.level}"
-
-        # Ограничение мира (отскакивание от границ)
-        if self.player_sprite.left < -MAP_SIZE:
-            self.player_sprite.left = -MAP_SIZE;
-            self.player_sprite.speed_x *= -0.5
-        elif self.player_sprite.right > MAP_SIZE:
-            self.player_sprite.right = MAP_SIZE;
-            self.player_sprite.speed_x *= -0.5
-        if self.player_sprite.bottom < -MAP_SIZE:
-            self.player_sprite.bottom = -MAP_SIZE;
-            self.player_sprite.speed_y *= -0.5
-        elif self.player_sprite.top > MAP_SIZE:
-            self.player_sprite.top = MAP_SIZE;
-            self.player_sprite.speed_y *= -0.5
-
-        # ================== КОЛЛИЗИИ (Столкновения) ==================
-
-        # 1. Игрок и Аптечки
-        hits = arcade.check_for_collision_with_list(self.player_sprite, self.repair_list)
-        for kit in hits:
-            kit.remove_from_sprite_lists()
-            self.player_sprite.hp = min(100, self.player_sprite.hp + 30)
-            arcade.play_sound(self.sound_heal)
-
-            # Спавн новой аптечки
-            if self.level < 4:
-                if self.level >= 2: self.spawn_object(RepairKit(), self.repair_list)
-            elif self.level == 4:
-                # В выживании аптечки редкие
-                if len(self.repair_list) < 5 and random.random() < 0.01:
-                    self.spawn_object(RepairKit(), self.repair_list)
-
-        # 2. Обработка пуль
-        for bullet in self.bullet_list[:]:
-            if bullet.is_enemy:
-                # Вражеская пуля попала в игрока
-                if arcade.check_for_collision(bullet, self.player_sprite):
-                    bullet.remove_from_sprite_lists()
-                    self.player_sprite.hp -= 10
-                    arcade.play_sound(self.sound_hit, volume=0.5)
-                    self.spawn_visual_explosion(self.player_sprite.center_x, self.player_sprite.center_y,
-                                                arcade.color.ORANGE, 5)
-            else:
-                # Наша пуля попала во врага
-                hits = arcade.check_for_collision_with_list(bullet, self.enemy_list)
-                if hits:
-                    bullet.remove_from_sprite_lists()
-                    for enemy in hits:
-                        enemy.hp -= 1
-                        self.spawn_visual_explosion(bullet.center_x, bullet.center_y, arcade.color.WHITE, 3)
-                        if enemy.hp <= 0:
-                            # Враг уничтожен
-                            arcade.play_sound(self.sound_explosion, volume=0.6)
-                            exp_color = arcade.color.BLUE
-                            if isinstance(enemy, ShooterEnemy):
-                                exp_color = arcade.color.GREEN
-                            elif isinstance(enemy, KamikazeEnemy):
-                                exp_color = arcade.color.RED
-                            self.spawn_visual_explosion(enemy.center_x, enemy.center_y, exp_color, 15)
-
-                            # Камикадзе взрывается при смерти
-                            if isinstance(enemy, KamikazeEnemy):
-                                self.create_bullet_explosion(enemy.center_x, enemy.center_y)
-
-                            enemy.remove_from_sprite_lists()
-                            self.score += 100
-                            # Спавним замену, если это не бесконечный режим (там свой спавнер)
-                            if self.level != 4:
-                                self.spawn_random_enemy()
-
-            # Пуля попала в астероид
-            if bullet in self.bullet_list:
-                hits = arcade.check_for_collision_with_list(bullet, self.asteroid_list)
-                if hits:
-                    bullet.remove_from_sprite_lists()
-                    for a in hits:
-                        arcade.play_sound(self.sound_explosion, volume=0.4)
-                        self.spawn_visual_explosion(a.center_x, a.center_y, arcade.color.GRAY, 10)
-                        a.remove_from_sprite_lists()
-                        self.score += 5
-                        self.spawn_object(Asteroid(), self.asteroid_list)
-
-        # 3. Сбор мусора
-        hits = arcade.check_for_collision_with_list(self.player_sprite, self.trash_list)
-        for t in hits:
-            t.remove_from_sprite_lists()
-            arcade.play_sound(self.sound_collect, volume=0.5)
-            self.score += 50
-            self.spawn_object(Trash(), self.trash_list)
-
-        # 4. Столкновение с астероидами
-        hits = arcade.check_for_collision_with_list(self.player_sprite, self.asteroid_list)
-        for a in hits:
-            a.remove_from_sprite_lists()
-            arcade.play_sound(self.sound_hit, volume=1.0)
-            self.spawn_visual_explosion(a.center_x, a.center_y, arcade.color.GRAY, 15)
-            self.player_sprite.hp -= 20
-            self.spawn_object(Asteroid(), self.asteroid_list)
-
-        # 5. Столкновение с врагами (таран)
-        hits = arcade.check_for_collision_with_list(self.player_sprite, self.enemy_list)
-        for enemy in hits:
-            arcade.play_sound(self.sound_hit, volume=1.0)
-            self.spawn_visual_explosion(enemy.center_x, enemy.center_y, arcade.color.RED, 20)
-            if isinstance(enemy, KamikazeEnemy):
-                self.player_sprite.hp -= 30
-            else:
-                self.player_sprite.hp -= 15
-            enemy.remove_from_sprite_lists()
-            if self.level != 4:
-                self.spawn_random_enemy()
+        self.hud_state = state
+        self.hud.set("info", f"Счет: {state[0]}  |  Корпус: {state[1]}%  |  Уровень: {self.level}")
+
+    def finish_run(self, result):
+        # Рекорд и строка истории уходят в фоновый поток, окно не ждет диск
+        world = self.world
+        cause = "win" if result == "win" else (world.last_damage or "unknown")
+        records.record_run(self.level, world.score, world.tick / TICK_RATE, cause)
+        self.save_replay()
+
+    def save_replay(self):
+        self.input_log.finish(self.world)
+        records.write_file(REPLAY_FILE, self.input_log.to_bytes())
+
+    def toggle_trace(self):
+        # Первое нажатие начинает запись трассы, второе - сохраняет её в TRACE_FILE (в фоне)
+        if profiler.recording:
+            records.write_file(TRACE_FILE, profiler.stop_trace())
+            print(f"Трасса профилировщика сохранена в {TRACE_FILE}")
+        else:
+            profiler.start_trace()
+
+    def play_sound_events(self):
+        # Передаем микшеру все звуки, которые мир накопил за тик (играть их будет mixer.update)
+        for name, volume in self.world.drain_sound_events():
+            self.mixer.trigger(name, volume)
 
     def on_key_press(self, key, modifiers):
         if key == arcade.key.ESCAPE:
             if self.level_music_player:
                 arcade.stop_sound(self.level_music_player)
+            self.mixer.stop_all()
+            self.save_replay()
             menu_view = MenuView()
             self.window.show_view(menu_view)
 
         elif key == arcade.key.F11:
             self.window.set_fullscreen(not self.window.fullscreen)
+        elif key == arcade.key.F3:
+            profiler.toggle()
+            self.profiler_text.text = ""
+        elif key == arcade.key.F4:
+            self.toggle_trace()
         elif key == arcade.key.UP or key == arcade.key.W:
             self.up_pressed = True
         elif key == arcade.key.RIGHT or key == arcade.key.D:
-            self.player_sprite.change_angle = 4
+            self.right_pressed = True
+            self.left_pressed = False
         elif key == arcade.key.LEFT or key == arcade.key.A:
-            self.player_sprite.change_angle = -4
+            self.left_pressed = True
+            self.right_pressed = False
         elif key == arcade.key.SPACE:
-            # Стрельба с учетом текущей скорости корабля
-            arcade.play_sound(self.sound_laser, volume=0.3)
-            bullet = Bullet(is_enemy=False)
-            bullet.angle = self.player_sprite.angle
-            rad = math.radians(-self.player_sprite.angle + 90)
-            bullet.center_x = self.player_sprite.center_x + (math.cos(rad) * 30)
-            bullet.center_y = self.player_sprite.center_y + (math.sin(rad) * 30)
-            # Пуля летит быстрее самого корабля, прибавляем скорость корабля к вектору
-            bullet.change_x = self.player_sprite.speed_x + (math.cos(rad) * 12)
-            bullet.change_y = self.player_sprite.speed_y + (math.sin(rad) * 12)
-            self.bullet_list.append(bullet)
+            self.fire_pressed = True
 
     def on_key_release(self, key, modifiers):
         if key == arcade.key.UP or key == arcade.key.W: self.up_pressed = False
         if key in [arcade.key.LEFT, arcade.key.A, arcade.key.RIGHT, arcade.key.D]:
-            self.player_sprite.change_angle = 0
+            self.left_pressed = False
+            self.right_pressed = False
 
     def on_resize(self, width, height):
         self.window.ctx.viewport = (0, 0, width, height)
@@ -656,14 +598,26 @@ class GameView(arcade.View):
         # Пересоздаем камеры при изменении размера окна, чтобы не поплыли координаты
         self.camera_game = arcade.camera.Camera2D()
         self.camera_gui = arcade.camera.Camera2D()
-        self.info_text.y = height - 40
+        self.layout_hud(width, height)
+        self.profiler_text.y = height - 70
+        self.loading_text.x = width / 2
+        self.loading_text.y = height / 2
 
 
 def main():
-    window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE, resizable=True)
+    window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE, resizable=True,
+                           update_rate=1 / DRAW_FPS, draw_rate=1 / DRAW_FPS)
+    # Все текстуры и звуковые эффекты грузим один раз до первого кадра
+    start = time.perf_counter()
+    assets.preload(TEXTURES, SOUND_FILES.values())
+    disk = assets.disk.report()
+    print(f"Ресурсы загружены за {(time.perf_counter() - start) * 1000:.0f} мс "
+          f"(кэш на диске: {disk['hits']} попаданий, {disk['misses']} промахов)")
     menu_view = MenuView()
     window.show_view(menu_view)
     arcade.run()
+    # Дописываем на диск все, что еще в очереди
+    records.close()
 
 
 if __name__ == "__main__":
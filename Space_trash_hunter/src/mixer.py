@@ -0,0 +1,173 @@
+"""
+Микшер звуковых эффектов.
+Мир только складывает имена звуков в sound_events, а GameView отдает их сюда.
+Микшер за кадр:
+- склеивает одинаковые эффекты в один, но погромче (десять взрывов = один громкий);
+- держит общий лимит одновременных голосов и лимит на каждый тип эффекта;
+- при нехватке голосов вытесняет самый неважный (и самый старый) голос;
+- не создает новый плеер на каждый звук, а переиспользует остановленные.
+Так цена звука в тяжелом бою ограничена, сколько бы врагов ни взорвалось.
+"""
+import math
+
+from pyglet import media
+
+# Общий лимит одновременно звучащих эффектов
+MAX_VOICES = 12
+
+# {эффект: (приоритет, максимум голосов этого эффекта)}. Больше приоритет - важнее звук.
+EFFECTS = {
+    "hit": (5, 2),
+    "heal": (4, 1),
+    "collect": (4, 2),
+    "explosion": (3, 4),
+    "laser": (2, 3),
+    "enemy_laser": (1, 3),
+}
+DEFAULT_EFFECT = (1, 2)
+
+
+class Voice:
+    def __init__(self, name, priority, player):
+        self.name = name
+        self.priority = priority
+        self.player = player
+        self.started_at = 0.0
+        self.ends_at = 0.0
+
+
+class Mixer:
+    def __init__(self, sounds, max_voices=MAX_VOICES, effects=None):
+        # sounds: {имя: arcade.Sound}; None вместо звука - эффект молча пропускается
+        self.sounds = sounds
+        self.max_voices = max_voices
+        self.effects = effects if effects is not None else EFFECTS
+        self.clock = 0.0
+        self.pending = {}
+        self.voices = []
+        # Остановленные плееры по эффектам: повторный запуск без нового Player
+        self.idle = {}
+        # Статистика
+        self.triggered = 0
+        self.coalesced = 0
+        self.started = 0
+        self.stolen = 0
+        self.dropped = 0
+        self.reused = 0
+        self.peak_voices = 0
+
+    def trigger(self, name, volume=1.0):
+        # Запрос эффекта в этом кадре. Сам звук стартует в update().
+        self.triggered += 1
+        entry = self.pending.get(name)
+        if entry is None:
+            self.pending[name] = [1, volume]
+        else:
+            entry[0] += 1
+            if volume > entry[1]:
+                entry[1] = volume
+
+    def update(self, delta_time):
+        # Раз в кадр: освобождаем доигравшие голоса и запускаем накопленные эффекты
+        self.clock += delta_time
+        self.release_finished()
+        if not self.pending:
+            return
+        pending = self.pending
+        self.pending = {}
+        # Важные эффекты первыми, чтобы они заняли голоса раньше
+        for name in sorted(pending, key=lambda n: -self.effect(n)[0]):
+            count, volume = pending[name]
+            self.coalesced += count - 1
+            # Несколько одинаковых звуков складываются примерно как sqrt(n) по громкости
+            self.play(name, min(1.0, volume * math.sqrt(count)))
+        if len(self.voices) > self.peak_voices:
+            self.peak_voices = len(self.voices)
+
+    def effect(self, name):
+        return self.effects.get(name, DEFAULT_EFFECT)
+
+    def release_finished(self):
+        clock = self.clock
+        finished = [voice for voice in self.voices if voice.ends_at <= clock]
+        for voice in finished:
+            self.stop_voice(voice)
+
+    def play(self, name, volume):
+        sound = self.sounds.get(name)
+        if sound is None:
+            return
+        priority, limit = self.effect(name)
+
+        # Лимит на тип: перезапускаем самый старый голос того же эффекта
+        same = [voice for voice in self.voices if voice.name == name]
+        if len(same) >= limit:
+            self.stop_voice(min(same, key=lambda voice: voice.started_at))
+            self.stolen += 1
+        # Общий лимит: вытесняем менее важный голос, а если таких нет - новый звук не играем
+        elif len(self.voices) >= self.max_voices:
+            victim = self.victim(priority)
+            if victim is None:
+                self.dropped += 1
+                return
+            self.stop_voice(victim)
+            self.stolen += 1
+
+        voice = self.acquire(name, priority)
+        player = voice.player
+        if player.source is None:
+            # Плеер дошел до конца или новый: ставим звук в очередь заново
+            player.queue(sound.source)
+        else:
+            player.seek(0.0)
+        player.volume = volume
+        player.play()
+        voice.started_at = self.clock
+        voice.ends_at = self.clock + sound.get_length()
+        self.voices.append(voice)
+        self.started += 1
+
+    def victim(self, priority):
+        # Голос с меньшим приоритетом; среди равных - самый старый
+        victim = None
+        for voice in self.voices:
+            if voice.priority >= priority:
+                continue
+            if victim is None or (voice.priority, voice.started_at) < (victim.priority, victim.started_at):
+                victim = voice
+        return victim
+
+    def acquire(self, name, priority):
+        idle = self.idle.get(name)
+        if idle:
+            self.reused += 1
+            return idle.pop()
+        return Voice(name, priority, media.Player())
+
+    def stop_voice(self, voice):
+        self.voices.remove(voice)
+        voice.player.pause()
+        self.idle.setdefault(voice.name, []).append(voice)
+
+    def stop_all(self):
+        # При выходе с уровня: глушим все и освобождаем плееры
+        self.pending = {}
+        for voice in self.voices:
+            voice.player.delete()
+        self.voices = []
+        for idle in self.idle.values():
+            for voice in idle:
+                voice.player.delete()
+        self.idle = {}
+
+    def report(self):
+        return {
+            "voices": len(self.voices),
+            "peak_voices": self.peak_voices,
+            "triggered": self.triggered,
+            "coalesced": self.coalesced,
+            "started": self.started,
+            "stolen": self.stolen,
+            "dropped": self.dropped,
+            "reused": self.reused,
+        }
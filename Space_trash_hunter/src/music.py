@@ -0,0 +1,30 @@
+"""
+Фоновая загрузка музыки.
+Треки не декодируются целиком: assets.stream() открывает файл для потокового
+чтения, а само открытие идет в отдельном потоке, чтобы клик по уровню
+не ждал диска. load() сразу возвращает Future; вид проверяет done()
+в on_update и запускает музыку, как только трек готов.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from src.assets import assets
+
+
+class MusicLoader:
+    def __init__(self, workers=2):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="music")
+
+    def load(self, path):
+        # Future с arcade.Sound (потоковым) или None, если файла нет
+        return self.executor.submit(assets.stream, path)
+
+    @staticmethod
+    def ready(task):
+        # Готовый трек или None (еще грузится, нет файла или задачи)
+        if task is None or not task.done():
+            return None
+        return task.result()
+
+
+# Единственный загрузчик на процесс
+music = MusicLoader()
@@ -0,0 +1,194 @@
+"""
+Система частиц на массивах вместо отдельного спрайта на каждую искру.
+Позиция, скорость, вращение, прозрачность и скорость затухания всех частиц
+лежат в непрерывных массивах NumPy: обновление и удаление мертвых частиц -
+один векторный шаг, отрисовка - один инстанс-вызов.
+NumPy необязателен: без него World создает старые ExplosionParticle.
+"""
+import math
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from src.sprites import frames_in
+
+# Шейдер: один квадрат на частицу, поворачиваем и красим его прямо на GPU
+VERTEX_SHADER = """
+#version 330
+
+uniform WindowBlock {
+    mat4 projection;
+    mat4 view;
+} window;
+
+uniform float size;
+
+in vec2 in_vert;
+in vec2 in_pos;
+in float in_angle;
+in vec4 in_color;
+
+out vec4 v_color;
+
+void main() {
+    float c = cos(in_angle);
+    float s = sin(in_angle);
+    vec2 corner = mat2(c, s, -s, c) * in_vert * size;
+    gl_Position = window.projection * window.view * vec4(in_pos + corner, 0.0, 1.0);
+    v_color = in_color;
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 330
+
+in vec4 v_color;
+out vec4 out_color;
+
+void main() {
+    out_color = v_color;
+}
+"""
+
+
+class ParticleSystem:
+    """
+    Все частицы взрывов одним набором массивов.
+    budget - глобальный лимит живых частиц: лишние частицы новых взрывов
+    просто не появляются (старые взрывы важнее, они уже на экране).
+    """
+
+    # Размер квадратика частицы на экране (у старого спрайта было ~5 пикселей)
+    PARTICLE_SIZE = 5.0
+    # Все массивы-поля частиц (сжимаются и растут вместе)
+    FIELDS = ("x", "y", "change_x", "change_y", "angle", "spin", "alpha", "fade_rate", "color")
+
+    def __init__(self, budget=2000, rng=None):
+        self.budget = budget
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.count = 0
+        self.x = np.zeros(budget, dtype=np.float32)
+        self.y = np.zeros(budget, dtype=np.float32)
+        self.change_x = np.zeros(budget, dtype=np.float32)
+        self.change_y = np.zeros(budget, dtype=np.float32)
+        self.angle = np.zeros(budget, dtype=np.float32)  # в радианах
+        self.spin = np.zeros(budget, dtype=np.float32)
+        self.alpha = np.zeros(budget, dtype=np.float32)
+        self.fade_rate = np.zeros(budget, dtype=np.float32)
+        self.color = np.zeros((budget, 3), dtype=np.uint8)
+        # Сколько частиц не влезло в бюджет (для статистики)
+        self.dropped = 0
+        self._gpu = None
+
+    @staticmethod
+    def available():
+        return np is not None
+
+    def __len__(self):
+        return self.count
+
+    def set_budget(self, budget):
+        # Бюджет можно менять на ходу (например, при снижении качества графики).
+        # Буферы не пересоздаем, если новый бюджет меньше - лишнее просто отбрасываем.
+        if budget > len(self.x):
+            for name in self.FIELDS:
+                old = getattr(self, name)
+                new = np.zeros((budget,) + old.shape[1:], dtype=old.dtype)
+                new[:self.count] = old[:self.count]
+                setattr(self, name, new)
+        self.budget = budget
+        self.count = min(self.count, budget)
+
+    def emit(self, x, y, color, count=10):
+        # Те же случайные параметры, что и у ExplosionParticle
+        free = self.budget - self.count
+        if count > free:
+            self.dropped += count - free
+            count = free
+        if count <= 0:
+            return
+        start = self.count
+        end = start + count
+        rng = self.rng
+        speed = rng.uniform(2, 6, count)
+        direction = rng.uniform(0, 2 * math.pi, count)
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.change_x[start:end] = np.cos(direction) * speed
+        self.change_y[start:end] = np.sin(direction) * speed
+        self.angle[start:end] = 0
+        self.spin[start:end] = np.radians(rng.uniform(-5, 5, count))
+        self.alpha[start:end] = 255
+        self.fade_rate[start:end] = rng.integers(5, 11, count)
+        self.color[start:end] = color[:3]
+        self.count = end
+
+    def update(self, delta_time=1 / 60):
+        n = self.count
+        if n == 0:
+            return
+        # Скорости заданы на кадр 60 FPS, как у ExplosionParticle
+        frames = frames_in(delta_time)
+        self.x[:n] += self.change_x[:n] * frames
+        self.y[:n] += self.change_y[:n] * frames
+        self.angle[:n] += self.spin[:n] * frames
+        self.alpha[:n] -= self.fade_rate[:n] * frames
+
+        # Удаляем погасшие частицы одним сжатием массивов
+        alive = self.alpha[:n] > 0
+        left = int(np.count_nonzero(alive))
+        if left < n:
+            for name in self.FIELDS:
+                buf = getattr(self, name)
+                buf[:left] = buf[:n][alive]
+            self.count = left
+
+    def clear(self):
+        self.count = 0
+
+    def draw(self):
+        # Один инстанс-вызов на все частицы. GPU-ресурсы создаем при первой отрисовке,
+        # чтобы сама симуляция работала без окна.
+        n = self.count
+        if n == 0:
+            return
+        import arcade
+
+        ctx = arcade.get_window().ctx
+        if self._gpu is None:
+            self._gpu = self._create_gpu_objects(ctx)
+        program, geometry, buffer = self._gpu
+
+        data = np.empty(n, dtype=[("pos", "f4", 2), ("angle", "f4"), ("color", "u1", 4)])
+        data["pos"][:, 0] = self.x[:n]
+        data["pos"][:, 1] = self.y[:n]
+        data["angle"] = self.angle[:n]
+        data["color"][:, :3] = self.color[:n]
+        data["color"][:, 3] = np.clip(self.alpha[:n], 0, 255)
+
+        if buffer.size < data.nbytes:
+            buffer.orphan(size=data.nbytes * 2)
+        buffer.write(data.tobytes())
+        program["size"] = self.PARTICLE_SIZE
+        ctx.enable(ctx.BLEND)
+        geometry.render(program, instances=n)
+        ctx.disable(ctx.BLEND)
+
+    def _create_gpu_objects(self, ctx):
+        from arcade.gl import BufferDescription
+
+        program = ctx.program(vertex_shader=VERTEX_SHADER, fragment_shader=FRAGMENT_SHADER)
+        quad = ctx.buffer(data=array("f", [-0.5, 0.5, -0.5, -0.5, 0.5, 0.5, 0.5, -0.5]))
+        buffer = ctx.buffer(reserve=16 * 256)
+        geometry = ctx.geometry(
+            [
+                BufferDescription(quad, "2f", ["in_vert"]),
+                BufferDescription(buffer, "2f 1f 4f1", ["in_pos", "in_angle", "in_color"],
+                                  normalized=["in_color"], instanced=True),
+            ],
+            mode=ctx.TRIANGLE_STRIP,
+        )
+        return program, geometry, buffer
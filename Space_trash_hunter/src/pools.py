@@ -0,0 +1,83 @@
+from src.sprites import Bullet
+
+
+class PoolStats:
+    """Счетчики одного пула: сколько выдали, сколько из них переиспользовали и т.д."""
+
+    def __init__(self):
+        self.acquired = 0      # сколько раз просили объект
+        self.reused = 0        # сколько раз отдали готовый из пула (= сэкономленные выделения)
+        self.allocated = 0     # сколько объектов создали всего (включая предвыделенные)
+        self.active = 0        # сколько сейчас в игре
+        self.high_water = 0    # максимум одновременно активных
+
+    @property
+    def hit_rate(self):
+        return self.reused / self.acquired if self.acquired else 1.0
+
+    def as_dict(self):
+        return {
+            "acquired": self.acquired,
+            "reused": self.reused,
+            "allocated": self.allocated,
+            "allocations_avoided": self.reused,
+            "active": self.active,
+            "high_water": self.high_water,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+class BulletPool:
+    """
+    Пул пуль. Отработавшая пуля не уничтожается, а возвращается в пул
+    (Bullet.remove_from_sprite_lists сам зовет release), поэтому в перестрелке
+    не гоняем каждый раз arcade.Sprite.__init__ с поиском текстуры.
+    Пули игрока и врагов лежат в разных пулах: у них разные текстуры.
+    """
+
+    def __init__(self, player_capacity=32, enemy_capacity=64):
+        self.free = {False: [], True: []}
+        self.stats = {False: PoolStats(), True: PoolStats()}
+        self.preallocate(False, player_capacity)
+        self.preallocate(True, enemy_capacity)
+
+    def preallocate(self, is_enemy, count):
+        for _ in range(count):
+            self.free[is_enemy].append(self.allocate(is_enemy))
+
+    def allocate(self, is_enemy):
+        bullet = Bullet(is_enemy=is_enemy)
+        bullet.pool = self
+        self.stats[is_enemy].allocated += 1
+        return bullet
+
+    def acquire(self, is_enemy=False):
+        # Выдаем пулю из пула (или создаем новую, если пул пуст)
+        stats = self.stats[is_enemy]
+        stats.acquired += 1
+        free = self.free[is_enemy]
+        if free:
+            bullet = free.pop()
+            stats.reused += 1
+        else:
+            bullet = self.allocate(is_enemy)
+        bullet.reset()
+        bullet.in_pool = False
+        stats.active += 1
+        if stats.active > stats.high_water:
+            stats.high_water = stats.active
+        return bullet
+
+    def release(self, bullet):
+        # Повторный возврат (пулю удалили из двух мест за кадр) игнорируем
+        if bullet.in_pool:
+            return
+        bullet.in_pool = True
+        self.stats[bullet.is_enemy].active -= 1
+        self.free[bullet.is_enemy].append(bullet)
+
+    def report(self):
+        return {
+            "player": self.stats[False].as_dict(),
+            "enemy": self.stats[True].as_dict(),
+        }
@@ -0,0 +1,145 @@
+"""
+Покадровый профилировщик.
+Код размечается именованными областями:
+
+    with profiler.scope("update.collisions"):
+        ...
+
+Выключенный профилировщик возвращает один и тот же пустой контекст, так что
+разметка почти ничего не стоит. Включенный суммирует время областей за кадр
+и хранит последние WINDOW кадров для оверлея (средние мс по фазам). Во время
+записи каждая область еще и пишется событием в формате Chrome Trace
+(открывается в chrome://tracing и ui.perfetto.dev).
+"""
+import json
+import threading
+import time
+from collections import deque
+
+# Сколько кадров усредняет оверлей
+WINDOW = 120
+# Предел событий в одной записи трассы (примерно минута тяжелой игры)
+MAX_EVENTS = 500000
+
+
+class NullScope:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SCOPE = NullScope()
+
+
+class Scope:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, self.start, time.perf_counter())
+        return False
+
+
+class Profiler:
+    def __init__(self, window=WINDOW):
+        self.enabled = False
+        self.recording = False
+        self.frame = {}
+        self.frames = deque(maxlen=window)
+        self.frame_start = time.perf_counter()
+        self.counters = {}
+        # События трассы: (имя, начало, длительность, поток) или (имя, время, значение) для счетчиков
+        self.events = []
+        self.counter_events = []
+        self.trace_start = 0.0
+
+    def scope(self, name):
+        if not self.enabled:
+            return NULL_SCOPE
+        return Scope(self, name)
+
+    def add(self, name, start, end):
+        duration = end - start
+        frame = self.frame
+        frame[name] = frame.get(name, 0.0) + duration
+        if self.recording:
+            self.events.append((name, start, duration, threading.get_ident()))
+            if len(self.events) >= MAX_EVENTS:
+                self.recording = False
+
+    def count(self, name, value):
+        # Счетчик (число врагов, частиц...) - показывается в оверлее и пишется в трассу
+        if not self.enabled:
+            return
+        self.counters[name] = value
+        if self.recording:
+            self.counter_events.append((name, time.perf_counter(), value))
+
+    def end_frame(self):
+        # Закрываем кадр: суммы областей уходят в скользящее окно
+        now = time.perf_counter()
+        if not self.enabled:
+            self.frame_start = now
+            return
+        frame = self.frame
+        frame["frame"] = now - self.frame_start
+        self.frames.append(frame)
+        self.frame = {}
+        self.frame_start = now
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.frame = {}
+        self.frames.clear()
+        self.frame_start = time.perf_counter()
+        if not self.enabled:
+            self.recording = False
+        return self.enabled
+
+    def averages(self):
+        # {область: средние мс за кадр} по скользящему окну
+        frames = self.frames
+        if not frames:
+            return {}
+        totals = {}
+        for frame in frames:
+            for name, value in frame.items():
+                totals[name] = totals.get(name, 0.0) + value
+        return {name: total / len(frames) * 1000 for name, total in totals.items()}
+
+    def start_trace(self):
+        self.enabled = True
+        self.recording = True
+        self.events = []
+        self.counter_events = []
+        self.trace_start = time.perf_counter()
+
+    def stop_trace(self):
+        # Останавливает запись и возвращает JSON в формате Chrome Trace
+        self.recording = False
+        origin = self.trace_start
+        threads = {}
+        trace = []
+        for name, start, duration, thread in self.events:
+            tid = threads.setdefault(thread, len(threads) + 1)
+            trace.append({"name": name, "ph": "X", "pid": 1, "tid": tid,
+                          "ts": round((start - origin) * 1e6, 3), "dur": round(duration * 1e6, 3)})
+        for name, at, value in self.counter_events:
+            trace.append({"name": name, "ph": "C", "pid": 1, "ts": round((at - origin) * 1e6, 3),
+                          "args": {name: value}})
+        self.events = []
+        self.counter_events = []
+        return json.dumps({"traceEvents": trace, "displayTimeUnit": "ms"})
+
+
+# Единственный профилировщик на процесс
+profiler = Profiler()
@@ -0,0 +1,133 @@
+"""
+Адаптивное качество по бюджету кадра.
+QualityGovernor смотрит на скользящее среднее длины кадра и, если машина
+не успевает, опускает уровень качества на ступень, а когда запас снова
+появился - поднимает обратно. Чтобы уровень не "дребезжал" на границе:
+- вниз - когда среднее больше бюджета в DOWN_RATIO раз;
+- вверх - только если среднее меньше бюджета в UP_RATIO раз целых UP_HOLD секунд;
+- после каждой смены окно замеров очищается и COOLDOWN секунд ничего не меняется.
+
+Что меняет уровень (QualityTier):
+  particle_budget  - лимит живых частиц (src/particles.py);
+  star_density     - доля звезд фона (Starfield.density);
+  voices           - голосов у микшера эффектов (src/mixer.py);
+  separation_every - раз во сколько тиков враги расталкиваются;
+  lod_intervals    - раз во сколько тиков обновляются near/mid/far (src/lod.py).
+
+Первые три - чистая косметика и живут в GameView. Последние два меняют ход
+игры, поэтому уровень передается миру в Inputs.quality и пишется в реплей
+вместе с нажатиями: воспроизведение повторяет забег на тех же уровнях.
+Модуль не зависит от arcade, чтобы World мог брать из него TIERS без окна.
+"""
+from collections import deque
+
+# Бюджет кадра: 60 FPS
+TARGET_FRAME = 1 / 60
+# Сколько последних кадров усредняем
+WINDOW = 60
+# Вниз - если среднее больше бюджета в DOWN_RATIO раз
+DOWN_RATIO = 1.2
+# Вверх - если среднее меньше бюджета в UP_RATIO раз непрерывно UP_HOLD секунд
+UP_RATIO = 0.75
+UP_HOLD = 5.0
+# Пауза после смены уровня: новый уровень должен успеть себя показать
+COOLDOWN = 2.0
+# Кадры длиннее этого - не нагрузка, а перетаскивание окна или загрузка, их не считаем
+MAX_FRAME = 0.25
+# Сколько последних смен уровня показывать в оверлее
+HISTORY = 4
+
+
+class QualityTier:
+    def __init__(self, name, particle_budget, star_density, voices, separation_every, lod_intervals):
+        self.name = name
+        self.particle_budget = particle_budget
+        self.star_density = star_density
+        self.voices = voices
+        self.separation_every = separation_every
+        self.lod_intervals = lod_intervals
+
+
+# От лучшего к худшему. Уровень 0 - как игра работала без регулятора.
+# Уровней не больше 4: в реплее под уровень отведено два бита (src/replay.py).
+TIERS = (
+    QualityTier("высокое", particle_budget=2000, star_density=1.0, voices=12, separation_every=1,
+                lod_intervals=(1, 2, 8)),
+    QualityTier("среднее", particle_budget=1200, star_density=0.75, voices=8, separation_every=2,
+                lod_intervals=(1, 3, 12)),
+    QualityTier("низкое", particle_budget=600, star_density=0.5, voices=6, separation_every=3,
+                lod_intervals=(1, 4, 16)),
+    QualityTier("минимальное", particle_budget=300, star_density=0.34, voices=4, separation_every=4,
+                lod_intervals=(1, 6, 24)),
+)
+
+
+class QualityGovernor:
+    def __init__(self, budget=TARGET_FRAME, level=0):
+        self.budget = budget
+        self.level = level
+        self.frames = deque(maxlen=WINDOW)
+        self.total = 0.0
+        # Сколько секунд подряд есть запас для подъема и сколько осталось паузы после смены
+        self.headroom_time = 0.0
+        self.cooldown = 0.0
+        # Последние смены: (было, стало, причина)
+        self.history = deque(maxlen=HISTORY)
+
+    @property
+    def tier(self):
+        return TIERS[self.level]
+
+    def average(self):
+        return self.total / len(self.frames) if self.frames else 0.0
+
+    def observe(self, frame_time):
+        # Один кадр. Возвращает True, если уровень поменялся и его надо применить.
+        if frame_time > MAX_FRAME:
+            return False
+        frames = self.frames
+        if len(frames) == frames.maxlen:
+            self.total -= frames[0]
+        frames.append(frame_time)
+        self.total += frame_time
+
+        if self.cooldown > 0:
+            self.cooldown -= frame_time
+            return False
+        if len(frames) < frames.maxlen:
+            return False
+
+        average = self.average()
+        if average > self.budget * DOWN_RATIO:
+            self.headroom_time = 0.0
+            if self.level < len(TIERS) - 1:
+                return self.change(self.level + 1, f"кадр {average * 1000:.1f} мс > "
+                                                   f"{self.budget * DOWN_RATIO * 1000:.1f} мс")
+            return False
+        if average < self.budget * UP_RATIO and self.level > 0:
+            self.headroom_time += frame_time
+            if self.headroom_time >= UP_HOLD:
+                return self.change(self.level - 1, f"кадр {average * 1000:.1f} мс < "
+                                                   f"{self.budget * UP_RATIO * 1000:.1f} мс {UP_HOLD:.0f} с")
+        else:
+            self.headroom_time = 0.0
+        return False
+
+    def change(self, level, reason):
+        self.history.append((self.level, level, reason))
+        self.level = level
+        # Старые замеры относятся к прошлому уровню
+        self.frames.clear()
+        self.total = 0.0
+        self.headroom_time = 0.0
+        self.cooldown = COOLDOWN
+        return True
+
+    def report(self):
+        # Строки для оверлея профилировщика
+        lines = [f"качество: {self.tier.name} ({self.level}/{len(TIERS) - 1}), "
+                 f"кадр {self.average() * 1000:.1f} мс при бюджете {self.budget * 1000:.1f} мс"]
+        for old, new, reason in self.history:
+            arrow = "↓" if new > old else "↑"
+            lines.append(f"  {arrow} {TIERS[old].name} -> {TIERS[new].name}: {reason}")
+        return lines
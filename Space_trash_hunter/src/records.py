@@ -0,0 +1,260 @@
+"""
+Рекорды и история забегов.
+Единственный источник правды - словарь в памяти: меню читает его без
+обращения к диску, а запись на диск идет в фоновом потоке (write-behind).
+Файл пишется атомарно: сначала во временный файл, потом os.replace, так что
+падение посреди записи оставляет либо старый, либо новый файл целиком.
+Если records.json битый или пропал, лучшие результаты восстанавливаются
+из истории забегов.
+История - файл JSON-строк, куда только дописывают (по строке на забег
+и на каждый сброс рекорда).
+Когда строк становится слишком много, файл сжимается: старые забеги
+сворачиваются в одну строку-сводку по уровням.
+"""
+import json
+import os
+import queue
+import threading
+import time
+
+# Сколько последних забегов хранить целиком после сжатия истории
+HISTORY_KEEP = 1000
+# Сжимаем, когда в файле накопилось столько строк
+HISTORY_COMPACT_AT = 4000
+# Поля сводки по уровню (строка {"summary": ...} после сжатия)
+SUMMARY_FIELDS = ("runs", "best", "total_score", "total_time")
+
+
+def write_atomic(path, data):
+    # Пишем во временный файл рядом и подменяем им старый одним вызовом
+    tmp_path = path + ".tmp"
+    mode = "wb" if isinstance(data, bytes) else "w"
+    with open(tmp_path, mode) as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def valid_entry(entry):
+    # Строка истории - корректный JSON, но не обязательно нашей формы (файл правили руками, портили)
+    if not isinstance(entry, dict):
+        return False
+    if "summary" in entry:
+        summary = entry["summary"]
+        return isinstance(summary, dict) and all(
+            isinstance(stats, dict) and all(is_number(stats.get(field)) for field in SUMMARY_FIELDS)
+            for stats in summary.values())
+    if "reset" in entry:
+        return isinstance(entry["reset"], (int, str))
+    return "level" in entry and is_number(entry.get("score")) and is_number(entry.get("duration"))
+
+
+class RecordsStore:
+    def __init__(self, path, history_path, levels):
+        self.path = path
+        self.history_path = history_path
+        self.levels = [str(level) for level in levels]
+        self.records = {}
+        # Строк в файле истории (считается при первой записи в фоновом потоке)
+        self.history_lines = None
+        self.tasks = queue.Queue()
+        self.worker = None
+        self.lock = threading.Lock()
+        self.load()
+
+    # ---------- Чтение (один раз при старте) ----------
+
+    def load(self):
+        records = None
+        try:
+            with open(self.path, "r") as f:
+                records = json.load(f)
+            if not isinstance(records, dict):
+                raise ValueError("records.json должен быть словарем")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as error:
+            # json.JSONDecodeError - тоже ValueError
+            print(f"Предупреждение: {self.path} поврежден ({error}), восстанавливаем из истории.")
+            records = None
+
+        if records is None:
+            records = self.best_from_history()
+            if any(records.values()):
+                self.schedule_save(records)
+
+        self.records = {level: 0 for level in self.levels}
+        for level, score in records.items():
+            if isinstance(score, (int, float)):
+                self.records[str(level)] = int(score)
+
+    def best_from_history(self):
+        best = {level: 0 for level in self.levels}
+        for entry in self.read_history():
+            if "summary" in entry:
+                for level, stats in entry["summary"].items():
+                    best[level] = max(best.get(level, 0), stats["best"])
+            elif "reset" in entry:
+                best[str(entry["reset"])] = 0
+            else:
+                level = str(entry["level"])
+                best[level] = max(best.get(level, 0), entry["score"])
+        return best
+
+    def read_history(self):
+        # Битые строки (например, последняя, оборванная при падении) и записи чужой формы пропускаем
+        entries = []
+        try:
+            with open(self.history_path, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if valid_entry(entry):
+                        entries.append(entry)
+        except FileNotFoundError:
+            pass
+        return entries
+
+    # ---------- Кэш ----------
+
+    def all(self):
+        # Копия, чтобы вызывающий не менял кэш в обход записи на диск
+        return dict(self.records)
+
+    def get(self, level):
+        return self.records.get(str(level), 0)
+
+    def submit(self, level, score):
+        # Новый рекорд попадает в кэш сразу, а на диск - в фоне
+        level = str(level)
+        if score > self.records.get(level, 0):
+            self.records[level] = score
+            self.schedule_save(self.all())
+            return True
+        return False
+
+    def reset(self, level):
+        # Сброс тоже пишется в историю, иначе восстановление вернуло бы старый рекорд
+        self.records[str(level)] = 0
+        self.schedule_save(self.all())
+        self.schedule(self.append_history, {"reset": level})
+
+    def record_run(self, level, score, duration, cause):
+        # Один забег: обновляем рекорд и дописываем строку в историю
+        self.submit(level, score)
+        entry = {"level": level, "score": score, "duration": round(duration, 2), "cause": cause,
+                 "time": int(time.time())}
+        self.schedule(self.append_history, entry)
+
+    # ---------- Фоновая запись ----------
+
+    def schedule(self, task, *args):
+        with self.lock:
+            if self.worker is None:
+                self.worker = threading.Thread(target=self.run_worker, name="records", daemon=True)
+                self.worker.start()
+        self.tasks.put((task, args))
+
+    def schedule_save(self, records):
+        self.schedule(self.save, records)
+
+    def write_file(self, path, data):
+        # Атомарная запись произвольного файла в том же фоновом потоке (например, реплея)
+        self.schedule(write_atomic, path, data)
+
+    def run_worker(self):
+        while True:
+            task, args = self.tasks.get()
+            try:
+                if task is None:
+                    return
+                # Из нескольких сохранений рекордов подряд важно только последнее
+                if task == self.save:
+                    args = self.latest_save(args)
+                task(*args)
+            except OSError as error:
+                print(f"Предупреждение: не удалось записать рекорды ({error})")
+            except Exception as error:
+                # Поток не должен умирать: иначе очередь не разберется и flush() зависнет навсегда
+                print(f"Предупреждение: ошибка фоновой записи рекордов ({error!r})")
+            finally:
+                self.tasks.task_done()
+
+    def latest_save(self, args):
+        # Пропускаем устаревшие снимки рекордов, если следом в очереди лежит более новый
+        while True:
+            with self.tasks.mutex:
+                if not self.tasks.queue:
+                    return args
+                task, next_args = self.tasks.queue[0]
+            if task != self.save:
+                return args
+            self.tasks.get_nowait()
+            self.tasks.task_done()
+            args = next_args
+
+    def save(self, records):
+        write_atomic(self.path, json.dumps(records))
+
+    def append_history(self, entry):
+        if self.history_lines is None:
+            self.history_lines = len(self.read_history())
+        with open(self.history_path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+        self.history_lines += 1
+        if self.history_lines >= HISTORY_COMPACT_AT:
+            self.compact_history()
+
+    def compact_history(self):
+        # Старые забеги сворачиваем в сводку {уровень: {runs, best, total_score, total_time}},
+        # последние HISTORY_KEEP оставляем как есть
+        entries = self.read_history()
+        summary = {}
+        runs = []
+        for entry in entries:
+            if "summary" in entry:
+                for level, stats in entry["summary"].items():
+                    self.merge_summary(summary, level, stats)
+            else:
+                runs.append(entry)
+        old, recent = runs[:-HISTORY_KEEP], runs[-HISTORY_KEEP:]
+        for entry in old:
+            if "reset" in entry:
+                level = str(entry["reset"])
+                if level in summary:
+                    summary[level]["best"] = 0
+                continue
+            self.merge_summary(summary, str(entry["level"]), {
+                "runs": 1, "best": entry["score"], "total_score": entry["score"],
+                "total_time": entry["duration"]})
+
+        lines = [json.dumps({"summary": summary})] if summary else []
+        lines.extend(json.dumps(entry) for entry in recent)
+        write_atomic(self.history_path, "".join(line + "\n" for line in lines))
+        self.history_lines = len(lines)
+
+    @staticmethod
+    def merge_summary(summary, level, stats):
+        total = summary.setdefault(level, {"runs": 0, "best": 0, "total_score": 0, "total_time": 0})
+        total["runs"] += stats["runs"]
+        total["best"] = max(total["best"], stats["best"])
+        total["total_score"] += stats["total_score"]
+        total["total_time"] = round(total["total_time"] + stats["total_time"], 2)
+
+    def flush(self):
+        # Дождаться, пока все отложенные записи попадут на диск
+        if self.worker is not None:
+            self.tasks.join()
+
+    def close(self):
+        if self.worker is not None:
+            self.tasks.put((None, ()))
+            self.worker.join()
+            self.worker = None
@@ -0,0 +1,389 @@
+"""
+Запись и воспроизведение забегов.
+Мир детерминирован: сид (src/rng.py) + нажатия на каждом тике полностью
+задают забег. Поэтому запись - это только компактный двоичный лог
+нажатий, а воспроизведение - прогон World без окна во много раз быстрее
+реального времени. Каждые SNAPSHOT_EVERY тиков сохраняется снимок
+состояния мира, чтобы перемотка не пересчитывала забег с начала.
+
+Формат файла: заголовок HEADER, затем серии RUN (состояние клавиш, сколько
+тиков подряд оно держалось). Состояние клавиш - один байт:
+бит 0 - газ, бит 1 - выстрел, бит 2 - поворот вправо, бит 3 - влево,
+биты 4-5 - уровень качества симуляции (src/quality.py).
+Уровень меняется редко, поэтому серии от него почти не дробятся.
+
+Лог хранит только нажатия, поэтому повторяется он лишь той же симуляцией.
+VERSION поднимается при каждом изменении, которое меняет ход забега
+(спавн, порядок обновления, столкновения, формат байта), а реплеи других
+версий не воспроизводятся: они бы молча разошлись с записью.
+По той же причине в заголовке лежат флаги симуляции: с NumPy враги
+считаются пакетно (src/steering.py), и результат отличается от спрайтового
+пути в младших битах, так что реплей играется только там, где флаги совпадают.
+
+Запуск: python -m src.replay last_run.replay [--seek ТИК] [--profile]
+"""
+import argparse
+import cProfile
+import pstats
+import struct
+import time
+
+from src.world import World, Inputs, TICK_RATE
+from src.steering import SteeringEngine
+from src.sprites import ChaserEnemy, ShooterEnemy, KamikazeEnemy, ExplosionParticle, Asteroid, Trash, RepairKit
+
+MAGIC = b"STHR"
+# 6 - стартовая раскладка batch() без Бридсона. Поднимать при любом изменении симуляции.
+VERSION = 6
+# Начало заголовка одинаково во всех версиях: по нему узнаем версию
+PREFIX = struct.Struct("<4sB")
+# Заголовок: магия, версия, флаги симуляции, уровень, сид, тиков в секунду, всего тиков, итоговый счет
+HEADER = struct.Struct("<4sBBBQHIi")
+# Серия одинаковых состояний клавиш
+RUN = struct.Struct("<BH")
+MAX_RUN = 0xFFFF
+
+THRUST = 1
+FIRE = 2
+RIGHT = 4
+LEFT = 8
+QUALITY_SHIFT = 4
+QUALITY_MASK = 0x30
+
+# Флаги симуляции: враги считались пакетно на NumPy
+NUMPY_STEERING = 1
+
+# Снимок мира раз в 10 секунд игры
+SNAPSHOT_EVERY = 600
+
+
+def simulation_flags():
+    # Чем эта сборка считает мир (World берет SteeringEngine, если NumPy есть)
+    return NUMPY_STEERING if SteeringEngine.available() else 0
+
+
+def encode(inputs):
+    state = 0
+    if inputs.thrust:
+        state |= THRUST
+    if inputs.fire:
+        state |= FIRE
+    if inputs.turn > 0:
+        state |= RIGHT
+    elif inputs.turn < 0:
+        state |= LEFT
+    state |= inputs.quality << QUALITY_SHIFT
+    return state
+
+
+def decode(state):
+    turn = 1 if state & RIGHT else (-1 if state & LEFT else 0)
+    return Inputs(thrust=bool(state & THRUST), turn=turn, fire=bool(state & FIRE),
+                  quality=(state & QUALITY_MASK) >> QUALITY_SHIFT)
+
+
+# Мир не меняет Inputs, поэтому все 64 варианта создаются один раз
+DECODED = [decode(state) for state in range(64)]
+
+
+class InputLog:
+    """
+    Нажатия одного забега. append() вызывается на каждый вызов World.step,
+    в том числе на последний, который только вернул результат.
+    """
+
+    def __init__(self, level, seed, tick_rate=TICK_RATE):
+        self.level = level
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.flags = simulation_flags()
+        # [состояние, длина серии]
+        self.runs = []
+        self.ticks = 0
+        self.score = 0
+
+    def __len__(self):
+        return sum(count for _, count in self.runs)
+
+    def append(self, inputs):
+        state = encode(inputs)
+        runs = self.runs
+        if runs and runs[-1][0] == state and runs[-1][1] < MAX_RUN:
+            runs[-1][1] += 1
+        else:
+            runs.append([state, 1])
+
+    def finish(self, world):
+        # Итог забега - чтобы при воспроизведении проверить, что он повторился
+        self.ticks = world.tick
+        self.score = world.score
+
+    def states(self):
+        # Состояние клавиш на каждый тик
+        states = []
+        for state, count in self.runs:
+            states.extend([state] * count)
+        return states
+
+    def to_bytes(self):
+        parts = [HEADER.pack(MAGIC, VERSION, self.flags, self.level, self.seed, self.tick_rate, self.ticks,
+                             self.score)]
+        parts.extend(RUN.pack(state, count) for state, count in self.runs)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < HEADER.size or PREFIX.unpack_from(data)[0] != MAGIC:
+            raise ValueError("Это не файл реплея Space Scavenger")
+        version = PREFIX.unpack_from(data)[1]
+        if version != VERSION:
+            raise ValueError(f"Реплей версии {version}, а эта сборка воспроизводит только версию {VERSION}: "
+                             f"симуляция с тех пор изменилась")
+        magic, version, flags, level, seed, tick_rate, ticks, score = HEADER.unpack_from(data)
+        if flags != simulation_flags():
+            recorded = "с NumPy" if flags & NUMPY_STEERING else "без NumPy"
+            here = "без NumPy" if flags & NUMPY_STEERING else "с NumPy"
+            raise ValueError(f"Реплей записан {recorded}, а здесь игра идет {here}: враги двигались бы иначе")
+        log = cls(level, seed, tick_rate)
+        log.ticks = ticks
+        log.score = score
+        log.runs = [list(run) for run in RUN.iter_unpack(data[HEADER.size:])]
+        return log
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+# ==========================================
+#            СНИМКИ СОСТОЯНИЯ МИРА
+# ==========================================
+def lod_state(sprite):
+    return sprite.lod_tier, sprite.lod_last, sprite.lod_phase
+
+
+def set_lod_state(sprite, state):
+    sprite.lod_tier, sprite.lod_last, sprite.lod_phase = state
+
+
+def capture_state(world):
+    """
+    Все, что влияет на следующие тики: спрайты (в порядке списков), счет,
+    потоки случайности. Текстуры не копируются - у астероида запоминается только путь.
+    """
+    player = world.player_sprite
+    state = {
+        "tick": world.tick,
+        "score": world.score,
+        "result": world.result,
+        "last_damage": world.last_damage,
+        "rng": world.rng.state(),
+        "player": (player.position, player.angle, player.change_angle, player.speed_x, player.speed_y,
+                   player.hp),
+        "lod_phase": world.lod.next_phase,
+        "quality": world.quality,
+        "sectors": world.sectors.state() if world.sectors is not None else None,
+        "asteroids": [(a.img, a.scale, a.position, a.angle, a.change_x, a.change_y, a.rotation_speed,
+                       lod_state(a)) for a in world.asteroid_list],
+        "trash": [t.position for t in world.trash_list],
+        "repairs": [r.position for r in world.repair_list],
+        "enemies": [(e.STEERING_KIND, e.position, e.angle, e.hp, getattr(e, "shoot_timer", 0),
+                     getattr(e, "wobble", 0), lod_state(e)) for e in world.enemy_list],
+        "bullets": [(b.is_enemy, b.position, b.angle, b.change_x, b.change_y, b.time_to_live)
+                    for b in world.bullet_list],
+        "particle_sprites": [(p.position, p.angle, p.change_x, p.change_y, p.change_angle, p.alpha,
+                              p.fade_rate, p.color) for p in world.particle_list],
+        "particles": None,
+    }
+    particles = world.particles
+    if particles is not None:
+        count = particles.count
+        state["particles"] = (count, particles.dropped,
+                              {name: getattr(particles, name)[:count].copy() for name in particles.FIELDS})
+    return state
+
+
+def restore_state(world, state):
+    # Очищаем списки мира и собираем их заново из снимка. Игрок остается тем же объектом:
+    # на него ссылаются враги.
+    for sprite_list in (world.bullet_list, world.enemy_list, world.asteroid_list, world.trash_list,
+                        world.repair_list, world.particle_list):
+        for sprite in list(sprite_list):
+            sprite.remove_from_sprite_lists()
+
+    player = world.player_sprite
+    (player.position, player.angle, player.change_angle, player.speed_x, player.speed_y,
+     player.hp) = state["player"]
+
+    for img, scale, position, angle, change_x, change_y, rotation_speed, lod in state["asteroids"]:
+        asteroid = Asteroid(world.asteroid_rng, img, scale)
+        set_lod_state(asteroid, lod)
+        asteroid.position = position
+        asteroid.angle = angle
+        asteroid.change_x = change_x
+        asteroid.change_y = change_y
+        asteroid.rotation_speed = rotation_speed
+        world.asteroid_list.append(asteroid)
+    for position in state["trash"]:
+        trash = Trash()
+        trash.position = position
+        world.trash_list.append(trash)
+    for position in state["repairs"]:
+        kit = RepairKit()
+        kit.position = position
+        world.repair_list.append(kit)
+
+    for kind, position, angle, hp, shoot_timer, wobble, lod in state["enemies"]:
+        if kind == ShooterEnemy.STEERING_KIND:
+            enemy = world.new_shooter()
+            enemy.shoot_timer = shoot_timer
+        elif kind == KamikazeEnemy.STEERING_KIND:
+            enemy = KamikazeEnemy(world.player_sprite, world.enemy_list)
+            enemy.wobble = wobble
+        else:
+            enemy = ChaserEnemy(world.player_sprite, world.enemy_list)
+        enemy.position = position
+        enemy.angle = angle
+        enemy.hp = hp
+        enemy.grid = world.enemy_grid
+        set_lod_state(enemy, lod)
+        world.enemy_list.append(enemy)
+
+    for is_enemy, position, angle, change_x, change_y, time_to_live in state["bullets"]:
+        bullet = world.bullet_pool.acquire(is_enemy)
+        bullet.position = position
+        bullet.angle = angle
+        bullet.change_x = change_x
+        bullet.change_y = change_y
+        bullet.time_to_live = time_to_live
+        world.bullet_list.append(bullet)
+
+    for position, angle, change_x, change_y, change_angle, alpha, fade_rate, color in state["particle_sprites"]:
+        particle = ExplosionParticle(position[0], position[1], color, world.particle_rng)
+        particle.angle = angle
+        particle.change_x = change_x
+        particle.change_y = change_y
+        particle.change_angle = change_angle
+        particle.alpha = alpha
+        particle.fade_rate = fade_rate
+        world.particle_list.append(particle)
+
+    particles = world.particles
+    if particles is not None and state["particles"]:
+        count, dropped, fields = state["particles"]
+        particles.set_budget(max(particles.budget, count))
+        for name, values in fields.items():
+            getattr(particles, name)[:count] = values
+        particles.count = count
+        particles.dropped = dropped
+
+    world.tick = state["tick"]
+    world.moved_tick = state["tick"]
+    world.lod.next_phase = state["lod_phase"]
+    world.set_quality(state["quality"])
+    if world.sectors is not None:
+        world.sectors.set_state(state["sectors"])
+    world.score = state["score"]
+    world.result = state["result"]
+    world.last_damage = state["last_damage"]
+    world.sound_events = []
+    world.spawn_queue.clear()
+    world.graveyard.clear()
+    # Конструкторы выше тоже брали случайные числа, поэтому потоки восстанавливаем последними
+    world.rng.set_state(state["rng"])
+
+
+# ==========================================
+#               ВОСПРОИЗВЕДЕНИЕ
+# ==========================================
+class Replay:
+    def __init__(self, log, snapshot_every=SNAPSHOT_EVERY):
+        self.log = log
+        self.states = log.states()
+        self.delta_time = 1 / log.tick_rate
+        self.snapshot_every = snapshot_every
+        self.world = World(log.level, log.seed)
+        self.world.setup()
+        # Сколько записанных тиков уже проиграно
+        self.position = 0
+        # {позиция: снимок}
+        self.snapshots = {0: capture_state(self.world)}
+        self.next_snapshot = snapshot_every
+
+    def step(self):
+        # Один записанный тик. False - запись кончилась или игра завершилась.
+        world = self.world
+        if self.position >= len(self.states) or world.result:
+            return False
+        world.step(self.delta_time, DECODED[self.states[self.position]])
+        world.sound_events.clear()
+        self.position += 1
+        # Снимок не берется, пока в очереди спавна кто-то ждет: такие объекты еще не в списках мира.
+        # Очередь пустеет за пару тиков, так что снимок просто чуть сдвигается.
+        if self.position >= self.next_snapshot and not world.spawn_queue:
+            self.snapshots[self.position] = capture_state(world)
+            self.next_snapshot = self.position + self.snapshot_every
+        return True
+
+    def run(self, until=None):
+        # Прогон до тика until (или до конца записи). Возвращает (тиков, секунд).
+        start_position = self.position
+        start = time.perf_counter()
+        while (until is None or self.position < until) and self.step():
+            pass
+        return self.position - start_position, time.perf_counter() - start
+
+    def seek(self, tick):
+        # Перемотка: с ближайшего снимка не позже tick (если он ближе текущей позиции), дальше - прогоном
+        nearest = max(position for position in self.snapshots if position <= tick)
+        if tick < self.position or nearest > self.position:
+            restore_state(self.world, self.snapshots[nearest])
+            self.position = nearest
+        return self.run(until=tick)
+
+    def matches_recording(self):
+        log = self.log
+        return self.world.tick == log.ticks and self.world.score == log.score
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Воспроизведение записанного забега без окна")
+    parser.add_argument("path", help="файл реплея (last_run.replay)")
+    parser.add_argument("--seek", type=int, default=None, help="перемотать на тик и остановиться")
+    parser.add_argument("--profile", action="store_true", help="прогнать под cProfile и показать топ функций")
+    args = parser.parse_args()
+
+    try:
+        log = InputLog.load(args.path)
+    except ValueError as error:
+        parser.error(str(error))
+    replay = Replay(log)
+    print(f"Уровень {log.level}, сид {log.seed}, записано тиков: {len(log)}")
+
+    if args.seek is not None:
+        ticks, seconds = replay.seek(args.seek)
+    elif args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        ticks, seconds = replay.run()
+        profiler.disable()
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+    else:
+        ticks, seconds = replay.run()
+
+    world = replay.world
+    game_seconds = ticks / log.tick_rate
+    speed = game_seconds / seconds if seconds else float("inf")
+    print(f"Тик {world.tick}, счет {world.score}, результат {world.result}")
+    print(f"Прогнано {ticks} тиков за {seconds:.2f} с ({speed:.0f}x реального времени)")
+    if args.seek is None:
+        print("Совпадает с записью" if replay.matches_recording() else "РАСХОЖДЕНИЕ с записью!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Случайность с сидом, отдельный поток на каждую подсистему.
+Все случайные решения мира берутся из этих потоков, а не из глобального
+random, поэтому один и тот же сид + те же нажатия дают тот же забег.
+Потоки независимы: если, например, взрывы начнут рождать больше частиц,
+это не сдвинет ни спавн врагов, ни астероиды.
+"""
+import random
+import zlib
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Подсистемы мира, у каждой свой поток
+SPAWN = "spawn"          # позиции появления объектов
+ENEMIES = "enemies"      # тип нового врага, шанс спавна, таймеры стрельбы
+ASTEROIDS = "asteroids"  # вид, размер, вращение и скорость астероидов
+LOOT = "loot"            # аптечки
+PARTICLES = "particles"  # частицы взрывов
+
+
+class RandomStreams:
+    def __init__(self, seed=None):
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self.streams = {}
+        self.numpy_streams = {}
+
+    def derive(self, name):
+        # Сид потока из общего сида и имени подсистемы (стабилен между запусками и версиями Python)
+        return zlib.crc32(f"{self.seed}:{name}".encode())
+
+    def get(self, name):
+        stream = self.streams.get(name)
+        if stream is None:
+            stream = self.streams[name] = random.Random(self.derive(name))
+        return stream
+
+    def numpy(self, name):
+        # Генератор NumPy для векторных подсистем (ParticleSystem)
+        stream = self.numpy_streams.get(name)
+        if stream is None:
+            stream = self.numpy_streams[name] = np.random.default_rng(self.derive(name))
+        return stream
+
+    def state(self):
+        # Состояние всех потоков для снимка мира (см. src/replay.py)
+        return ({name: stream.getstate() for name, stream in self.streams.items()},
+                {name: stream.bit_generator.state for name, stream in self.numpy_streams.items()})
+
+    def set_state(self, state):
+        streams, numpy_streams = state
+        for name, value in streams.items():
+            self.get(name).setstate(value)
+        for name, value in numpy_streams.items():
+            self.numpy(name).bit_generator.state = value
@@ -0,0 +1,220 @@
+"""
+Открытый мир из секторов.
+Арена ±MAP_SIZE заполнялась целиком при старте, поэтому большая карта
+означала линейно больше спрайтов и работы на тик. Здесь мир бесконечный и
+нарезан на квадратные секторы SECTOR_SIZE. Резидентны только секторы рядом
+с игроком:
+
+- сектор в пределах LOAD_RADIUS от сектора игрока загружается;
+- сектор дальше UNLOAD_RADIUS выгружается (между радиусами - гистерезис,
+  чтобы полет вдоль границы не грузил и не выгружал одно и то же);
+- содержимое сектора генерируется из сида мира и координат сектора, поэтому
+  оно не зависит от того, в каком порядке игрок облетал секторы;
+- при выгрузке от сектора остаются только короткие записи (кортежи) о живых
+  объектах: собранный мусор и сбитые астероиды не возвращаются.
+
+Объект принадлежит сектору по своей текущей позиции. Пока сектор выгружен,
+время в нем стоит, поэтому из выгруженных секторов никто не прилетает - и
+чтобы окрестность неподвижного игрока не пустела, астероид, долетевший до
+края загруженной области, разворачивается обратно.
+
+Память и работа на тик зависят от размера окрестности, а не мира.
+Враги не секторные: они и так летят к игроку и появляются вокруг него.
+"""
+import math
+import random
+
+from src.sprites import Asteroid, Trash, RepairKit, TEXTURE_ASTEROIDS
+
+# Сторона сектора: старая арена ±2500 - это 4x4 сектора
+SECTOR_SIZE = 1250
+# Загружаем секторы не дальше LOAD_RADIUS от сектора игрока (3x3),
+# выгружаем дальше UNLOAD_RADIUS
+LOAD_RADIUS = 1
+UNLOAD_RADIUS = 2
+# Раз во сколько тиков разворачивать астероиды, вылетевшие из загруженной области
+SWEEP_EVERY = 60
+# Сколько объектов генерируется в секторе (от, до)
+ASTEROIDS_PER_SECTOR = (1, 3)
+TRASH_PER_SECTOR = (1, 2)
+# Шанс аптечки в секторе (только на уровнях с аптечками)
+REPAIR_CHANCE = 0.15
+
+# Записи сектора: (ASTEROID, x, y, картинка, масштаб, угол, change_x, change_y, вращение),
+# (TRASH, x, y), (REPAIR, x, y)
+ASTEROID = 0
+TRASH = 1
+REPAIR = 2
+LAYERS = {ASTEROID: "asteroids", TRASH: "trash", REPAIR: "repair"}
+
+
+def sector_of(x, y):
+    return math.floor(x / SECTOR_SIZE), math.floor(y / SECTOR_SIZE)
+
+
+def distance(a, b):
+    # Расстояние между секторами в секторах (по большей из осей)
+    return max(abs(a[0] - b[0]), abs(a[1] - b[1]))
+
+
+class SectorMap:
+    def __init__(self, seed, spawner, repairs=False, start_exclusion=600):
+        self.seed = seed
+        # SpawnPlacer мира: его карта переезжает на загруженные секторы
+        self.spawner = spawner
+        self.repairs = repairs
+        # У точки старта (0, 0) генерация ничего не ставит, как и стартовая раскладка арены
+        self.start_exclusion = start_exclusion
+        self.center = None
+        self.loaded = set()
+        # {сектор: [записи]} - выгруженные секторы, которые уже генерировались
+        self.saved = {}
+        # Статистика для оверлея
+        self.loads = 0
+        self.unloads = 0
+
+    def reset(self):
+        self.center = None
+        self.loaded.clear()
+        self.saved.clear()
+
+    def update(self, world):
+        # Каждый тик: игрок сменил сектор - догружаем и выгружаем, иначе изредка разворачиваем беглецов
+        player = world.player_sprite
+        center = sector_of(player.center_x, player.center_y)
+        if center != self.center:
+            self.stream(world, center)
+        elif world.tick % SWEEP_EVERY == 0:
+            self.turn_back(world.asteroid_list)
+
+    def stream(self, world, center):
+        self.center = center
+        for key in [key for key in self.loaded if distance(key, center) > UNLOAD_RADIUS]:
+            self.loaded.discard(key)
+            # Даже пустой сектор помним, чтобы не сгенерировать его заново
+            self.saved.setdefault(key, [])
+            self.unloads += 1
+        self.evict(world)
+
+        cx, cy = center
+        for sx in range(cx - LOAD_RADIUS, cx + LOAD_RADIUS + 1):
+            for sy in range(cy - LOAD_RADIUS, cy + LOAD_RADIUS + 1):
+                if (sx, sy) not in self.loaded:
+                    self.load(world, (sx, sy))
+
+        # Новые объекты (респаун ящиков, враги) появляются в загруженной области
+        self.spawner.center = ((cx + 0.5) * SECTOR_SIZE, (cy + 0.5) * SECTOR_SIZE)
+        self.spawner.map_size = (LOAD_RADIUS + 0.5) * SECTOR_SIZE
+
+    def turn_back(self, asteroids):
+        # Скорость от центра загруженной области меняем на скорость к нему
+        cx = (self.center[0] + 0.5) * SECTOR_SIZE
+        cy = (self.center[1] + 0.5) * SECTOR_SIZE
+        loaded = self.loaded
+        for asteroid in asteroids:
+            if sector_of(asteroid.center_x, asteroid.center_y) in loaded:
+                continue
+            if (asteroid.center_x - cx) * asteroid.change_x > 0:
+                asteroid.change_x = -asteroid.change_x
+            if (asteroid.center_y - cy) * asteroid.change_y > 0:
+                asteroid.change_y = -asteroid.change_y
+
+    def load(self, world, key):
+        records = self.saved.pop(key, None)
+        if records is None:
+            records = self.generate(key)
+        for record in records:
+            sprite = self.build(record)
+            world.add_streamed(sprite, world.graveyard.layers[LAYERS[record[0]]])
+        self.loaded.add(key)
+        self.loads += 1
+
+    def evict(self, world):
+        # Объекты вне загруженных секторов (после смены сектора игрока) уходят в записи своего сектора
+        loaded = self.loaded
+        for kind, layer in LAYERS.items():
+            for sprite in world.graveyard.layers[layer]:
+                key = sector_of(sprite.center_x, sprite.center_y)
+                if key in loaded or sprite in world.graveyard:
+                    continue
+                records = self.saved.get(key)
+                if records is None:
+                    # Объект улетел туда, где игрок еще не был: сектор сначала получает свое содержимое
+                    records = self.saved[key] = self.generate(key)
+                records.append(self.record(kind, sprite))
+                world.kill(sprite, layer)
+
+    def generate(self, key):
+        # Содержимое сектора зависит только от сида мира и координат сектора
+        sx, sy = key
+        rng = random.Random(f"{self.seed}:{sx}:{sy}")
+        left = sx * SECTOR_SIZE
+        bottom = sy * SECTOR_SIZE
+        exclusion = self.start_exclusion
+
+        def point():
+            x = rng.uniform(left, left + SECTOR_SIZE)
+            y = rng.uniform(bottom, bottom + SECTOR_SIZE)
+            return x, y, abs(x) >= exclusion or abs(y) >= exclusion
+
+        records = []
+        for _ in range(rng.randint(*ASTEROIDS_PER_SECTOR)):
+            x, y, allowed = point()
+            img = rng.choice(TEXTURE_ASTEROIDS)
+            scale = rng.uniform(0.5, 0.8)
+            change_x = rng.uniform(-1.5, 1.5)
+            change_y = rng.uniform(-1.5, 1.5)
+            rotation_speed = rng.uniform(-1, 1)
+            if allowed:
+                records.append((ASTEROID, x, y, img, scale, 0.0, change_x, change_y, rotation_speed))
+        for _ in range(rng.randint(*TRASH_PER_SECTOR)):
+            x, y, allowed = point()
+            if allowed:
+                records.append((TRASH, x, y))
+        if self.repairs and rng.random() < REPAIR_CHANCE:
+            x, y, allowed = point()
+            if allowed:
+                records.append((REPAIR, x, y))
+        return records
+
+    @staticmethod
+    def record(kind, sprite):
+        if kind == ASTEROID:
+            return (ASTEROID, sprite.center_x, sprite.center_y, sprite.img, sprite.scale, sprite.angle,
+                    sprite.change_x, sprite.change_y, sprite.rotation_speed)
+        return kind, sprite.center_x, sprite.center_y
+
+    @staticmethod
+    def build(record):
+        kind = record[0]
+        if kind == ASTEROID:
+            _, x, y, img, scale, angle, change_x, change_y, rotation_speed = record
+            sprite = Asteroid(img=img, scale=scale, rotation_speed=rotation_speed)
+            sprite.angle = angle
+            sprite.change_x = change_x
+            sprite.change_y = change_y
+        elif kind == TRASH:
+            _, x, y = record
+            sprite = Trash()
+        else:
+            _, x, y = record
+            sprite = RepairKit()
+        sprite.center_x = x
+        sprite.center_y = y
+        return sprite
+
+    def state(self):
+        # Для снимка мира (src/replay.py): записи - кортежи, копируем только списки
+        return (self.center, set(self.loaded), {key: list(records) for key, records in self.saved.items()},
+                self.spawner.center, self.spawner.map_size)
+
+    def set_state(self, state):
+        center, loaded, saved, spawn_center, spawn_size = state
+        self.center = center
+        self.loaded = set(loaded)
+        self.saved = {key: list(records) for key, records in saved.items()}
+        self.spawner.center = spawn_center
+        self.spawner.map_size = spawn_size
+
+    def report(self):
+        return {"loaded": len(self.loaded), "saved": len(self.saved), "loads": self.loads, "unloads": self.unloads}
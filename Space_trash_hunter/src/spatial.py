@@ -0,0 +1,51 @@
+import math
+
+
+class SpatialGrid:
+    """
+    Равномерная сетка для быстрого поиска соседей.
+    Мир делится на клетки cell_size x cell_size, каждый спрайт лежит в клетке своего центра.
+    Сетку перестраиваем один раз за тик, а потом спрашиваем только ближние клетки
+    вместо перебора всех пар.
+    """
+
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def cell_of(self, x, y):
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def clear(self):
+        self.cells.clear()
+
+    def insert(self, sprite):
+        key = self.cell_of(sprite.center_x, sprite.center_y)
+        bucket = self.cells.get(key)
+        if bucket is None:
+            self.cells[key] = [sprite]
+        else:
+            bucket.append(sprite)
+
+    def rebuild(self, sprites):
+        # Полная перестройка: дешевле, чем отслеживать перемещение каждого спрайта
+        self.cells.clear()
+        for sprite in sprites:
+            self.insert(sprite)
+
+    def query(self, x, y, radius):
+        # Все спрайты из клеток, которые задевает круг (x, y, radius).
+        # Это кандидаты: точную дистанцию проверяет вызывающий код.
+        size = self.cell_size
+        min_cx = int(math.floor((x - radius) / size))
+        max_cx = int(math.floor((x + radius) / size))
+        min_cy = int(math.floor((y - radius) / size))
+        max_cy = int(math.floor((y + radius) / size))
+        cells = self.cells
+        found = []
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.extend(bucket)
+        return found
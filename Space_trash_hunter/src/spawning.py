@@ -0,0 +1,110 @@
+"""
+Выбор точек появления объектов.
+Раньше точка бралась случайно по всей карте и перебрасывалась рекурсией,
+пока не окажется дальше 600 px от игрока. Здесь разрешенная область
+(карта минус квадрат вокруг игрока) заранее режется на прямоугольники,
+и точка сразу берется внутри одного из них - без повторов и рекурсии.
+Квадрат описан вокруг старого круга, поэтому точка никогда не ближе
+exclusion к игроку.
+
+batch() раскладывает сразу много объектов (стартовые астероиды и ящики)
+с минимальным расстоянием друг от друга, чтобы объекты не слипались в кучи:
+случайные точки принимаются, только если рядом нет уже принятых (как в
+выборке Пуассоновского диска). Раскладка останавливается, как только точек
+хватает, поэтому стоит O(count), а не O(площади карты). Алгоритм Бридсона
+тут не подходит: если остановить его раньше, точки собираются пятном вокруг
+первой, а не по всей карте.
+
+Карта - квадрат со стороной 2 * map_size вокруг center. В открытом мире
+(src/sectors.py) center переезжает вслед за игроком на загруженные секторы.
+"""
+import math
+
+
+class SpawnPlacer:
+    # Сколько кандидатов на одну нужную точку пробует batch(), прежде чем сдаться
+    SCATTER_ATTEMPTS = 30
+
+    def __init__(self, rng, map_size, exclusion=600):
+        self.rng = rng
+        self.map_size = map_size
+        self.exclusion = exclusion
+        self.center = (0, 0)
+
+    def bounds(self):
+        # Границы карты: (left, bottom, right, top)
+        cx, cy = self.center
+        size = self.map_size
+        return cx - size, cy - size, cx + size, cy + size
+
+    def allowed_rects(self, px, py):
+        # Карта без квадрата вокруг игрока: до четырех прямоугольников (left, bottom, right, top)
+        map_left, map_bottom, map_right, map_top = self.bounds()
+        left = max(map_left, px - self.exclusion)
+        right = min(map_right, px + self.exclusion)
+        bottom = max(map_bottom, py - self.exclusion)
+        top = min(map_top, py + self.exclusion)
+        if left >= right or bottom >= top:
+            # Игрок за пределами карты - исключать нечего
+            return [(map_left, map_bottom, map_right, map_top)]
+        rects = [
+            (map_left, map_bottom, left, map_top),    # полоса слева
+            (right, map_bottom, map_right, map_top),  # полоса справа
+            (left, map_bottom, right, bottom),        # снизу между полосами
+            (left, top, right, map_top),              # сверху между полосами
+        ]
+        return [rect for rect in rects if rect[2] > rect[0] and rect[3] > rect[1]]
+
+    def place(self, px, py):
+        # Одна точка, равномерно по разрешенной области
+        rects = self.allowed_rects(px, py)
+        if not rects:
+            # Квадрат накрыл всю карту: ставим в угол, самый дальний от игрока
+            left, bottom, right, top = self.bounds()
+            cx, cy = self.center
+            return (left if px > cx else right), (bottom if py > cy else top)
+        areas = [(r - l) * (t - b) for l, b, r, t in rects]
+        roll = self.rng.uniform(0, sum(areas))
+        for rect, area in zip(rects, areas):
+            if roll <= area:
+                break
+            roll -= area
+        left, bottom, right, top = rect
+        return self.rng.uniform(left, right), self.rng.uniform(bottom, top)
+
+    def allowed(self, x, y, px, py):
+        return abs(x - px) >= self.exclusion or abs(y - py) >= self.exclusion
+
+    def batch(self, count, spacing, px, py):
+        """
+        count точек в разрешенной области, попарно не ближе spacing.
+        Если при таком расстоянии на карте не хватает места, недостающие
+        точки добираются обычным place() (уже без гарантии расстояния).
+        """
+        points = self.scatter(count, spacing, px, py)
+        while len(points) < count:
+            points.append(self.place(px, py))
+        return points
+
+    def scatter(self, count, spacing, px, py):
+        # Кандидат - равномерно по разрешенной области (place), принимается, если не ближе spacing
+        # к уже принятым. Сетка с клеткой spacing/sqrt(2) хранит не больше одной точки.
+        rng = self.rng
+        left, bottom, _, _ = self.bounds()
+        cell = spacing / math.sqrt(2)
+        grid = {}
+        points = []
+        for _ in range(count * self.SCATTER_ATTEMPTS):
+            if len(points) >= count:
+                break
+            x, y = self.place(px, py)
+            cx = int((x - left) / cell)
+            cy = int((y - bottom) / cell)
+            if any(other and (other[0] - x) ** 2 + (other[1] - y) ** 2 < spacing * spacing
+                   for other in (grid.get((gx, gy)) for gx in range(cx - 2, cx + 3)
+                                 for gy in range(cy - 2, cy + 3))):
+                continue
+            point = (x, y)
+            grid[(cx, cy)] = point
+            points.append(point)
+        return points
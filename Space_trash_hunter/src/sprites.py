@@ -2,188 +2,236 @@ import arcade
 import random
 import math
 
+from src.assets import assets
 
-class ShipThruster(arcade.Sprite):
-    def __init__(self, owner, offset_dist=35):
-        # для двигателя использована та же текстура, что и для звезд,
-        # покрасил её в оранжевый цвет через свойство color.
-        super().__init__(":resources:images/space_shooter/meteorGrey_tiny1.png", scale=0.8)
-        self.owner = owner
-        self.offset_dist = offset_dist
-        self.animation_timer = 0
-        self.color = arcade.color.ORANGE_PEEL
-
-    def update(self):
-        # Часть с математикой:
-        # Нужно, чтобы огонь всегда был сзади корабля.
-        # Так как угол в Arcade отсчитывается нестандартно, корректируем его (+90 градусов)
-        # использован синус/косинус, чтобы найти точку позади корпуса.
-        rad = math.radians(-self.owner.angle + 90)
-
-        self.center_x = self.owner.center_x - math.cos(rad) * self.offset_dist
-        self.center_y = self.owner.center_y - math.sin(rad) * self.offset_dist
-
-        # Угол поворота огня должен совпадать с углом корабля
-        self.angle = self.owner.angle
-
-        # сделана простая анимацая мерцания двигателя
-        # Каждые 4 кадра он меняет размер и цвет, создавая эффект пульсации.
-        self.animation_timer += 1
-        if self.animation_timer > 4:
-            self.animation_timer = 0
-            if self.color == arcade.color.ORANGE_PEEL:
-                self.color = arcade.color.YELLOW
-                self.scale = 0.6
-            else:
-                self.color = arcade.color.ORANGE_PEEL
-                self.scale = 0.9
+# Все скорости в игре заданы "на кадр" при 60 FPS.
+# update() получает delta_time и масштабирует их, поэтому скорость игры
+# не зависит от частоты тиков симуляции.
+BASE_FPS = 60
+
+
+def frames_in(delta_time):
+    # Сколько "старых" кадров по 1/60 секунды укладывается в delta_time
+    return delta_time * BASE_FPS
+
+
+# Текстуры всех спрайтов. Загружаются один раз через реестр ресурсов (src/assets.py).
+TEXTURE_SPARK = ":resources:images/space_shooter/meteorGrey_tiny1.png"
+TEXTURE_PLAYER = ":resources:images/space_shooter/playerShip2_orange.png"
+TEXTURE_ASTEROIDS = (":resources:images/space_shooter/meteorGrey_big1.png",
+                     ":resources:images/space_shooter/meteorGrey_med1.png")
+TEXTURE_BULLET = ":resources:images/space_shooter/laserRed01.png"
+TEXTURE_ENEMY_BULLET = ":resources:images/space_shooter/laserBlue01.png"
+TEXTURE_TRASH = ":resources:images/tiles/boxCrate_double.png"
+TEXTURE_REPAIR = ":resources:images/topdown_tanks/tankBody_blue_outline.png"
+TEXTURE_CHASER = ":resources:images/space_shooter/playerShip1_blue.png"
+TEXTURE_SHOOTER = ":resources:images/space_shooter/playerShip1_green.png"
+TEXTURE_KAMIKAZE = ":resources:images/space_shooter/playerShip3_orange.png"
+
+# Все текстуры разом - для предзагрузки при старте
+TEXTURES = (TEXTURE_SPARK, TEXTURE_PLAYER) + TEXTURE_ASTEROIDS + (
+    TEXTURE_BULLET, TEXTURE_ENEMY_BULLET, TEXTURE_TRASH, TEXTURE_REPAIR,
+    TEXTURE_CHASER, TEXTURE_SHOOTER, TEXTURE_KAMIKAZE)
 
 
 class Player(arcade.Sprite):
     def __init__(self):
         # Загружаем спрайт игрока и устанавливаем начальные характеристики
-        super().__init__(":resources:images/space_shooter/playerShip2_orange.png", scale=0.5)
+        super().__init__(assets.texture(TEXTURE_PLAYER), scale=0.5)
         self.speed_x = 0
         self.speed_y = 0
         self.hp = 100
-        # Сразу при создании игрока создаем ему объект двигателя
-        self.thruster = ShipThruster(self, offset_dist=35)
+        # Огонь двигателя: расстояние позади центра и мерцание (рисует src/thrusters.py)
+        self.thruster_offset = 35
+        self.thruster_timer = 0
+        self.thruster_phase = 0
+        # Сдвиг за последний update - путь для непрерывной проверки столкновений (src/collisions.py)
+        self.step_x = 0
+        self.step_y = 0
 
     def update(self, delta_time):
         # Стандартное обновление позиции на основе скорости
-        self.angle += self.change_angle
-        self.center_x += self.speed_x
-        self.center_y += self.speed_y
-        # Важно: двигатель не обновляется сам по себе через SpriteList игрока,
-        # поэтому дергаем его update() вручную, чтобы он следовал за игроком без задержек.
-        self.thruster.update()
+        frames = frames_in(delta_time)
+        self.angle += self.change_angle * frames
+        self.step_x = self.speed_x * frames
+        self.step_y = self.speed_y * frames
+        self.center_x += self.step_x
+        self.center_y += self.step_y
 
 
 class Asteroid(arcade.Sprite):
-    def __init__(self):
-        # Чтобы астероиды выглядели разнообразно, выбраны случайные картинки из двух вариантов
-        img = random.choice([":resources:images/space_shooter/meteorGrey_big1.png",
-                             ":resources:images/space_shooter/meteorGrey_med1.png"])
-        super().__init__(img, scale=random.uniform(0.5, 0.8))
+    def __init__(self, rng=random, img=None, scale=None, rotation_speed=None):
+        # Чтобы астероиды выглядели разнообразно, выбраны случайные картинки из двух вариантов.
+        # rng - источник случайности (мир передает свой поток с сидом, см. src/rng.py).
+        # img, scale и rotation_speed задаются явно при восстановлении из снимка (src/replay.py)
+        # и из сохраненного сектора (src/sectors.py).
+        if img is None:
+            img = rng.choice(TEXTURE_ASTEROIDS)
+        if scale is None:
+            scale = rng.uniform(0.5, 0.8)
+        super().__init__(assets.texture(img), scale=scale)
+        self.img = img
         # Добавляем вращение, чтобы камень не выглядел статичным
-        self.rotation_speed = random.uniform(-1, 1)
+        if rotation_speed is None:
+            rotation_speed = rng.uniform(-1, 1)
+        self.rotation_speed = rotation_speed
 
     def update(self, delta_time):
-        self.center_x += self.change_x
-        self.center_y += self.change_y
-        self.angle += self.rotation_speed
+        frames = frames_in(delta_time)
+        self.center_x += self.change_x * frames
+        self.center_y += self.change_y * frames
+        self.angle += self.rotation_speed * frames
 
 
 class Bullet(arcade.Sprite):
     def __init__(self, is_enemy=False):
         # Один класс пули используем и для игрока, и для врагов.
         # Меняем только текстуру и скорость исчезновения в зависимости от флага is_enemy.
-        img = ":resources:images/space_shooter/laserRed01.png"
+        img = TEXTURE_BULLET
         scale = 0.8
         if is_enemy:
-            img = ":resources:images/space_shooter/laserBlue01.png"
+            img = TEXTURE_ENEMY_BULLET
             scale = 0.6
-        super().__init__(img, scale=scale)
-        # Пуля живет ограниченное время
-        self.time_to_live = 1.0 if not is_enemy else 2.0
+        super().__init__(assets.texture(img), scale=scale)
         self.is_enemy = is_enemy
+        # Пул, из которого выдана пуля (BulletPool в src/pools.py), или None
+        self.pool = None
+        self.in_pool = False
+        self.reset()
+
+    def reset(self):
+        # Пуля живет ограниченное время.
+        # Вызывается и при создании, и когда пул выдает пулю повторно.
+        self.time_to_live = 1.0 if not self.is_enemy else 2.0
+        self.change_x = 0
+        self.change_y = 0
+        # Сдвиг за последний update (у новой пули пути еще нет), см. src/collisions.py
+        self.step_x = 0
+        self.step_y = 0
 
     def update(self, delta_time):
-        self.center_x += self.change_x
-        self.center_y += self.change_y
+        frames = frames_in(delta_time)
+        self.step_x = self.change_x * frames
+        self.step_y = self.change_y * frames
+        self.center_x += self.step_x
+        self.center_y += self.step_y
+        # Когда время жизни выйдет, мир удалит пулю в конце тика (src/graveyard.py)
         self.time_to_live -= delta_time
-        # Если время жизни вышло - удаляем спрайт
-        if self.time_to_live <= 0:
-            self.remove_from_sprite_lists()
+
+    def remove_from_sprite_lists(self):
+        # Пуля из пула после удаления со сцены возвращается обратно в пул
+        super().remove_from_sprite_lists()
+        if self.pool:
+            self.pool.release(self)
 
 
 class Trash(arcade.Sprite):
     def __init__(self):
         # Класс для собираемых предметов (мусора)
-        super().__init__(":resources:images/tiles/boxCrate_double.png", scale=0.4)
+        super().__init__(assets.texture(TEXTURE_TRASH), scale=0.4)
 
 
 class RepairKit(arcade.Sprite):
     def __init__(self):
         # Класс аптечки
-        super().__init__(":resources:images/topdown_tanks/tankBody_blue_outline.png", scale=0.6)
-
-
-class Star(arcade.Sprite):
-    def __init__(self):
-        # Звезды на фоне. Используем прозрачность (alpha), чтобы они были разной яркости
-        super().__init__(":resources:images/space_shooter/meteorGrey_tiny1.png", scale=0.4)
-        self.alpha = random.randint(50, 180)
+        super().__init__(assets.texture(TEXTURE_REPAIR), scale=0.6)
 
 
 class ExplosionParticle(arcade.Sprite):
-    def __init__(self, x, y, color):
+    def __init__(self, x, y, color, rng=random):
         # Система частиц для взрывов.
         # Частицы разлетаются в случайных направлениях.
-        super().__init__(":resources:images/space_shooter/meteorGrey_tiny1.png", scale=0.3)
+        super().__init__(assets.texture(TEXTURE_SPARK), scale=0.3)
         self.center_x = x
         self.center_y = y
         self.color = color
-        speed = random.uniform(2, 6)
-        angle = random.uniform(0, 2 * math.pi)
+        speed = rng.uniform(2, 6)
+        angle = rng.uniform(0, 2 * math.pi)
         self.change_x = math.cos(angle) * speed
         self.change_y = math.sin(angle) * speed
-        self.change_angle = random.uniform(-5, 5)
+        self.change_angle = rng.uniform(-5, 5)
         # Скорость исчезновения
-        self.fade_rate = random.randint(5, 10)
+        self.fade_rate = rng.randint(5, 10)
 
     def update(self, delta_time):
-        self.center_x += self.change_x
-        self.center_y += self.change_y
-        self.angle += self.change_angle
+        frames = frames_in(delta_time)
+        self.center_x += self.change_x * frames
+        self.center_y += self.change_y * frames
+        self.angle += self.change_angle * frames
         # Постепенно уменьшаем прозрачность, пока частица не исчезнет совсем
+        # Исчезнувшую частицу мир удалит в конце тика (src/graveyard.py)
         if self.alpha > 0:
-            self.alpha -= self.fade_rate
-            if self.alpha < 0: self.alpha = 0
-        if self.alpha <= 0:
-            self.remove_from_sprite_lists()
+            self.alpha = max(0, self.alpha - self.fade_rate * frames)
 
 
 class BaseEnemy(arcade.Sprite):
+    # Радиус, внутри которого враги отталкиваются друг от друга
+    REPEL_RADIUS = 60
+    # Запас к радиусу при поиске в сетке: сетка строится в начале тика,
+    # а соседи успевают немного сдвинуться, пока до нас дойдет очередь
+    GRID_MARGIN = 16
+
     def __init__(self, filename, scale, player_sprite, enemy_list, offset_dist=35):
         # Базовый класс для всех врагов. Здесь хранится общая логика:
-        # ссылка на игрока (чтобы знать, за кем лететь) и свой двигатель.
-        super().__init__(filename, scale=scale)
+        # ссылка на игрока (чтобы знать, за кем лететь) и огонь двигателя.
+        super().__init__(assets.texture(filename), scale=scale)
         self.player = player_sprite
         self.enemies = enemy_list
         self.hp = 1
-        self.thruster = ShipThruster(self, offset_dist=offset_dist)
-
-    def separate_from_friends(self):
+        self.thruster_offset = offset_dist
+        self.thruster_timer = 0
+        self.thruster_phase = 0
+        # Общая сетка соседей (SpatialGrid), её выдает и перестраивает World.
+        # Без сетки работаем по-старому, перебирая весь список врагов.
+        self.grid = None
+
+    def separate_from_friends(self, delta_time=1 / BASE_FPS):
         # Метод для избегания "слипания" врагов в одну точку.
         # Если враги слишком близко, они немного отталкиваются друг от друга.
-        if self.enemies:
-            for other in self.enemies:
-                if other is not self:
-                    dist = arcade.get_distance_between_sprites(self, other)
-                    if dist < 60:
-                        repel_dx = self.center_x - other.center_x
-                        repel_dy = self.center_y - other.center_y
-                        self.center_x += repel_dx * 0.05
-                        self.center_y += repel_dy * 0.05
+        if self.grid is not None:
+            others = self.grid.query(self.center_x, self.center_y, self.REPEL_RADIUS + self.GRID_MARGIN)
+        elif self.enemies:
+            others = self.enemies
+        else:
+            return
+
+        radius_sq = self.REPEL_RADIUS * self.REPEL_RADIUS
+        force = 0.05 * frames_in(delta_time)
+        for other in others:
+            if other is not self:
+                repel_dx = self.center_x - other.center_x
+                repel_dy = self.center_y - other.center_y
+                if repel_dx * repel_dx + repel_dy * repel_dy < radius_sq:
+                    self.center_x += repel_dx * force
+                    self.center_y += repel_dy * force
+
+    def approach(self, step):
+        # Сдвиг к игроку на step пикселей без atan2/cos/sin. Возвращает расстояние до игрока.
+        dx = self.player.center_x - self.center_x
+        dy = self.player.center_y - self.center_y
+        dist = math.sqrt(dx * dx + dy * dy)
+        if dist > 0:
+            self.center_x += dx * step / dist
+            self.center_y += dy * step / dist
+        return dist
 
-    def remove_from_sprite_lists(self):
-        # Переопределяем метод удаления:
-        # Если удаляется корабль врага, нужно удалить и его след (двигатель)
-        if self.thruster:
-            self.thruster.remove_from_sprite_lists()
-        super().remove_from_sprite_lists()
+    def update_far(self, delta_time):
+        # Обновление вдали от экрана (см. src/lod.py): только полет к игроку.
+        # Без поворота, отталкивания и покачивания - их все равно не видно.
+        self.approach(self.move_speed * frames_in(delta_time))
 
 
 class ChaserEnemy(BaseEnemy):
+    STEERING_KIND = 0  # см. src/steering.py
     def __init__(self, player_sprite, enemy_list):
         # Враг-преследователь. Просто летит на игрока.
-        super().__init__(":resources:images/space_shooter/playerShip1_blue.png", 0.5, player_sprite, enemy_list,
+        super().__init__(TEXTURE_CHASER, 0.5, player_sprite, enemy_list,
                          offset_dist=35)
         self.move_speed = 3.0
         self.hp = 3
 
-    def update(self, delta_time):
+    def update(self, delta_time, separation_time=None):
+        # separation_time - за сколько секунд оттолкнуться от соседей (0 - не в этом тике)
         # Вычисляем вектор до игрока
         dx = self.player.center_x - self.center_x
         dy = self.player.center_y - self.center_y
@@ -193,27 +241,35 @@ class ChaserEnemy(BaseEnemy):
         self.angle = -math.degrees(angle_rad) + 90
 
         # Движемся к игроку
-        self.center_x += math.cos(angle_rad) * self.move_speed
-        self.center_y += math.sin(angle_rad) * self.move_speed
+        step = self.move_speed * frames_in(delta_time)
+        self.center_x += math.cos(angle_rad) * step
+        self.center_y += math.sin(angle_rad) * step
 
-        self.separate_from_friends()
-        self.thruster.update()
+        if separation_time is None:
+            separation_time = delta_time
+        if separation_time:
+            self.separate_from_friends(separation_time)
 
 
 class ShooterEnemy(BaseEnemy):
-    def __init__(self, player_sprite, enemy_list, bullet_list, sound_shoot):
+    STEERING_KIND = 1
+    def __init__(self, player_sprite, enemy_list, bullet_list, play_sound=None, bullet_pool=None, rng=random):
         # Стреляющий враг. Старается держать дистанцию.
-        super().__init__(":resources:images/space_shooter/playerShip1_green.png", 0.5, player_sprite, enemy_list,
+        # play_sound(имя, громкость) - кто проигрывает звук выстрела (мир или None для тишины)
+        # bullet_pool - пул пуль (BulletPool), без него каждая пуля создается заново
+        # rng - источник случайности для таймера первого выстрела
+        super().__init__(TEXTURE_SHOOTER, 0.5, player_sprite, enemy_list,
                          offset_dist=35)
         self.bullet_list = bullet_list
-        self.sound_shoot = sound_shoot
+        self.play_sound = play_sound
+        self.bullet_pool = bullet_pool
         self.move_speed = 2.0
         self.hp = 2
-        self.shoot_timer = random.uniform(0, 2)
+        self.shoot_timer = rng.uniform(0, 2)
         self.shoot_delay = 2.5
         self.keep_distance = 350
 
-    def update(self, delta_time):
+    def update(self, delta_time, separation_time=None):
         dx = self.player.center_x - self.center_x
         dy = self.player.center_y - self.center_y
         dist = math.sqrt(dx * dx + dy * dy)
@@ -222,14 +278,18 @@ class ShooterEnemy(BaseEnemy):
 
         # Логика удержания дистанции:
         # Если далеко - подлетаем, если слишком близко - отлетаем назад.
+        step = self.move_speed * frames_in(delta_time)
         if dist > self.keep_distance + 50:
-            self.center_x += math.cos(angle_rad) * self.move_speed
-            self.center_y += math.sin(angle_rad) * self.move_speed
+            self.center_x += math.cos(angle_rad) * step
+            self.center_y += math.sin(angle_rad) * step
         elif dist < self.keep_distance - 50:
-            self.center_x -= math.cos(angle_rad) * (self.move_speed * 0.8)
-            self.center_y -= math.sin(angle_rad) * (self.move_speed * 0.8)
+            self.center_x -= math.cos(angle_rad) * (step * 0.8)
+            self.center_y -= math.sin(angle_rad) * (step * 0.8)
 
-        self.separate_from_friends()
+        if separation_time is None:
+            separation_time = delta_time
+        if separation_time:
+            self.separate_from_friends(separation_time)
 
         # Таймер стрельбы
         self.shoot_timer -= delta_time
@@ -237,12 +297,24 @@ class ShooterEnemy(BaseEnemy):
             self.shoot(angle_rad)
             self.shoot_timer = self.shoot_delay
 
-        self.thruster.update()
+    def update_far(self, delta_time):
+        # Вдали от игрока стрелок всегда дальше keep_distance, поэтому просто летит к нему.
+        # Таймер при этом идет: стрелок за краем экрана продолжает стрелять.
+        super().update_far(delta_time)
+        self.shoot_timer -= delta_time
+        if self.shoot_timer <= 0:
+            angle_rad = math.atan2(self.player.center_y - self.center_y, self.player.center_x - self.center_x)
+            self.angle = -math.degrees(angle_rad) + 90
+            self.shoot(angle_rad)
+            self.shoot_timer = self.shoot_delay
 
     def shoot(self, angle_rad):
-        if self.sound_shoot:
-            arcade.play_sound(self.sound_shoot, volume=0.2)
-        bullet = Bullet(is_enemy=True)
+        if self.play_sound:
+            self.play_sound("enemy_laser", 0.2)
+        if self.bullet_pool:
+            bullet = self.bullet_pool.acquire(is_enemy=True)
+        else:
+            bullet = Bullet(is_enemy=True)
         bullet.angle = self.angle + 90
         # Спавним пулю немного перед кораблем
         bullet.center_x = self.center_x + (math.cos(angle_rad) * 30)
@@ -253,16 +325,18 @@ class ShooterEnemy(BaseEnemy):
 
 
 class KamikazeEnemy(BaseEnemy):
+    STEERING_KIND = 2
     def __init__(self, player_sprite, enemy_list):
         # Камикадзе. Быстрый, слабый, летит "пьяной" траекторией.
-        super().__init__(":resources:images/space_shooter/playerShip3_orange.png", 0.4, player_sprite, enemy_list,
+        super().__init__(TEXTURE_KAMIKAZE, 0.4, player_sprite, enemy_list,
                          offset_dist=25)
         self.color = (255, 100, 100)  # Подкрашиваем в красный
         self.move_speed = 4.0
         self.hp = 1
         self.wobble = 0
 
-    def update(self, delta_time):
+    def update(self, delta_time, separation_time=None):
+        # Камикадзе сам ни от кого не отталкивается, separation_time ему не нужен
         dx = self.player.center_x - self.center_x
         dy = self.player.center_y - self.center_y
         angle_rad = math.atan2(dy, dx)
@@ -272,7 +346,6 @@ class KamikazeEnemy(BaseEnemy):
         wobble_offset = math.sin(self.wobble) * 10
         self.angle = -math.degrees(angle_rad) + 90 + wobble_offset
 
-        self.center_x += math.cos(angle_rad) * self.move_speed
-        self.center_y += math.sin(angle_rad) * self.move_speed
-
-        self.thruster.update()
\ No newline at end of file
+        step = self.move_speed * frames_in(delta_time)
+        self.center_x += math.cos(angle_rad) * step
+        self.center_y += math.sin(angle_rad) * step
@@ -0,0 +1,206 @@
+"""
+Пакетное управление врагами на NumPy.
+Вместо atan2/cos/sin для каждого врага по отдельности считаем курс, движение,
+удержание дистанции, отталкивание и таймеры стрельбы всех врагов одним
+векторным проходом, а потом записываем результат обратно в спрайты.
+NumPy необязателен: без него World просто вызывает update() у каждого врага.
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from src.sprites import frames_in
+from src.profiler import profiler
+
+# Типы врагов в буферах (атрибут STEERING_KIND у классов врагов)
+KIND_CHASER = 0
+KIND_SHOOTER = 1
+KIND_KAMIKAZE = 2
+
+
+class SteeringEngine:
+    """
+    Хранит состояние врагов в виде структуры массивов (x, y, скорость, тип,
+    wobble, таймер стрельбы...) и обновляет всех разом.
+    Спрайты остаются главным источником правды: коллизии и отталкивание
+    двигают их напрямую, поэтому буферы заполняются заново каждый тик.
+    """
+
+    # Меньше этого числа врагов накладные расходы NumPy не окупаются
+    BATCH_THRESHOLD = 32
+    # Те же правила отталкивания, что и в BaseEnemy.separate_from_friends
+    REPEL_RADIUS = 60
+    REPEL_FORCE = 0.05
+    # Соседние клетки сетки (клетка = радиусу, значит хватает 3x3)
+    NEIGHBOUR_OFFSETS = [(ox, oy) for ox in (-1, 0, 1) for oy in (-1, 0, 1)]
+
+    def __init__(self):
+        self.capacity = 0
+        self.x = self.y = self.speed = self.kind = None
+        self.wobble = self.shoot_timer = self.shoot_delay = self.keep_distance = None
+
+    @staticmethod
+    def available():
+        return np is not None
+
+    def should_batch(self, enemies):
+        return np is not None and len(enemies) >= self.BATCH_THRESHOLD
+
+    def reserve(self, count):
+        # Буферы растут с запасом и никогда не сжимаются - без выделений памяти каждый тик
+        if count <= self.capacity:
+            return
+        capacity = max(count, self.capacity * 2, 64)
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.speed = np.zeros(capacity)
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.wobble = np.zeros(capacity)
+        self.shoot_timer = np.zeros(capacity)
+        self.shoot_delay = np.zeros(capacity)
+        self.keep_distance = np.zeros(capacity)
+        self.capacity = capacity
+
+    def gather(self, enemies):
+        # Копируем состояние спрайтов в буферы
+        count = len(enemies)
+        self.reserve(count)
+        for i, enemy in enumerate(enemies):
+            self.x[i], self.y[i] = enemy.position
+            self.speed[i] = enemy.move_speed
+            kind = enemy.STEERING_KIND
+            self.kind[i] = kind
+            if kind == KIND_SHOOTER:
+                self.shoot_timer[i] = enemy.shoot_timer
+                self.shoot_delay[i] = enemy.shoot_delay
+                self.keep_distance[i] = enemy.keep_distance
+            elif kind == KIND_KAMIKAZE:
+                self.wobble[i] = enemy.wobble
+        return count
+
+    def update(self, enemies, player, delta_time, separation_time=None):
+        # separation_time - как в BaseEnemy.update: 0 - в этом тике не расталкиваем
+        count = self.gather(enemies)
+        if count == 0:
+            return
+
+        x = self.x[:count]
+        y = self.y[:count]
+        speed = self.speed[:count]
+        kind = self.kind[:count]
+        shooter = kind == KIND_SHOOTER
+        kamikaze = kind == KIND_KAMIKAZE
+
+        # Курс на игрока
+        dx = player.center_x - x
+        dy = player.center_y - y
+        angle_rad = np.arctan2(dy, dx)
+        cos_a = np.cos(angle_rad)
+        sin_a = np.sin(angle_rad)
+        angle = 90 - np.degrees(angle_rad)
+
+        # Стрелки держат дистанцию: далеко - подлетаем, близко - отлетаем назад
+        step = speed.copy()
+        if shooter.any():
+            dist = np.hypot(dx, dy)
+            keep = self.keep_distance[:count]
+            shooter_step = np.where(dist > keep + 50, speed, np.where(dist < keep - 50, -0.8 * speed, 0.0))
+            step = np.where(shooter, shooter_step, step)
+
+        # Камикадзе качается по синусоиде
+        if kamikaze.any():
+            wobble = self.wobble[:count]
+            wobble[kamikaze] += delta_time * 10
+            angle = angle + np.where(kamikaze, np.sin(wobble) * 10, 0.0)
+
+        frames = frames_in(delta_time)
+        x += cos_a * step * frames
+        y += sin_a * step * frames
+
+        # Камикадзе ни от кого не отталкиваются, но от них отталкиваются остальные
+        if separation_time is None:
+            separation_time = delta_time
+        if separation_time:
+            with profiler.scope("enemies.separate"):
+                self.separate(x, y, np.flatnonzero(~kamikaze), self.REPEL_FORCE * frames_in(separation_time))
+
+        # Таймеры стрельбы
+        fire = None
+        if shooter.any():
+            timer = self.shoot_timer[:count]
+            timer[shooter] -= delta_time
+            fire = shooter & (timer <= 0)
+            timer[fire] = self.shoot_delay[:count][fire]
+
+        self.write_back(enemies, count, angle, angle_rad, fire)
+
+    def separate(self, x, y, movers, force):
+        # Векторная версия separate_from_friends.
+        # Враги раскладываются по клеткам (ключ клетки сортируем), для каждой из 9 соседних
+        # клеток searchsorted дает диапазон кандидатов - получаем все близкие пары без цикла.
+        # Отличие от спрайтовой версии: все смещения считаются от позиций начала прохода,
+        # а не накапливаются по очереди, поэтому результат не зависит от порядка списка.
+        if len(movers) == 0:
+            return
+        size = self.REPEL_RADIUS
+        cell_x = np.floor(x / size).astype(np.int64)
+        cell_y = np.floor(y / size).astype(np.int64)
+        # Сдвиг делает ключи неотрицательными и уникальными для карты любого разумного размера
+        keys = (cell_x + (1 << 20)) * (1 << 21) + (cell_y + (1 << 20))
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+
+        query_keys = keys[movers]
+        pairs_i = []
+        pairs_j = []
+        for ox, oy in self.NEIGHBOUR_OFFSETS:
+            target = query_keys + (ox * (1 << 21) + oy)
+            lo = np.searchsorted(sorted_keys, target, side="left")
+            hi = np.searchsorted(sorted_keys, target, side="right")
+            counts = hi - lo
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            starts = np.cumsum(counts) - counts
+            offsets = np.arange(total) - np.repeat(starts, counts)
+            pairs_i.append(np.repeat(movers, counts))
+            pairs_j.append(order[np.repeat(lo, counts) + offsets])
+        if not pairs_i:
+            return
+
+        i = np.concatenate(pairs_i)
+        j = np.concatenate(pairs_j)
+        repel_dx = x[i] - x[j]
+        repel_dy = y[i] - y[j]
+        close = (i != j) & (repel_dx * repel_dx + repel_dy * repel_dy < size * size)
+        if not close.any():
+            return
+        i = i[close]
+        count = len(x)
+        shift_x = np.bincount(i, weights=repel_dx[close], minlength=count)
+        shift_y = np.bincount(i, weights=repel_dy[close], minlength=count)
+        x += shift_x * force
+        y += shift_y * force
+
+    def write_back(self, enemies, count, angle, angle_rad, fire):
+        # Записываем позиции, углы и таймеры обратно в спрайты,
+        # затем делаем то, что трогает списки: выстрелы
+        xs = self.x[:count].tolist()
+        ys = self.y[:count].tolist()
+        angles = angle.tolist()
+        kinds = self.kind[:count].tolist()
+        wobbles = self.wobble[:count].tolist()
+        timers = self.shoot_timer[:count].tolist()
+        firing = fire.tolist() if fire is not None else None
+        rads = angle_rad.tolist()
+        for i, enemy in enumerate(enemies):
+            enemy.position = (xs[i], ys[i])
+            enemy.angle = angles[i]
+            kind = kinds[i]
+            if kind == KIND_KAMIKAZE:
+                enemy.wobble = wobbles[i]
+            elif kind == KIND_SHOOTER:
+                enemy.shoot_timer = timers[i]
+                if firing[i]:
+                    enemy.shoot(rads[i])
@@ -0,0 +1,66 @@
+"""
+Огонь двигателей всех кораблей одной системой.
+Раньше у каждого корабля был свой спрайт ShipThruster: владелец вручную звал
+его update, мир добавлял его в отдельный список, а враг при удалении должен
+был не забыть убрать его следом. Теперь у корабля только два числа (таймер и
+фаза мерцания), а позиции огня для всех видимых кораблей считаются разом из
+их положения и угла и рисуются одним SpriteList из общего пула.
+
+Огонь чисто косметический, поэтому система живет в GameView, а не в World:
+симуляция без окна (реплеи, бенчмарки) ее вообще не трогает.
+"""
+import math
+
+import arcade
+
+from src.assets import assets
+from src.sprites import TEXTURE_SPARK, frames_in
+
+# Фазы мерцания: (цвет, масштаб). 0 - только что появился, дальше 1 и 2 чередуются
+STYLES = ((arcade.color.ORANGE_PEEL, 0.8), (arcade.color.YELLOW, 0.6), (arcade.color.ORANGE_PEEL, 0.9))
+# Раз в сколько кадров 60 FPS огонь меняет фазу
+FLICKER_FRAMES = 4
+
+
+class ThrusterSystem:
+    def __init__(self):
+        self.sprite_list = arcade.SpriteList()
+        self.texture = assets.texture(TEXTURE_SPARK)
+        # Сколько спрайтов пула занято в этом кадре
+        self.active = 0
+
+    def update(self, owners, delta_time):
+        # Мерцание: у каждого корабля свой таймер, шагают все вместе раз за кадр
+        frames = frames_in(delta_time)
+        for owner in owners:
+            owner.thruster_timer += frames
+            if owner.thruster_timer > FLICKER_FRAMES:
+                owner.thruster_timer = 0
+                owner.thruster_phase = 2 if owner.thruster_phase == 1 else 1
+
+    def layout(self, owners):
+        # Огонь всегда сзади корабля: точка на offset позади центра, угол как у корабля.
+        # Вызывается перед отрисовкой, когда корабли уже стоят в интерполированных позициях.
+        sprites = self.sprite_list
+        while len(sprites) < len(owners):
+            sprites.append(arcade.Sprite(self.texture))
+        for sprite, owner in zip(sprites, owners):
+            angle = owner.angle
+            rad = math.radians(-angle + 90)
+            offset = owner.thruster_offset
+            sprite.position = (owner.center_x - math.cos(rad) * offset,
+                               owner.center_y - math.sin(rad) * offset)
+            sprite.angle = angle
+            color, scale = STYLES[owner.thruster_phase]
+            if sprite.color != color:
+                sprite.color = color
+            if sprite.scale_x != scale:
+                sprite.scale = scale
+            sprite.visible = True
+        # Лишние спрайты пула просто прячем до следующего раза
+        for sprite in sprites[len(owners):self.active]:
+            sprite.visible = False
+        self.active = len(owners)
+
+    def draw(self):
+        self.sprite_list.draw()
@@ -0,0 +1,78 @@
+"""
+Фиксированный шаг симуляции, независимый от частоты отрисовки.
+Кадр может длиться сколько угодно: накопитель (accumulator) копит время
+и отдает его симуляции ровными тиками, а отрисовка сглаживает картинку,
+интерполируя позиции между двумя последними тиками.
+"""
+
+
+class FixedTimestep:
+    """
+    tick_rate - тиков симуляции в секунду.
+    max_steps - сколько тиков максимум догоняем за один кадр. Если машина
+    не успевает, лишнее время выбрасываем (игра замедляется, но не уходит
+    в "спираль смерти", где каждый кадр догоняет все дольше).
+    """
+
+    def __init__(self, tick_rate=60, max_steps=5):
+        self.tick_rate = tick_rate
+        self.step_time = 1 / tick_rate
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        # Сколько секунд симуляции выбросили из-за лимита (для отладки)
+        self.dropped_time = 0.0
+
+    def advance(self, frame_time):
+        # Добавляем время кадра и возвращаем, сколько тиков нужно сделать
+        self.accumulator += frame_time
+        steps = int(self.accumulator / self.step_time)
+        if steps > self.max_steps:
+            self.dropped_time += (steps - self.max_steps) * self.step_time
+            self.accumulator -= (steps - self.max_steps) * self.step_time
+            steps = self.max_steps
+        self.accumulator -= steps * self.step_time
+        return steps
+
+    @property
+    def alpha(self):
+        # Доля следующего тика, которая уже "прошла" (0..1) - для интерполяции
+        return self.accumulator / self.step_time
+
+
+class Interpolator:
+    """
+    Запоминает позиции и углы спрайтов перед последним тиком и на время
+    отрисовки ставит их в промежуточное положение prev + (cur - prev) * alpha.
+    После отрисовки restore() возвращает настоящие позиции симуляции.
+    """
+
+    def __init__(self):
+        self.previous = {}
+        self.current = []
+
+    def capture(self, sprite_lists):
+        previous = {}
+        for sprite_list in sprite_lists:
+            for sprite in sprite_list:
+                previous[sprite] = (sprite.center_x, sprite.center_y, sprite.angle)
+        self.previous = previous
+
+    def apply(self, alpha):
+        # Спрайты, появившиеся за последний тик, рисуем как есть
+        current = []
+        for sprite, (px, py, pa) in self.previous.items():
+            if not sprite.sprite_lists:
+                continue
+            x, y, angle = sprite.center_x, sprite.center_y, sprite.angle
+            current.append((sprite, x, y, angle))
+            # Угол интерполируем по кратчайшей дуге
+            turn = (angle - pa + 180) % 360 - 180
+            sprite.position = (px + (x - px) * alpha, py + (y - py) * alpha)
+            sprite.angle = angle - turn * (1 - alpha)
+        self.current = current
+
+    def restore(self):
+        for sprite, x, y, angle in self.current:
+            sprite.position = (x, y)
+            sprite.angle = angle
+        self.current = []
@@ -0,0 +1,38 @@
+"""
+Текст интерфейса в retained-режиме.
+arcade.draw_text на каждом вызове заново раскладывает глифы, а меню звало
+его больше 15 раз за кадр. TextLayer создает arcade.Text один раз, все они
+лежат в одном pyglet Batch и рисуются одним вызовом draw(). Надпись
+перестраивается только через set/move и только если значение изменилось.
+"""
+import arcade
+import pyglet
+
+
+class TextLayer:
+    def __init__(self):
+        self.batch = pyglet.graphics.Batch()
+        self.texts = {}
+
+    def add(self, name, text, x=0, y=0, color=arcade.color.WHITE, font_size=12, **kwargs):
+        label = arcade.Text(text, x, y, color, font_size, batch=self.batch, **kwargs)
+        self.texts[name] = label
+        return label
+
+    def __getitem__(self, name):
+        return self.texts[name]
+
+    def set(self, name, text=None, color=None):
+        label = self.texts[name]
+        if text is not None and label.text != text:
+            label.text = text
+        if color is not None and label.color != color:
+            label.color = color
+
+    def move(self, name, x, y):
+        label = self.texts[name]
+        if label.position != (x, y):
+            label.position = (x, y)
+
+    def draw(self):
+        self.batch.draw()
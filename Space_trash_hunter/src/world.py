@@ -0,0 +1,670 @@
+import arcade
+import math
+from collections import deque
+
+from src.sprites import Player, Asteroid, Trash, ChaserEnemy, ShooterEnemy, KamikazeEnemy, \
+    ExplosionParticle, RepairKit, frames_in
+from src.spatial import SpatialGrid
+from src.pools import BulletPool
+from src.particles import ParticleSystem
+from src.collisions import Broadphase, swept_hit, PLAYER_REPAIR, PLAYER_BULLET_ENEMY, PLAYER_BULLET_ASTEROID, \
+    ENEMY_BULLET_PLAYER, PLAYER_TRASH, PLAYER_ASTEROID, PLAYER_ENEMY
+from src.steering import SteeringEngine
+from src.profiler import profiler
+from src.rng import RandomStreams, SPAWN, ENEMIES, ASTEROIDS, LOOT, PARTICLES
+from src.spawning import SpawnPlacer
+from src.lod import SimulationLOD
+from src.graveyard import Graveyard
+from src.quality import TIERS as QUALITY_TIERS
+from src.sectors import SectorMap
+
+# Размер арены (от -MAP_SIZE до MAP_SIZE по обеим осям); у уровней OPEN_WORLD_LEVELS границ нет
+MAP_SIZE = 2500
+# Частота шагов симуляции по умолчанию (тиков в секунду), см. src/timestep.py
+TICK_RATE = 60
+# Сколько частиц взрывов может жить одновременно
+PARTICLE_BUDGET = 2000
+# Ближе этого к игроку объекты не появляются
+SPAWN_EXCLUSION = 600
+# Сколько отложенных объектов ставится на карту за один тик (массовый респаун растягивается на несколько тиков)
+SPAWN_BUDGET = 3
+# Минимальное расстояние между стартовыми астероидами и ящиками
+START_SPACING = 250
+# Уровни без границ: мир из секторов, которые грузятся вокруг игрока (src/sectors.py)
+OPEN_WORLD_LEVELS = {4}
+
+# Настройки сложности: сколько очков нужно набрать для прохождения уровня
+LEVEL_GOALS = {
+    0: 500,
+    1: 1500,
+    2: 2500,
+    3: 4000,
+    4: float('inf')  # Бесконечный уровень для проверки навыков
+}
+
+
+class Inputs:
+    """
+    Состояние управления игроком на один тик симуляции.
+    turn: -1 - поворот влево, 1 - вправо, 0 - не поворачиваем.
+    fire: выстрел в этом тике (нажатие SPACE).
+    quality: уровень качества симуляции (src/quality.py). Он меняет ход игры,
+    поэтому приходит вместе с нажатиями и так же пишется в реплей.
+    """
+
+    def __init__(self, thrust=False, turn=0, fire=False, quality=0):
+        self.thrust = thrust
+        self.turn = turn
+        self.fire = fire
+        self.quality = quality
+
+
+# ==========================================
+#        СИМУЛЯЦИЯ МИРА (без окна)
+# ==========================================
+class World:
+    """
+    Вся игровая логика без привязки к окну, камерам и звуку.
+    GameView только рисует эти списки и проигрывает звуки из sound_events,
+    поэтому мир можно гонять тысячами тиков в секунду без дисплея.
+    """
+
+    def __init__(self, level, seed=None):
+        self.level = level
+        self.open_world = level in OPEN_WORLD_LEVELS
+        self.target_score = LEVEL_GOALS.get(level, 1000)
+        # Все случайные решения - из потоков с этим сидом (src/rng.py), без глобального random.
+        # Сид + записанные Inputs полностью повторяют забег (src/replay.py).
+        self.rng = RandomStreams(seed)
+        self.seed = self.rng.seed
+        self.spawn_rng = self.rng.get(SPAWN)
+        self.enemy_rng = self.rng.get(ENEMIES)
+        self.asteroid_rng = self.rng.get(ASTEROIDS)
+        self.loot_rng = self.rng.get(LOOT)
+        self.particle_rng = self.rng.get(PARTICLES)
+        self.spawner = SpawnPlacer(self.spawn_rng, MAP_SIZE, SPAWN_EXCLUSION)
+        # Объекты, которые ждут своей очереди появиться: (спрайт, список)
+        self.spawn_queue = deque()
+        # Секторы открытого мира (None - арена ±MAP_SIZE)
+        self.sectors = None
+        if self.open_world:
+            self.sectors = SectorMap(self.seed, self.spawner, repairs=level >= 2, start_exclusion=SPAWN_EXCLUSION)
+
+        self.player_list = None
+        self.asteroid_list = None
+        self.bullet_list = None
+        self.trash_list = None
+        self.enemy_list = None
+        self.particle_list = None
+        self.repair_list = None
+
+        self.player_sprite = None
+        self.bullet_pool = None
+        # Уничтоженные за тик объекты: помечаются сразу, из списков убираются в конце тика
+        self.graveyard = None
+        # Частицы взрывов в массивах NumPy (None - по старинке, спрайтами в particle_list)
+        self.particles = None
+        # Сетка соседей для отталкивания врагов, перестраивается раз за тик
+        self.enemy_grid = SpatialGrid(cell_size=64)
+        # Поиск пар для столкновений (все слои за один проход)
+        self.broadphase = Broadphase()
+        # Сдвиг ближних врагов за тик {враг: (dx, dy)} и самый большой из сдвигов - для
+        # непрерывной проверки тарана и попаданий (src/collisions.py)
+        self.enemy_moves = {}
+        self.enemy_margin = 0
+        # Пакетное управление врагами на NumPy (None, если NumPy не установлен)
+        self.steering = SteeringEngine() if SteeringEngine.available() else None
+        # Редкие и упрощенные обновления для врагов и астероидов вдали от игрока
+        self.lod = SimulationLOD()
+        # Уровень качества симуляции и раз во сколько тиков враги расталкиваются
+        self.quality = 0
+        self.separation_every = 1
+        self.score = 0
+        self.tick = 0
+        # Тик, по который уже сдвинуты все объекты (новые объекты догоняют мир с него)
+        self.moved_tick = 0
+        # None пока игра идет, "win" или "defeat" когда закончилась
+        self.result = None
+        # Что нанесло игроку последний урон ("asteroid", "bullet", "ram") - причина смерти для истории
+        self.last_damage = None
+        # Звуки, которые нужно проиграть: список (имя, громкость).
+        # Мир их только накапливает, а проигрывает (или игнорирует) тот, кто его рисует.
+        self.sound_events = []
+
+    def setup(self):
+        # Инициализация всех списков и объектов
+        self.player_list = arcade.SpriteList()
+        self.asteroid_list = arcade.SpriteList()
+        self.bullet_list = arcade.SpriteList()
+        self.trash_list = arcade.SpriteList()
+        self.enemy_list = arcade.SpriteList()
+        self.particle_list = arcade.SpriteList()
+        self.repair_list = arcade.SpriteList()
+
+        # Пул пуль создаем заново на каждый запуск уровня, чтобы статистика была по забегу
+        self.bullet_pool = BulletPool()
+        self.graveyard = Graveyard({
+            "bullets": self.bullet_list,
+            "enemies": self.enemy_list,
+            "asteroids": self.asteroid_list,
+            "trash": self.trash_list,
+            "repair": self.repair_list,
+            "particles": self.particle_list,
+        })
+        if ParticleSystem.available():
+            self.particles = ParticleSystem(budget=PARTICLE_BUDGET, rng=self.rng.numpy(PARTICLES))
+
+        self.score = 0
+        self.tick = 0
+        self.moved_tick = 0
+        self.result = None
+        self.last_damage = None
+        self.sound_events = []
+        self.spawn_queue.clear()
+        self.player_sprite = Player()
+        self.player_list.append(self.player_sprite)
+
+        if self.sectors is not None:
+            # Открытый мир: астероиды, мусор и аптечки приходят из секторов вокруг игрока
+            self.sectors.reset()
+            with profiler.scope("sectors"):
+                self.sectors.update(self)
+        else:
+            self.spawn_arena()
+
+        # Спавним врагов в зависимости от уровня
+        if self.level > 0:
+            count = 4 if self.level == 4 else (4 + self.level * 2)
+            for _ in range(count):
+                self.spawn_random_enemy()
+
+        # Аптечки (в открытом мире они лежат по секторам)
+        repair_count = 3
+        if self.level == 4:
+            repair_count = 5  # В выживании даем больше шансов
+
+        if self.level >= 2 and self.sectors is None:
+            for _ in range(repair_count):
+                self.spawn_object(RepairKit(), self.repair_list)
+
+        # Стартовый набор появляется сразу, без растягивания по тикам
+        self.flush_spawns(budget=None)
+
+    def spawn_arena(self):
+        # Спавним астероиды и мусор - одной раскладкой, чтобы не слипались
+        with profiler.scope("spawn"):
+            player = self.player_sprite
+            points = self.spawner.batch(35 + 20, START_SPACING, player.center_x, player.center_y)
+            for i, (x, y) in enumerate(points):
+                if i < 35:
+                    sprite, sprite_list = Asteroid(self.asteroid_rng), self.asteroid_list
+                else:
+                    sprite, sprite_list = Trash(), self.trash_list
+                sprite.center_x = x
+                sprite.center_y = y
+                self.add_spawned(sprite, sprite_list)
+
+    def play_sound(self, name, volume=1.0):
+        # Вместо arcade.play_sound просто запоминаем событие
+        self.sound_events.append((name, volume))
+
+    def drain_sound_events(self):
+        # Забираем накопленные звуки (GameView вызывает это после каждого шага)
+        events = self.sound_events
+        self.sound_events = []
+        return events
+
+    def spawn_random_enemy(self):
+        # тут сделана логика появления врагов.
+        # Чем выше уровень (или счет в бесконечном режиме), тем опаснее враги.
+        if self.level == 0: return
+        rand = self.enemy_rng.random()
+        enemy = None
+
+        if self.level == 4:
+            # Прогрессия сложности для выживания
+            if self.score < 500:
+                enemy = ChaserEnemy(self.player_sprite, self.enemy_list)
+            elif self.score < 2000:
+                if rand < 0.6:
+                    enemy = ChaserEnemy(self.player_sprite, self.enemy_list)
+                else:
+                    enemy = self.new_shooter()
+            else:
+                if rand < 0.4:
+                    enemy = ChaserEnemy(self.player_sprite, self.enemy_list)
+                elif rand < 0.7:
+                    enemy = self.new_shooter()
+                else:
+                    enemy = KamikazeEnemy(self.player_sprite, self.enemy_list)
+        elif self.level == 1:
+            enemy = ChaserEnemy(self.player_sprite, self.enemy_list)
+        elif self.level == 2:
+            if rand < 0.7:
+                enemy = ChaserEnemy(self.player_sprite, self.enemy_list)
+            else:
+                enemy = self.new_shooter()
+        elif self.level == 3:
+            if rand < 0.5:
+                enemy = ChaserEnemy(self.player_sprite, self.enemy_list)
+            elif rand < 0.8:
+                enemy = self.new_shooter()
+            else:
+                enemy = KamikazeEnemy(self.player_sprite, self.enemy_list)
+
+        if enemy:
+            self.spawn_object(enemy, self.enemy_list)
+
+    def new_shooter(self):
+        # Стрелку нужны пули из общего пула и звук через мир
+        return ShooterEnemy(self.player_sprite, self.enemy_list, self.bullet_list, self.play_sound,
+                            self.bullet_pool, self.enemy_rng)
+
+    def spawn_object(self, sprite, sprite_list):
+        # Объект встает в очередь и появляется в ближайших тиках (см. flush_spawns)
+        self.spawn_queue.append((sprite, sprite_list))
+
+    def flush_spawns(self, budget=SPAWN_BUDGET):
+        # Ставим на карту не больше budget объектов из очереди (None - все)
+        queue = self.spawn_queue
+        if not queue:
+            return
+        count = len(queue) if budget is None else min(budget, len(queue))
+        with profiler.scope("spawn"):
+            for _ in range(count):
+                sprite, sprite_list = queue.popleft()
+                self.place_away_from_player(sprite)
+                self.add_spawned(sprite, sprite_list)
+
+    def pending_spawns(self, sprite_list):
+        # Сколько объектов для этого списка еще ждут в очереди
+        return sum(1 for _, target in self.spawn_queue if target is sprite_list)
+
+    def place_away_from_player(self, sprite):
+        # Точка сразу берется из разрешенной области (чтобы не спавнились прямо на игроке)
+        sprite.center_x, sprite.center_y = self.spawner.place(self.player_sprite.center_x,
+                                                              self.player_sprite.center_y)
+
+    def add_spawned(self, sprite, sprite_list):
+        # Врагу нужна общая сетка соседей
+        if isinstance(sprite, (ChaserEnemy, ShooterEnemy, KamikazeEnemy)):
+            sprite.grid = self.enemy_grid
+            self.lod.track(sprite, self.moved_tick)
+
+        if isinstance(sprite, Asteroid):
+            sprite.change_x = self.asteroid_rng.uniform(-1.5, 1.5)
+            sprite.change_y = self.asteroid_rng.uniform(-1.5, 1.5)
+            self.lod.track(sprite, self.moved_tick)
+        sprite_list.append(sprite)
+
+    def add_streamed(self, sprite, sprite_list):
+        # Объект из сектора: скорость и вращение уже заданы записью сектора (src/sectors.py)
+        if isinstance(sprite, Asteroid):
+            self.lod.track(sprite, self.moved_tick)
+        sprite_list.append(sprite)
+
+    def create_bullet_explosion(self, x, y):
+        # Эффект разлета пуль во все стороны (для смерти Камикадзе)
+        bullet_count = 9
+        speed = 5
+        for i in range(bullet_count):
+            angle_deg = i * (360 / bullet_count)
+            angle_rad = math.radians(angle_deg)
+            bullet = self.bullet_pool.acquire(is_enemy=True)
+            bullet.center_x = x
+            bullet.center_y = y
+            bullet.angle = angle_deg - 90
+            bullet.change_x = math.cos(angle_rad) * speed
+            bullet.change_y = math.sin(angle_rad) * speed
+            self.bullet_list.append(bullet)
+
+    def spawn_visual_explosion(self, x, y, color, count=10):
+        # Создает группу частиц взрыва
+        if self.particles is not None:
+            self.particles.emit(x, y, color, count)
+            return
+        for _ in range(count):
+            self.particle_list.append(ExplosionParticle(x, y, color, self.particle_rng))
+
+    def fire_player_bullet(self):
+        # Стрельба с учетом текущей скорости корабля
+        self.play_sound("laser", 0.3)
+        bullet = self.bullet_pool.acquire(is_enemy=False)
+        bullet.angle = self.player_sprite.angle
+        rad = math.radians(-self.player_sprite.angle + 90)
+        bullet.center_x = self.player_sprite.center_x + (math.cos(rad) * 30)
+        bullet.center_y = self.player_sprite.center_y + (math.sin(rad) * 30)
+        # Пуля летит быстрее самого корабля, прибавляем скорость корабля к вектору
+        bullet.change_x = self.player_sprite.speed_x + (math.cos(rad) * 12)
+        bullet.change_y = self.player_sprite.speed_y + (math.sin(rad) * 12)
+        self.bullet_list.append(bullet)
+
+    def step(self, delta_time, inputs):
+        # Один тик симуляции. Возвращает self.result (None, пока игра идет).
+        if self.result:
+            return self.result
+
+        # Проверка условий проигрыша
+        if self.player_sprite.hp <= 0:
+            self.result = "defeat"
+            return self.result
+
+        # Проверка победы (кроме бесконечного уровня)
+        if self.level != 4 and self.score >= self.target_score:
+            self.result = "win"
+            return self.result
+
+        self.tick += 1
+        if inputs.quality != self.quality:
+            self.set_quality(inputs.quality)
+        with profiler.scope("update.inputs"):
+            self.apply_inputs(inputs, delta_time)
+        with profiler.scope("update.population"):
+            self.update_population(delta_time)
+        with profiler.scope("update.movement"):
+            self.update_movement(delta_time)
+        with profiler.scope("update.collisions"):
+            self.resolve_collisions()
+        with profiler.scope("update.compact"):
+            self.graveyard.flush()
+        return self.result
+
+    def set_quality(self, level):
+        # Из уровня качества миру нужно только то, что влияет на симуляцию
+        tier = QUALITY_TIERS[level]
+        self.quality = level
+        self.separation_every = tier.separation_every
+        self.lod.intervals = tier.lod_intervals
+
+    def kill(self, sprite, layer):
+        # Объект уничтожен: до конца тика он только помечен (см. src/graveyard.py)
+        return self.graveyard.kill(sprite, layer)
+
+    def apply_inputs(self, inputs, delta_time):
+        self.player_sprite.change_angle = inputs.turn * 4
+        if inputs.fire:
+            self.fire_player_bullet()
+
+        # Физика движения игрока (инерция).
+        # Константы заданы на кадр 60 FPS и масштабируются под длину тика.
+        frames = frames_in(delta_time)
+        if inputs.thrust:
+            rad = math.radians(-self.player_sprite.angle + 90)
+            self.player_sprite.speed_x += math.cos(rad) * 0.2 * frames
+            self.player_sprite.speed_y += math.sin(rad) * 0.2 * frames
+
+        # Трение (замедление)
+        friction = (1 - 0.04) ** frames
+        self.player_sprite.speed_x *= friction
+        self.player_sprite.speed_y *= friction
+
+    def update_population(self, delta_time):
+        # Секторы вокруг игрока, потом отложенные с прошлых тиков объекты
+        if self.sectors is not None:
+            with profiler.scope("sectors"):
+                self.sectors.update(self)
+        self.flush_spawns()
+
+        # --- КОНТРОЛЬ ПОПУЛЯЦИИ ВРАГОВ (УРОВЕНЬ 4) ---
+        # Чтобы в бесконечном режиме враги не заканчивались и не переполняли память
+        if self.level == 4:
+            if self.enemy_count() < self.enemy_limit():
+                # 5% шанс за кадр 60 FPS, пересчитанный на длину тика
+                if self.enemy_rng.random() < 1 - (1 - 0.05) ** frames_in(delta_time):
+                    self.spawn_random_enemy()
+
+    def enemy_count(self):
+        # Враги на карте плюс те, что ждут в очереди
+        return len(self.enemy_list) + self.pending_spawns(self.enemy_list)
+
+    def enemy_limit(self):
+        # Сколько врагов одновременно может быть в режиме выживания
+        enemy_limit = 4
+        if self.score > 500: enemy_limit = 7
+        if self.score > 2000: enemy_limit = 12
+        if self.score > 5000: enemy_limit = 12 + int((self.score - 5000) / 1000)
+        return enemy_limit
+
+    def update_movement(self, delta_time):
+        # Обновление всех списков спрайтов
+        self.player_list.update(delta_time)
+        with profiler.scope("movement.asteroids"):
+            full, cheap = self.lod.split("asteroids", self.asteroid_list, self.tick, self.player_sprite)
+            # Астероид летит по прямой: пропущенные тики - это просто больший dt
+            for asteroid, ticks in full + cheap:
+                asteroid.update(ticks * delta_time)
+        with profiler.scope("movement.bullets"):
+            for bullet in self.bullet_list:
+                bullet.update(delta_time)
+                if bullet.time_to_live <= 0:
+                    self.kill(bullet, "bullets")
+        with profiler.scope("movement.enemies"):
+            self.update_enemies(delta_time)
+        with profiler.scope("movement.particles"):
+            for particle in self.particle_list:
+                particle.update(delta_time)
+                if particle.alpha <= 0:
+                    self.kill(particle, "particles")
+            if self.particles is not None:
+                self.particles.update(delta_time)
+        self.moved_tick = self.tick
+        if self.sectors is None:
+            self.keep_in_arena()
+
+    def keep_in_arena(self):
+        # Ограничение мира (отскакивание от границ)
+        if self.player_sprite.left < -MAP_SIZE:
+            self.player_sprite.left = -MAP_SIZE
+            self.player_sprite.speed_x *= -0.5
+        elif self.player_sprite.right > MAP_SIZE:
+            self.player_sprite.right = MAP_SIZE
+            self.player_sprite.speed_x *= -0.5
+        if self.player_sprite.bottom < -MAP_SIZE:
+            self.player_sprite.bottom = -MAP_SIZE
+            self.player_sprite.speed_y *= -0.5
+        elif self.player_sprite.top > MAP_SIZE:
+            self.player_sprite.top = MAP_SIZE
+            self.player_sprite.speed_y *= -0.5
+
+    def update_enemies(self, delta_time):
+        # Ближние враги - полный update (или пакетно на NumPy), дальние - редкий дешевый update_far
+        near, far = self.lod.split("enemies", self.enemy_list, self.tick, self.player_sprite)
+        # Откуда стартовали ближние враги: дальние до игрока за тик не долетят
+        starts = [(enemy, enemy.center_x, enemy.center_y) for enemy, _ in near]
+        for enemy, ticks in far:
+            enemy.update_far(ticks * delta_time)
+        active = []
+        for enemy, ticks in near:
+            if ticks > 1:
+                # Только что подлетел к экрану: сначала догоняет пропущенные тики
+                enemy.update_far((ticks - 1) * delta_time)
+            active.append(enemy)
+
+        # Отталкивание раз в separation_every тиков, зато с силой за все пропущенные тики
+        separation_time = 0
+        if self.tick % self.separation_every == 0:
+            separation_time = delta_time * self.separation_every
+
+        if self.steering and self.steering.should_batch(active):
+            # Отталкивание тут тоже векторное, сетка спрайтов не нужна
+            self.steering.update(active, self.player_sprite, delta_time, separation_time)
+        else:
+            if separation_time:
+                # Расталкиваются только ближние, как и в пакетном пути
+                self.enemy_grid.rebuild(active)
+            for enemy in active:
+                enemy.update(delta_time, separation_time)
+
+        moves = self.enemy_moves = {}
+        margin = 0
+        for enemy, x, y in starts:
+            dx = enemy.center_x - x
+            dy = enemy.center_y - y
+            moves[enemy] = (dx, dy)
+            margin = max(margin, abs(dx), abs(dy))
+        self.enemy_margin = margin * 1.42
+
+    def resolve_collisions(self):
+        # ================== КОЛЛИЗИИ (Столкновения) ==================
+        # Сначала broadphase находит близкие пары по всем слоям сразу,
+        # потом один проход разбирает их по порядку. Точная проверка полигонов
+        # запускается только для кандидатов и только пока оба объекта живы.
+        player = self.player_sprite
+        with profiler.scope("collisions.broadphase"):
+            pairs = self.broadphase.collect(player, self.bullet_list, self.enemy_list, self.asteroid_list,
+                                            self.trash_list, self.repair_list, skip=self.graveyard,
+                                            enemy_margin=self.enemy_margin)
+        # Всё, что уничтожено в этом тике, лежит в self.graveyard: следующие пары с ним пропускаем
+        dead = self.graveyard
+
+        # Все проверки непрерывные (swept_hit): по пути объекта за тик, а не только в конечной точке,
+        # поэтому длинный тик не дает пролететь цель насквозь. Сдвиг берется относительно цели.
+        step_x = player.step_x
+        step_y = player.step_y
+
+        # 1. Игрок и Аптечки
+        for kit in pairs[PLAYER_REPAIR]:
+            if not swept_hit(player, kit, step_x, step_y):
+                continue
+            self.kill(kit, "repair")
+            player.hp = min(100, player.hp + 30)
+            self.play_sound("heal")
+
+            # Спавн новой аптечки
+            if self.level < 4:
+                if self.level >= 2: self.spawn_object(RepairKit(), self.repair_list)
+            elif self.level == 4:
+                # В выживании аптечки редкие
+                if len(self.repair_list) < 5 and self.loot_rng.random() < 0.01:
+                    self.spawn_object(RepairKit(), self.repair_list)
+
+        # 2. Обработка пуль
+        with profiler.scope("collisions.bullets"):
+            self.resolve_bullet_hits(pairs)
+
+        # 3. Сбор мусора
+        for t in pairs[PLAYER_TRASH]:
+            if not swept_hit(player, t, step_x, step_y):
+                continue
+            self.kill(t, "trash")
+            self.play_sound("collect", 0.5)
+            self.score += 50
+            self.spawn_object(Trash(), self.trash_list)
+
+        # 4. Столкновение с астероидами
+        for a in pairs[PLAYER_ASTEROID]:
+            if a in dead or not swept_hit(player, a, step_x, step_y):
+                continue
+            self.kill(a, "asteroids")
+            self.play_sound("hit", 1.0)
+            self.spawn_visual_explosion(a.center_x, a.center_y, arcade.color.GRAY, 15)
+            player.hp -= 20
+            self.last_damage = "asteroid"
+            self.spawn_object(Asteroid(self.asteroid_rng), self.asteroid_list)
+
+        # 5. Столкновение с врагами (таран)
+        moves = self.enemy_moves
+        for enemy in pairs[PLAYER_ENEMY]:
+            if enemy in dead:
+                continue
+            move_x, move_y = moves.get(enemy, (0, 0))
+            if not swept_hit(player, enemy, step_x - move_x, step_y - move_y):
+                continue
+            self.play_sound("hit", 1.0)
+            self.spawn_visual_explosion(enemy.center_x, enemy.center_y, arcade.color.RED, 20)
+            if isinstance(enemy, KamikazeEnemy):
+                player.hp -= 30
+            else:
+                player.hp -= 15
+            self.last_damage = "ram"
+            self.kill(enemy, "enemies")
+            if self.level != 4:
+                self.spawn_random_enemy()
+
+    def resolve_bullet_hits(self, pairs):
+        # Попадания пуль: вражеские в игрока, наши во врагов и астероиды
+        player = self.player_sprite
+        dead = self.graveyard
+        # Вражеская пуля попала в игрока
+        for bullet in pairs[ENEMY_BULLET_PLAYER]:
+            if swept_hit(bullet, player, bullet.step_x - player.step_x, bullet.step_y - player.step_y):
+                self.kill(bullet, "bullets")
+                player.hp -= 10
+                self.last_damage = "bullet"
+                self.play_sound("hit", 0.5)
+                self.spawn_visual_explosion(player.center_x, player.center_y, arcade.color.ORANGE, 5)
+
+        enemy_candidates = pairs[PLAYER_BULLET_ENEMY]
+        asteroid_candidates = pairs[PLAYER_BULLET_ASTEROID]
+        moves = self.enemy_moves
+        no_move = (0, 0)
+        for bullet in self.broadphase.player_bullets:
+            # Наша пуля попала во врага
+            candidates = enemy_candidates.get(bullet)
+            if candidates:
+                hits = []
+                for enemy in candidates:
+                    if enemy in dead:
+                        continue
+                    move_x, move_y = moves.get(enemy, no_move)
+                    if swept_hit(bullet, enemy, bullet.step_x - move_x, bullet.step_y - move_y):
+                        hits.append(enemy)
+                if hits:
+                    self.kill(bullet, "bullets")
+                    for enemy in hits:
+                        enemy.hp -= 1
+                        self.spawn_visual_explosion(bullet.center_x, bullet.center_y, arcade.color.WHITE, 3)
+                        if enemy.hp <= 0:
+                            self.destroy_enemy(enemy)
+                    continue
+
+            # Пуля попала в астероид
+            candidates = asteroid_candidates.get(bullet)
+            if candidates:
+                # Астероиды медленные (до 1.5 px за кадр), их сдвигом пренебрегаем
+                hits = [a for a in candidates
+                        if a not in dead and swept_hit(bullet, a, bullet.step_x, bullet.step_y)]
+                if hits:
+                    self.kill(bullet, "bullets")
+                    for a in hits:
+                        self.play_sound("explosion", 0.4)
+                        self.spawn_visual_explosion(a.center_x, a.center_y, arcade.color.GRAY, 10)
+                        self.kill(a, "asteroids")
+                        self.score += 5
+                        self.spawn_object(Asteroid(self.asteroid_rng), self.asteroid_list)
+
+    def destroy_enemy(self, enemy):
+        # Враг уничтожен пулей игрока
+        self.play_sound("explosion", 0.6)
+        exp_color = arcade.color.BLUE
+        if isinstance(enemy, ShooterEnemy):
+            exp_color = arcade.color.GREEN
+        elif isinstance(enemy, KamikazeEnemy):
+            exp_color = arcade.color.RED
+        self.spawn_visual_explosion(enemy.center_x, enemy.center_y, exp_color, 15)
+
+        # Камикадзе взрывается при смерти
+        if isinstance(enemy, KamikazeEnemy):
+            self.create_bullet_explosion(enemy.center_x, enemy.center_y)
+
+        self.kill(enemy, "enemies")
+        self.score += 100
+        # Спавним замену, если это не бесконечный режим (там свой спавнер)
+        if self.level != 4:
+            self.spawn_random_enemy()
+
+
+def run_headless(level, ticks, delta_time=1 / TICK_RATE, policy=None, seed=None):
+    """
+    Прогоняет уровень без окна. policy(world) -> Inputs решает, что нажимает "игрок";
+    без неё корабль просто висит на месте.
+    """
+    world = World(level, seed)
+    world.setup()
+    idle = Inputs()
+    for _ in range(ticks):
+        inputs = policy(world) if policy else idle
+        if world.step(delta_time, inputs):
+            break
+        world.sound_events.clear()
+    return world